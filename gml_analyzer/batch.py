@@ -0,0 +1,302 @@
+import numpy
+
+from stroke import Stroke, CORNER_THRESHOLD
+from tag import Tag
+from memo import memoized
+from intersection import self_intersection_count
+from hull import hull_areas
+from features import DEFAULT_FEATURES, check_features
+
+def _segment_extreme(ufunc, values, offsets, empty):
+  """Reduces each segment of values with ufunc.reduceat, giving empty segments the value empty"""
+  lengths = numpy.diff(offsets)
+  result = numpy.empty( (len(lengths),) + values.shape[1:] )
+  result.fill(empty)
+
+  # reduceat reduces from one start to the next, so only non-empty segments may appear among the starts
+  nonempty = lengths > 0
+  if nonempty.any(): result[nonempty] = ufunc.reduceat(values, offsets[:-1][nonempty] - offsets[0], axis=0)
+  return result
+
+class StrokeBatch(object):
+  """
+  Many strokes held as one (N, 3) coordinate array, where stroke k occupies rows offsets[k] to
+  offsets[k + 1]. Every per-stroke metric of Stroke is available as an array with one value per stroke,
+  computed for all strokes together in a fixed number of numpy calls: sums and means go through
+  numpy.bincount and extremes through numpy's reduceat.
+
+  Values match the Stroke properties of the same singular name, except that strokes without points
+  get NaN centroids and distances from the centroid.
+  """
+
+  def __init__(self, coordinates, offsets):
+    self.coordinates = numpy.asarray(coordinates, dtype=float).reshape(-1, 3)
+    self.offsets = numpy.asarray(offsets, dtype=numpy.int64)
+
+    if len(self.offsets) < 1 or numpy.any(numpy.diff(self.offsets) < 0):
+      raise ValueError("Offsets must be a non-decreasing array with one more entry than there are strokes")
+
+    # Rows outside offsets[0]..offsets[-1] belong to no stroke
+    self.coordinates = self.coordinates[self.offsets[0]:self.offsets[-1]]
+    self.offsets = self.offsets - self.offsets[0]
+
+  @staticmethod
+  def fromStrokes(strokes):
+    """Packs the strokes' coordinates into a new batch"""
+    strokes = list(strokes)
+    offsets = numpy.cumsum([0] + [ len(stroke.coordinates) for stroke in strokes ])
+    coordinates = numpy.concatenate([ stroke.coordinates for stroke in strokes ]) if strokes else numpy.empty((0, 3))
+    return StrokeBatch(coordinates, offsets)
+
+  def __len__(self):
+    return len(self.offsets) - 1
+
+  def __getitem__(self, index):
+    """Returns stroke index as a Stroke viewing the batch's coordinates"""
+    if index < 0: index += len(self)
+    if not 0 <= index < len(self): raise IndexError("Stroke index out of range")
+    return Stroke.fromArray( self.coordinates[self.offsets[index]:self.offsets[index + 1]] )
+
+  def __iter__(self):
+    for index in xrange(len(self)):
+      yield self[index]
+
+  @property
+  @memoized
+  def point_counts(self):
+    return numpy.diff(self.offsets)
+
+  @memoized
+  def __owners__(self):
+    """Returns the index of the stroke each point belongs to"""
+    return numpy.repeat(numpy.arange(len(self)), self.point_counts)
+
+  def __sum__(self, owners, values):
+    return numpy.bincount(owners, weights=values, minlength=len(self))
+
+  def __mean__(self, owners, values, empty):
+    counts = numpy.bincount(owners, minlength=len(self))
+    sums = self.__sum__(owners, values)
+
+    means = numpy.empty(len(self))
+    means.fill(empty)
+    means[counts > 0] = sums[counts > 0] / counts[counts > 0]
+    return means
+
+  def __std__(self, owners, values, means, empty):
+    counts = numpy.bincount(owners, minlength=len(self))
+    squares = self.__sum__(owners, (values - means[owners]) ** 2)
+
+    deviations = numpy.empty(len(self))
+    deviations.fill(empty)
+    deviations[counts > 0] = numpy.sqrt( squares[counts > 0] / counts[counts > 0] )
+    return deviations
+
+  @property
+  @memoized
+  def centroids(self):
+    """Returns an (n_strokes, 2) array of centroids"""
+    owners = self.__owners__()
+    return numpy.column_stack([ self.__mean__(owners, self.coordinates[:, axis], numpy.nan) for axis in (0, 1) ])
+
+  @property
+  @memoized
+  def bounds(self):
+    """Returns (minimums, maximums), two (n_strokes, 2) arrays that are zero for strokes without points"""
+    xy = self.coordinates[:, :2]
+    return _segment_extreme(numpy.minimum, xy, self.offsets, 0), _segment_extreme(numpy.maximum, xy, self.offsets, 0)
+
+  @property
+  def dimensions(self):
+    """Returns an (n_strokes, 2) array of widths and heights"""
+    minimums, maximums = self.bounds
+    return maximums - minimums
+
+  @property
+  def aspect_ratios(self):
+    """Returns the ratio of height to width of every stroke, NaN where a stroke has no width"""
+    dimensions = self.dimensions
+    ratios = numpy.empty(len(self))
+    ratios.fill(numpy.nan)
+
+    wide = dimensions[:, 0] > 0
+    ratios[wide] = dimensions[wide, 1] / dimensions[wide, 0]
+    return ratios
+
+  @property
+  def durations(self):
+    """Returns the largest t of every stroke, 0 for strokes without points"""
+    return _segment_extreme(numpy.maximum, self.coordinates[:, 2], self.offsets, 0)
+
+  @memoized
+  def __deltas__(self):
+    """Returns the x and y differences between consecutive rows, as separate contiguous arrays"""
+    return numpy.diff(self.coordinates[:, 0]), numpy.diff(self.coordinates[:, 1])
+
+  @memoized
+  def __steps__(self):
+    """Returns (owners, lengths) of every segment between consecutive points of the same stroke"""
+    owners = self.__owners__()
+    within = owners[:-1] == owners[1:]
+    dx, dy = self.__deltas__()
+    return owners[:-1][within], numpy.hypot(dx, dy)[within]
+
+  @property
+  def arc_lengths(self):
+    return self.__sum__( *self.__steps__() )
+
+  @memoized
+  def __joint_angles__(self):
+    """Returns (owners, angles) of every interior point of every stroke, see Stroke.__joint_angles__"""
+    owners = self.__owners__()
+    within = owners[:-2] == owners[2:]
+    dx, dy = self.__deltas__()
+
+    cross = dx[1:] * dy[:-1] - dy[1:] * dx[:-1]
+    dot = dx[:-1] * dx[1:] + dy[:-1] * dy[1:]
+
+    # Adding 0.0 turns -0.0 into 0.0, so folds come out as +pi and zero-length segments as 0
+    return owners[:-2][within], numpy.arctan2(cross[within] + 0.0, dot[within] + 0.0)
+
+  @property
+  def total_joint_angles(self):
+    return self.__sum__( *self.__joint_angles__() )
+
+  @property
+  def total_absolute_joint_angles(self):
+    owners, angles = self.__joint_angles__()
+    return self.__sum__( owners, numpy.abs(angles) )
+
+  @property
+  def mean_joint_angles(self):
+    owners, angles = self.__joint_angles__()
+    return self.__mean__(owners, angles, 0)
+
+  @property
+  @memoized
+  def mean_absolute_joint_angles(self):
+    owners, angles = self.__joint_angles__()
+    return self.__mean__(owners, numpy.abs(angles), 0)
+
+  @property
+  def std_absolute_joint_angles(self):
+    owners, angles = self.__joint_angles__()
+    return self.__std__(owners, numpy.abs(angles), self.mean_absolute_joint_angles, 0)
+
+  @property
+  def total_corners(self):
+    owners, angles = self.__joint_angles__()
+    return numpy.bincount( owners[ numpy.abs(angles) > CORNER_THRESHOLD ], minlength=len(self) )
+
+  @memoized
+  def __distances_from_centroid__(self):
+    owners = self.__owners__()
+    centroids = self.centroids
+    return numpy.hypot( self.coordinates[:, 0] - centroids[owners, 0], self.coordinates[:, 1] - centroids[owners, 1] )
+
+  @property
+  @memoized
+  def mean_distances_from_centroid(self):
+    return self.__mean__( self.__owners__(), self.__distances_from_centroid__(), numpy.nan )
+
+  @property
+  def std_distances_from_centroid(self):
+    return self.__std__( self.__owners__(), self.__distances_from_centroid__(), self.mean_distances_from_centroid, numpy.nan )
+
+  @property
+  def hull_areas(self):
+    """Returns the convex hull area of every stroke, see hull.hull_areas"""
+    return hull_areas(self.coordinates, self.offsets)
+
+  @property
+  def self_intersection_counts(self):
+    """Returns the self-intersection count of every stroke. This one still loops over the strokes"""
+    xy = self.coordinates[:, :2]
+    return numpy.array([ self_intersection_count(xy[start:end]) for start, end in zip(self.offsets[:-1], self.offsets[1:]) ], dtype=int)
+
+class TagBatch(object):
+  """
+  Many tags held as one (N, 3) coordinate array with CSR-style offsets: stroke k occupies rows
+  stroke_offsets[k] to stroke_offsets[k + 1], and tag j holds strokes tag_offsets[j] to tag_offsets[j + 1].
+
+  strokes is a StrokeBatch of every stroke. flattened is a StrokeBatch with one entry per tag, whose
+  strokes are joined end to end as in Tag.flattened_stroke, and provides the per-tag metrics.
+  """
+
+  def __init__(self, coordinates, stroke_offsets, tag_offsets):
+    self.stroke_offsets = numpy.asarray(stroke_offsets, dtype=numpy.int64)
+    self.tag_offsets = numpy.asarray(tag_offsets, dtype=numpy.int64)
+
+    self.strokes = StrokeBatch(coordinates, self.stroke_offsets)
+    self.flattened = StrokeBatch(coordinates, self.stroke_offsets[self.tag_offsets])
+    self.coordinates = self.strokes.coordinates
+
+  @staticmethod
+  def fromTags(tags):
+    """Packs the tags' strokes into a new batch"""
+    tags = list(tags)
+    strokes = [ stroke for tag in tags for stroke in tag.strokes ]
+    tag_offsets = numpy.cumsum([0] + [ len(tag.strokes) for tag in tags ])
+
+    batch = StrokeBatch.fromStrokes(strokes)
+    return TagBatch(batch.coordinates, batch.offsets, tag_offsets)
+
+  @staticmethod
+  def fromStore(store):
+    """Returns a batch of every tag in a TagStore, viewing its memory-mapped coordinates"""
+    return TagBatch(store.coordinates, store.stroke_offsets, store.tag_offsets)
+
+  def __len__(self):
+    return len(self.tag_offsets) - 1
+
+  def __getitem__(self, index):
+    """Returns tag index as a Tag whose strokes view the batch's coordinates"""
+    if index < 0: index += len(self)
+    if not 0 <= index < len(self): raise IndexError("Tag index out of range")
+    return Tag(*[ self.strokes[stroke] for stroke in xrange(self.tag_offsets[index], self.tag_offsets[index + 1]) ])
+
+  def __iter__(self):
+    for index in xrange(len(self)):
+      yield self[index]
+
+  @property
+  def stroke_counts(self):
+    return numpy.diff(self.tag_offsets)
+
+  @property
+  def durations(self):
+    """Returns the sum of the durations of each tag's strokes, as Tag.duration does"""
+    owners = numpy.repeat(numpy.arange(len(self)), self.stroke_counts)
+    return numpy.bincount(owners, weights=self.strokes.durations, minlength=len(self))
+
+  def feature_matrix(self, features=DEFAULT_FEATURES):
+    """
+    Returns the same (n_tags, n_features) array as features.extract_features would for these tags.
+    Every feature except self_intersection_count is computed for all tags at once.
+    """
+    check_features(features)
+    flattened = self.flattened
+
+    columns = {
+      'stroke_count': lambda: self.stroke_counts,
+      'point_count': lambda: flattened.point_counts,
+      'duration': lambda: self.durations,
+      'mean_distance_from_centroid': lambda: flattened.mean_distances_from_centroid,
+      'std_distance_from_centroid': lambda: flattened.std_distances_from_centroid,
+      'arc_length': lambda: flattened.arc_lengths,
+      'aspect_ratio': lambda: flattened.aspect_ratios,
+      'hull_area': lambda: flattened.hull_areas,
+      'self_intersection_count': lambda: flattened.self_intersection_counts,
+      'total_joint_angle': lambda: flattened.total_joint_angles,
+      'total_absolute_joint_angle': lambda: flattened.total_absolute_joint_angles,
+      'mean_joint_angle': lambda: flattened.mean_joint_angles,
+      'mean_absolute_joint_angle': lambda: flattened.mean_absolute_joint_angles,
+      'std_absolute_joint_angle': lambda: flattened.std_absolute_joint_angles,
+      'total_corners': lambda: flattened.total_corners,
+    }
+
+    matrix = numpy.empty((len(self), len(features)))
+    for column, name in enumerate(features):
+      matrix[:, column] = columns[name]()
+
+    return matrix
@@ -0,0 +1,263 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Process, Pipe
+
+try:
+  import resource
+except ImportError:
+  resource = None
+
+import numpy
+
+from tag import Tag
+from stroke import Stroke
+from corpus import Corpus
+from features import DEFAULT_FEATURES, extract_features
+from synthetic import synthetic_gml, write_corpus
+
+DEFAULT_CONFIG = {
+  'tags': 50,
+  'strokes': 4,
+  'points': 250,
+  'crossing_density': 0.3,
+  'seed': 0,
+  'workers': None,
+}
+
+# Ordered (name, setup) pairs. A setup takes the config and returns (run, points, tags) or (run, points,
+# tags, cleanup): a callable to time, how many points and tags a single call processes, and optionally
+# a callable that releases whatever the setup created once timing is done.
+BENCHMARKS = []
+
+def benchmark(name):
+  """Registers a benchmark setup under name"""
+  def register(setup):
+    BENCHMARKS.append( (name, setup) )
+    return setup
+  return register
+
+def _gml_documents(config):
+  return [ synthetic_gml(config['strokes'], config['points'], config['crossing_density'], config['seed'] + index)
+           for index in xrange(config['tags']) ]
+
+def _strokes(config):
+  tags = [ Tag.fromGML(gml, keep_gml=False) for gml in _gml_documents(config) ]
+  return [ stroke for tag in tags for stroke in tag.strokes ]
+
+def _stroke_benchmark(strokes, config, operation):
+  """Returns a run applying operation to every stroke, with memoized values dropped first"""
+  def run():
+    for stroke in strokes:
+      stroke.invalidate()
+      operation(stroke)
+
+  return run, sum( len(stroke.coordinates) for stroke in strokes ), config['tags']
+
+@benchmark("parse/fromGML")
+def _parse(config):
+  documents = _gml_documents(config)
+  return (lambda: [ Tag.fromGML(gml, keep_gml=False) for gml in documents ]), config['tags'] * config['strokes'] * config['points'], config['tags']
+
+@benchmark("parse/lxml")
+def _parse_lxml(config):
+  documents = _gml_documents(config)
+  return (lambda: [ Tag.fromGML(gml, keep_gml=False, fast=False) for gml in documents ]), config['tags'] * config['strokes'] * config['points'], config['tags']
+
+def _register_stroke_properties():
+  """Registers a benchmark for every public Stroke property, so new metrics are picked up automatically"""
+  names = sorted( name for name, value in vars(Stroke).items()
+                  if isinstance(value, property) and not name.startswith('_') and name not in ('coordinates', 'points') )
+
+  for name in names:
+    benchmark("stroke/" + name)( lambda config, name=name: _stroke_benchmark(_strokes(config), config, lambda stroke: getattr(stroke, name)) )
+
+_register_stroke_properties()
+
+@benchmark("stroke/__intersection_count__")
+def _intersection_count(config):
+  strokes = _strokes(config)
+  def run():
+    for stroke, other in zip(strokes, strokes[1:] + strokes[:1]):
+      stroke.__intersection_count__(other)
+  return run, sum( len(stroke.coordinates) for stroke in strokes ), config['tags']
+
+@benchmark("stroke/smoothed")
+def _smoothed(config):
+  return _stroke_benchmark(_strokes(config), config, lambda stroke: stroke.smoothed())
+
+@benchmark("features/extract")
+def _features(config):
+  tags = [ Tag.fromGML(gml, keep_gml=False) for gml in _gml_documents(config) ]
+  def run():
+    for tag in tags:
+      tag.invalidate()
+      for stroke in tag.strokes: stroke.invalidate()
+    extract_features(tags)
+  return run, config['tags'] * config['strokes'] * config['points'], config['tags']
+
+@benchmark("corpus/serial")
+def _corpus_serial(config):
+  return _corpus(config, 1)
+
+@benchmark("corpus/parallel")
+def _corpus_parallel(config):
+  return _corpus(config, config['workers'])
+
+def _corpus(config, workers):
+  directory = tempfile.mkdtemp()
+  paths = write_corpus(directory, config['tags'], config['strokes'], config['points'], config['crossing_density'], config['seed'])
+  corpus = Corpus(paths, DEFAULT_FEATURES, workers, chunk_size=max(1, config['tags'] // 16))
+
+  return corpus.extract, config['tags'] * config['strokes'] * config['points'], config['tags'], lambda: shutil.rmtree(directory)
+
+def peak_memory():
+  """Returns this process's peak resident set size in bytes, or None where the resource module is missing"""
+  if resource is None: return None
+
+  peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  return peak if sys.platform == 'darwin' else peak * 1024
+
+def measure(run, repeat=3, minimum_time=0.2):
+  """Returns the fastest time per call over repeat rounds, each calling run for at least minimum_time seconds"""
+  best = float('inf')
+  for _ in xrange(repeat):
+    calls, start = 0, time.time()
+    while True:
+      run()
+      calls += 1
+      elapsed = time.time() - start
+      if elapsed >= minimum_time: break
+    best = min(best, elapsed / calls)
+
+  return best
+
+def _run_one(name, config, repeat, minimum_time):
+  prepared = dict(BENCHMARKS)[name](config)
+  run, points, tags = prepared[:3]
+
+  try:
+    seconds = measure(run, repeat, minimum_time)
+  finally:
+    if len(prepared) > 3: prepared[3]()
+
+  return {
+    'seconds': seconds,
+    'points_per_second': points / seconds,
+    'tags_per_second': tags / seconds,
+    'peak_memory': peak_memory(),
+  }
+
+def _run_isolated(name, config, repeat, minimum_time, connection):
+  try:
+    connection.send( (_run_one(name, config, repeat, minimum_time), None) )
+  except Exception as error:
+    connection.send( (None, "%s: %s" % (type(error).__name__, error)) )
+  finally:
+    connection.close()
+
+def run_benchmarks(config=None, names=None, repeat=3, minimum_time=0.2, isolate=True):
+  """
+  Runs the registered benchmarks whose names start with any of the given prefixes (every benchmark
+  when names is None) and returns a JSON-ready report of the results and the environment.
+
+  With isolate set each benchmark runs in a fresh process, so that its peak_memory (the peak resident
+  set size in bytes) reflects that benchmark alone on top of the interpreter and its imports.
+  """
+  config = dict(DEFAULT_CONFIG, **(config or {}))
+  selected = [ name for name, _ in BENCHMARKS if names is None or any( name.startswith(prefix) for prefix in names ) ]
+  results = {}
+
+  for name in selected:
+    if not isolate:
+      results[name] = _run_one(name, config, repeat, minimum_time)
+      continue
+
+    receiver, sender = Pipe(duplex=False)
+    process = Process(target=_run_isolated, args=(name, config, repeat, minimum_time, sender))
+    process.start()
+    result, error = receiver.recv()
+    process.join()
+
+    if error is not None: raise RuntimeError("Benchmark %s failed: %s" % (name, error))
+    results[name] = result
+
+  return {
+    'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+    'commit': _commit(),
+    'python': platform.python_version(),
+    'numpy': numpy.__version__,
+    'platform': platform.platform(),
+    'config': config,
+    'results': results,
+  }
+
+def _commit():
+  """Returns the git commit the package is checked out at, if it lives in a git work tree"""
+  try:
+    with open(os.devnull, "w") as devnull:
+      return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)), stderr=devnull).strip()
+  except (OSError, subprocess.CalledProcessError):
+    return None
+
+def format_report(report, baseline=None):
+  """Returns a text table of a report's results, with the speedup over a baseline report when given"""
+  lines = [ "%-45s %12s %14s %12s %10s" % ("benchmark", "ms/call", "points/s", "tags/s", "peak MB") ]
+  if baseline is not None: lines[0] += " %9s" % "speedup"
+
+  for name in sorted(report['results']):
+    result = report['results'][name]
+    peak = "%.1f" % (result['peak_memory'] / 1048576.0) if result['peak_memory'] is not None else "-"
+    line = "%-45s %12.3f %14.0f %12.1f %10s" % (name, result['seconds'] * 1000, result['points_per_second'], result['tags_per_second'], peak)
+
+    if baseline is not None:
+      before = baseline['results'].get(name)
+      line += " %8.2fx" % (before['seconds'] / result['seconds']) if before else " %9s" % "new"
+
+    lines.append(line)
+
+  return "\n".join(lines)
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Times parsing, stroke metrics and corpus runs on synthetic GML.")
+  parser.add_argument("benchmarks", nargs="*", help="benchmark name prefixes to run (default: all)")
+  parser.add_argument("-o", "--output", help="write the JSON report to this file")
+  parser.add_argument("--compare", metavar="REPORT", help="show speedups over an earlier JSON report")
+  parser.add_argument("--list", action="store_true", help="list the benchmarks and exit")
+  parser.add_argument("--repeat", type=int, default=3)
+  parser.add_argument("--minimum-time", type=float, default=0.2, help="seconds each round runs for at least")
+  parser.add_argument("--no-isolate", action="store_true", help="run every benchmark in this process")
+  for key, value in sorted(DEFAULT_CONFIG.items()):
+    parser.add_argument("--" + key.replace("_", "-"), type=float if key == 'crossing_density' else int, default=value)
+
+  arguments = parser.parse_args(argv)
+
+  if arguments.list:
+    for name, _ in BENCHMARKS:
+      print name
+    return 0
+
+  config = dict( (key, getattr(arguments, key)) for key in DEFAULT_CONFIG )
+  report = run_benchmarks(config, arguments.benchmarks or None, arguments.repeat, arguments.minimum_time, not arguments.no_isolate)
+
+  baseline = None
+  if arguments.compare:
+    with open(arguments.compare) as baseline_file:
+      baseline = json.load(baseline_file)
+
+  print format_report(report, baseline)
+
+  if arguments.output:
+    with open(arguments.output, "w") as output:
+      json.dump(report, output, indent=2, sort_keys=True)
+
+  return 0
+
+if __name__ == "__main__":
+  sys.exit( main() )
@@ -0,0 +1,128 @@
+import sqlite3
+
+import numpy
+
+from features import FEATURE_VERSIONS, check_features
+
+# SQLite limits the number of parameters in a single statement
+BATCH_SIZE = 500
+
+SCHEMA = """
+  CREATE TABLE IF NOT EXISTS entries (
+    digest BLOB PRIMARY KEY,
+    last_used INTEGER NOT NULL
+  );
+  CREATE TABLE IF NOT EXISTS feature_values (
+    digest BLOB NOT NULL REFERENCES entries(digest) ON DELETE CASCADE,
+    feature TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    value REAL,
+    PRIMARY KEY (digest, feature)
+  );
+  CREATE INDEX IF NOT EXISTS entries_by_last_used ON entries(last_used);
+"""
+
+def _batches(items):
+  for start in xrange(0, len(items), BATCH_SIZE):
+    yield items[start:start + BATCH_SIZE]
+
+class FeatureCache:
+  """
+  A persistent SQLite store of feature values keyed by the SHA-1 digest of a tag's GML. Each value is
+  stored with the version its feature had in FEATURE_VERSIONS when it was computed, and values from an
+  older version read as missing.
+
+  With max_entries set, storing values evicts the least recently used tags until at most max_entries
+  remain. Looking a tag up counts as a use.
+  """
+
+  def __init__(self, path, max_entries=None):
+    if max_entries is not None and max_entries < 1: raise ValueError("Cache must hold at least one entry")
+
+    self.path = path
+    self.max_entries = max_entries
+    self.connection = sqlite3.connect(path)
+    self.connection.execute("PRAGMA foreign_keys = ON")
+    self.connection.executescript(SCHEMA)
+    self.clock = self.connection.execute("SELECT COALESCE(MAX(last_used), 0) FROM entries").fetchone()[0]
+
+  def __len__(self):
+    return self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+  def __tick__(self):
+    """Returns the next use stamp; entries with the smallest stamps are evicted first"""
+    self.clock += 1
+    return self.clock
+
+  def close(self):
+    self.connection.close()
+
+  def lookup(self, digests, features):
+    """
+    Returns (matrix, cached) for the given tag digests and feature names: matrix holds the cached values
+    with a row per digest, and the boolean array cached marks which of them were found with a current
+    version. Missing values are NaN, but so are cached values of features that were NaN for their tag.
+    """
+    check_features(features)
+    digests = list(digests)
+    rows = {}
+    for row, digest in enumerate(digests):
+      rows.setdefault(digest, []).append(row)
+    columns = dict( (name, column) for column, name in enumerate(features) )
+
+    matrix = numpy.empty((len(digests), len(features)))
+    matrix.fill(numpy.nan)
+    cached = numpy.zeros(matrix.shape, dtype=bool)
+
+    now = self.__tick__()
+    with self.connection:
+      for batch in _batches( list(rows) ):
+        placeholders = ", ".join("?" * len(batch))
+        blobs = map(buffer, batch)
+        query = "SELECT digest, feature, version, value FROM feature_values WHERE digest IN (%s)" % placeholders
+
+        for digest, feature, version, value in self.connection.execute(query, blobs):
+          if feature not in columns or version != FEATURE_VERSIONS[feature]: continue
+
+          for row in rows[str(digest)]:
+            matrix[row, columns[feature]] = numpy.nan if value is None else value
+            cached[row, columns[feature]] = True
+
+        self.connection.execute("UPDATE entries SET last_used = ? WHERE digest IN (%s)" % placeholders, [now] + blobs)
+
+    return matrix, cached
+
+  def store(self, digests, features, matrix):
+    """Stores a row of feature values per tag digest, replacing older values, then evicts down to max_entries"""
+    check_features(features)
+    digests = list(digests)
+    matrix = numpy.asarray(matrix, dtype=float).reshape(len(digests), len(features))
+
+    now = self.__tick__()
+    with self.connection:
+      self.connection.executemany( "INSERT OR IGNORE INTO entries (digest, last_used) VALUES (?, ?)",
+                                   [ (buffer(digest), now) for digest in digests ] )
+      self.connection.executemany( "UPDATE entries SET last_used = ? WHERE digest = ?",
+                                   [ (now, buffer(digest)) for digest in digests ] )
+      self.connection.executemany(
+        "INSERT OR REPLACE INTO feature_values (digest, feature, version, value) VALUES (?, ?, ?, ?)",
+        [ (buffer(digest), name, FEATURE_VERSIONS[name], None if numpy.isnan(value) else float(value))
+          for digest, row in zip(digests, matrix) for name, value in zip(features, row) ] )
+
+    if self.max_entries is not None: self.evict(self.max_entries)
+
+  def evict(self, max_entries):
+    """Removes the least recently used tags until at most max_entries remain. Returns the number removed"""
+    excess = len(self) - max_entries
+    if excess <= 0: return 0
+
+    with self.connection:
+      self.connection.execute( "DELETE FROM entries WHERE digest IN "
+                               "(SELECT digest FROM entries ORDER BY last_used, rowid LIMIT ?)", (excess,) )
+    return excess
+
+  def invalidate_feature(self, name):
+    """Drops every cached value of the named feature, e.g. after fixing a bug without bumping its version"""
+    check_features([name])
+    with self.connection:
+      self.connection.execute("DELETE FROM feature_values WHERE feature = ?", (name,))
@@ -0,0 +1,201 @@
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+
+import numpy
+
+from corpus import Corpus
+from cache import FeatureCache
+from features import DEFAULT_FEATURES, FEATURES
+import profiling
+
+FORMATS = ('csv', 'jsonl', 'npz', 'parquet')
+STREAMING_FORMATS = ('csv', 'jsonl')
+
+def expand_paths(patterns):
+  """Returns the sorted, de-duplicated files matching the patterns, taking every .gml file from a directory"""
+  paths = set()
+  for pattern in patterns:
+    if os.path.isdir(pattern): pattern = os.path.join(pattern, "*.gml")
+    paths.update( path for path in glob.glob(pattern) if os.path.isfile(path) )
+
+  return sorted(paths)
+
+def _value(value):
+  return None if numpy.isnan(value) else float(value)
+
+class CSVWriter:
+  """Writes a header row, then a row of path and features per file. NaN features are left empty"""
+
+  def __init__(self, output, features):
+    self.writer = csv.writer(output, lineterminator="\n")
+    self.writer.writerow( ("path",) + tuple(features) )
+
+  def write(self, paths, matrix):
+    for path, row in zip(paths, matrix):
+      self.writer.writerow( [path] + [ "" if numpy.isnan(value) else repr(float(value)) for value in row ] )
+
+  def close(self):
+    pass
+
+class JSONLinesWriter:
+  """Writes one JSON object of path and features per line. NaN features become null"""
+
+  def __init__(self, output, features):
+    self.output = output
+    self.features = features
+
+  def write(self, paths, matrix):
+    for path, row in zip(paths, matrix):
+      record = dict( zip(self.features, map(_value, row)) )
+      record['path'] = path
+      self.output.write( json.dumps(record, sort_keys=True) + "\n" )
+
+  def close(self):
+    pass
+
+class NPZWriter:
+  """Collects the feature rows and writes paths, features and the matrix to one .npz archive on close"""
+
+  def __init__(self, output, features):
+    self.output = output
+    self.features = features
+    self.paths = []
+    self.rows = []
+
+  def write(self, paths, matrix):
+    self.paths.extend(paths)
+    self.rows.append(matrix)
+
+  def close(self):
+    matrix = numpy.concatenate(self.rows) if self.rows else numpy.empty((0, len(self.features)))
+    numpy.savez(self.output, paths=numpy.array(self.paths), features=numpy.array(self.features), matrix=matrix)
+
+class ParquetWriter:
+  """Writes a row group of path and feature columns per batch of results. Needs pyarrow"""
+
+  def __init__(self, output, features):
+    import pyarrow
+    import pyarrow.parquet
+
+    self.pyarrow = pyarrow
+    self.features = features
+    fields = [ pyarrow.field("path", pyarrow.string()) ] + [ pyarrow.field(name, pyarrow.float64()) for name in features ]
+    self.schema = pyarrow.schema(fields)
+    self.writer = pyarrow.parquet.ParquetWriter(output, self.schema)
+
+  def write(self, paths, matrix):
+    columns = [ self.pyarrow.array(list(paths), type=self.pyarrow.string()) ]
+    columns += [ self.pyarrow.array(matrix[:, column], type=self.pyarrow.float64(), from_pandas=True)
+                 for column in xrange(len(self.features)) ]
+    self.writer.write_table( self.pyarrow.Table.from_arrays(columns, schema=self.schema) )
+
+  def close(self):
+    self.writer.close()
+
+WRITERS = { 'csv': CSVWriter, 'jsonl': JSONLinesWriter, 'npz': NPZWriter, 'parquet': ParquetWriter }
+
+def parse_arguments(argv=None):
+  parser = argparse.ArgumentParser(
+    prog="gml-analyze",
+    description="Computes features for GML tags and writes one row per file, streaming results as they finish. "
+                "Rows come out in completion order, not input order; with --cache, files that are fully "
+                "cached come first.")
+
+  parser.add_argument("inputs", nargs="*", metavar="PATH",
+                      help="GML files, directories of .gml files or glob patterns")
+  parser.add_argument("-f", "--features", default=",".join(DEFAULT_FEATURES),
+                      help="comma-separated features to compute (default: all)")
+  parser.add_argument("-o", "--output", default="-",
+                      help="file to write to, or - for standard output (the default)")
+  parser.add_argument("--format", choices=FORMATS,
+                      help="output format (default: from the output's extension, otherwise csv)")
+  parser.add_argument("-j", "--workers", type=int, default=None,
+                      help="worker processes (default: one per CPU)")
+  parser.add_argument("--chunk-size", type=int, default=64,
+                      help="files handed to a worker at a time (default: 64)")
+  parser.add_argument("--prefetch", type=int, metavar="N",
+                      help="read files on N threads ahead of parsing, for slow or networked storage")
+  parser.add_argument("--cache", metavar="PATH",
+                      help="SQLite feature cache; only missing or stale features are computed")
+  parser.add_argument("--profile", action="store_true",
+                      help="print time spent per feature and the slowest files to standard error")
+  parser.add_argument("--trace", metavar="PATH",
+                      help="write a Chrome trace of parsing and feature spans to PATH")
+  parser.add_argument("--list-features", action="store_true",
+                      help="print the available features and exit")
+
+  arguments = parser.parse_args(argv)
+
+  if arguments.format is None:
+    extension = os.path.splitext(arguments.output)[1].lstrip(".").lower()
+    arguments.format = extension if extension in FORMATS else 'csv'
+
+  arguments.features = tuple( name.strip() for name in arguments.features.split(",") if name.strip() )
+
+  if arguments.list_features: return arguments
+
+  unknown = [ name for name in arguments.features if name not in FEATURES ]
+  if unknown: parser.error("unknown features: %s" % ", ".join(unknown))
+  if not arguments.features: parser.error("no features given")
+  if not arguments.inputs: parser.error("no input paths given")
+  if arguments.chunk_size < 1: parser.error("--chunk-size must be at least 1")
+  if arguments.prefetch is not None and arguments.prefetch < 1: parser.error("--prefetch must be at least 1")
+  if arguments.output == "-" and arguments.format not in STREAMING_FORMATS:
+    parser.error("%s output must be written to a file with --output" % arguments.format)
+
+  return arguments
+
+def main(argv=None):
+  """Entry point of the gml-analyze command. Returns 1 if any file failed to parse, otherwise 0"""
+  arguments = parse_arguments(argv)
+
+  if arguments.list_features:
+    for name in DEFAULT_FEATURES:
+      print name
+    return 0
+
+  profiler = profiling.enable() if arguments.profile or arguments.trace else None
+  cache = FeatureCache(arguments.cache) if arguments.cache else None
+  corpus = Corpus( expand_paths(arguments.inputs), arguments.features, arguments.workers, arguments.chunk_size, cache, arguments.prefetch )
+
+  output = sys.stdout if arguments.output == "-" else open(arguments.output, "wb")
+  try:
+    writer = WRITERS[arguments.format](output, arguments.features)
+
+    if cache is None:
+      chunks = ( (xrange(start, start + len(matrix)), matrix, chunk_errors) for start, matrix, chunk_errors in corpus.iter_chunks() )
+    else:
+      chunks = corpus.iter_cached_chunks()
+
+    errors = {}
+    for indices, matrix, chunk_errors in chunks:
+      writer.write( [ corpus.paths[index] for index in indices ], matrix )
+      output.flush()
+      errors.update( (corpus.paths[index], error) for index, error in chunk_errors.items() )
+
+    writer.close()
+  finally:
+    if output is not sys.stdout: output.close()
+    if cache is not None: cache.close()
+    if profiler is not None: profiling.disable()
+
+  for path in sorted(errors):
+    sys.stderr.write( "%s: %s\n" % (path, errors[path].strip().splitlines()[-1]) )
+
+  if arguments.profile:
+    sys.stderr.write( profiler.summary() + "\n\nslowest files:\n" )
+    for path, seconds, points in profiler.slowest_tags():
+      sys.stderr.write( "%10.3f s %10d points  %s\n" % (seconds, points, path) )
+
+  if arguments.profile and corpus.reader_statistics is not None:
+    sys.stderr.write( "\nprefetching reader:\n" )
+    for key, value in sorted( corpus.reader_statistics.items() ):
+      sys.stderr.write( "%20s %s\n" % (key, value) )
+
+  if arguments.trace: profiler.write_chrome_trace(arguments.trace)
+
+  return 1 if errors else 0
@@ -0,0 +1,242 @@
+import glob
+import hashlib
+import os
+import threading
+import traceback
+from multiprocessing import Pool, cpu_count
+
+import numpy
+
+from tag import Tag
+from features import DEFAULT_FEATURES, check_features, feature_vector
+from reader import PrefetchingReader
+import profiling
+
+def analyze_file(path, features=DEFAULT_FEATURES):
+  """Parses the GML file at path and returns its feature vector"""
+  with open(path, "rb") as gml_file:
+    return analyze_gml(path, gml_file.read(), features)
+
+def analyze_gml(path, gml, features=DEFAULT_FEATURES):
+  """Parses GML read from path and returns its feature vector. While profiling, spans are labelled with path"""
+  profiling.set_label(path)
+  try:
+    return feature_vector(Tag.fromGML(gml, keep_gml=False), features)
+  finally:
+    profiling.set_label(None)
+
+def file_digest(path):
+  """Returns the SHA-1 digest of the file's contents, the key tags are cached under"""
+  digest = hashlib.sha1()
+  with open(path, "rb") as gml_file:
+    for block in iter(lambda: gml_file.read(1 << 16), ""):
+      digest.update(block)
+
+  return digest.digest()
+
+def analyze_chunk(task):
+  """
+  Worker entry point. Given (start, paths, features), returns (start, matrix, errors) where matrix holds
+  one feature row per path and errors maps the index of every file that failed to its traceback.
+  Failed rows are left as NaN. Paths may also be (path, data, error) entries from a PrefetchingReader,
+  whose contents have already been read.
+  """
+  start, paths, features = task
+
+  matrix = numpy.empty((len(paths), len(features)))
+  matrix.fill(numpy.nan)
+  errors = {}
+
+  for index, entry in enumerate(paths):
+    try:
+      if isinstance(entry, tuple):
+        path, gml, error = entry
+        if error is not None:
+          errors[start + index] = error
+          continue
+
+        matrix[index] = analyze_gml(path, gml, features)
+      else:
+        matrix[index] = analyze_file(entry, features)
+    except Exception:
+      errors[start + index] = traceback.format_exc()
+
+  return start, matrix, errors
+
+def analyze_chunk_profiled(task):
+  """Worker entry point while profiling. Returns (analyze_chunk(task), spans recorded in this worker)"""
+  profiling.enable()
+  try:
+    return analyze_chunk(task), profiling.active.spans
+  finally:
+    profiling.disable()
+
+class Corpus:
+  """
+  A collection of GML files whose features are computed across a pool of worker processes. Given a
+  FeatureCache, extract only computes the features that are missing or stale for each file's contents.
+
+  With prefetch set, files are read by that many threads in this process (see PrefetchingReader) and
+  their contents handed to the parser, so reads from slow storage overlap with parsing. The reader's
+  statistics from the latest run are kept in reader_statistics.
+  """
+
+  def __init__(self, paths, features=DEFAULT_FEATURES, workers=None, chunk_size=64, cache=None, prefetch=None):
+    check_features(features)
+    if chunk_size < 1: raise ValueError("Chunk size must be at least 1")
+    if prefetch is not None and prefetch < 1: raise ValueError("Prefetch must be at least 1 concurrent read")
+
+    self.paths = list(paths)
+    self.features = tuple(features)
+    self.workers = workers if workers is not None else cpu_count()
+    self.chunk_size = chunk_size
+    self.cache = cache
+    self.prefetch = prefetch
+    self.reader_statistics = None
+
+  @staticmethod
+  def fromGlob(*patterns, **options):
+    """Returns a corpus of every file matching the given glob patterns, in sorted order"""
+    paths = sorted( set( path for pattern in patterns for path in glob.glob(pattern) ) )
+    return Corpus(paths, **options)
+
+  @staticmethod
+  def fromDirectory(directory, **options):
+    """Returns a corpus of every .gml file in the directory"""
+    return Corpus.fromGlob(os.path.join(directory, "*.gml"), **options)
+
+  def __len__(self):
+    return len(self.paths)
+
+  def iter_chunks(self):
+    """
+    Yields (start, matrix, errors) for each chunk of files as soon as it finishes, in completion order.
+    Rows of matrix correspond to self.paths[start:start + len(matrix)]. The cache is not consulted.
+    """
+    return self.__map_chunks__(self.paths, self.features)
+
+  def __map_chunks__(self, paths, features):
+    chunks = (len(paths) + self.chunk_size - 1) // self.chunk_size
+    parallel = self.workers > 1 and chunks > 1
+
+    # Prefetched chunks are built as reads finish; limit how many wait for a worker so reading stays bounded
+    slots = threading.Semaphore(2 * self.workers) if parallel and self.prefetch else None
+    tasks = self.__prefetched_tasks__(paths, features, slots) if self.prefetch else \
+            ( (start, paths[start:start + self.chunk_size], features) for start in xrange(0, len(paths), self.chunk_size) )
+
+    if not parallel:
+      for task in tasks:
+        yield analyze_chunk(task)
+      return
+
+    profiler = profiling.active
+    pool = Pool(min(self.workers, chunks))
+    try:
+      if profiler is None:
+        for result in pool.imap_unordered(analyze_chunk, tasks):
+          if slots is not None: slots.release()
+          yield result
+      else:
+        for result, spans in pool.imap_unordered(analyze_chunk_profiled, tasks):
+          if slots is not None: slots.release()
+          profiler.merge(spans)
+          yield result
+      pool.close()
+    finally:
+      pool.terminate()
+      pool.join()
+
+  def __prefetched_tasks__(self, paths, features, slots):
+    """Yields chunk tasks holding (path, data, error) entries as a PrefetchingReader delivers them"""
+    reader = PrefetchingReader(paths, self.prefetch)
+    chunk, start = [], 0
+
+    try:
+      for entry in reader:
+        chunk.append(entry)
+        if len(chunk) < self.chunk_size: continue
+
+        if slots is not None: slots.acquire()
+        yield start, chunk, features
+        chunk, start = [], start + len(chunk)
+
+      if chunk:
+        if slots is not None: slots.acquire()
+        yield start, chunk, features
+    finally:
+      self.reader_statistics = reader.statistics()
+
+  def extract(self):
+    """
+    Returns (matrix, errors) where matrix is an (n_files, n_features) array whose rows follow
+    self.paths, and errors maps the path of every file that failed to its traceback.
+    """
+    if self.cache is not None: return self.__extract_cached__()
+
+    matrix = numpy.empty((len(self.paths), len(self.features)))
+    errors = {}
+
+    for start, chunk, chunk_errors in self.iter_chunks():
+      matrix[start:start + len(chunk)] = chunk
+      errors.update( (self.paths[index], error) for index, error in chunk_errors.items() )
+
+    return matrix, errors
+
+  def __extract_cached__(self):
+    """Fills the matrix from the cache, computing and storing only the missing values"""
+    matrix = numpy.empty((len(self.paths), len(self.features)))
+    errors = {}
+
+    for indices, rows, chunk_errors in self.iter_cached_chunks():
+      matrix[indices] = rows
+      errors.update( (self.paths[index], error) for index, error in chunk_errors.items() )
+
+    return matrix, errors
+
+  def iter_cached_chunks(self):
+    """
+    Yields (indices, matrix, errors) in completion order, where rows of matrix correspond to the paths at
+    indices and errors maps the index of every file that failed to its traceback. Files whose features
+    are all cached, along with those that can't be read, come first in one chunk; the rest follow chunk
+    by chunk as their missing features are computed and stored in the cache.
+    """
+    if self.cache is None: raise ValueError("Corpus has no cache")
+
+    digests, errors = {}, {}
+    for index, path in enumerate(self.paths):
+      try:
+        digests[index] = file_digest(path)
+      except (IOError, OSError):
+        errors[index] = traceback.format_exc()
+
+    indices = sorted(digests)
+    cached_matrix, cached = self.cache.lookup([ digests[index] for index in indices ], self.features)
+    known = dict( (index, row) for row, index in enumerate(indices) )
+
+    # Files missing the same features are computed together, so each worker only extracts what's missing
+    complete, groups = sorted(errors), {}
+    for row, index in enumerate(indices):
+      if cached[row].all(): complete.append(index)
+      else: groups.setdefault( tuple(~cached[row]), [] ).append(index)
+
+    if complete:
+      matrix = numpy.empty((len(complete), len(self.features)))
+      matrix.fill(numpy.nan)
+      for row, index in enumerate(complete):
+        if index in known: matrix[row] = cached_matrix[known[index]]
+      yield complete, matrix, errors
+
+    for missing, group in groups.items():
+      columns = numpy.flatnonzero(missing)
+      features = tuple( self.features[column] for column in columns )
+      paths = [ self.paths[index] for index in group ]
+
+      for start, computed, chunk_errors in self.__map_chunks__(paths, features):
+        chunk = group[start:start + len(computed)]
+        matrix = cached_matrix[[ known[index] for index in chunk ]]
+        matrix[:, columns] = computed
+
+        succeeded = [ row for row in xrange(len(chunk)) if start + row not in chunk_errors ]
+        self.cache.store([ digests[chunk[row]] for row in succeeded ], features, computed[succeeded])
+
+        yield chunk, matrix, dict( (group[index], error) for index, error in chunk_errors.items() )
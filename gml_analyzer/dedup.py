@@ -0,0 +1,50 @@
+import hashlib
+from collections import defaultdict
+
+import numpy
+
+def fingerprint(tag, quantum=None, include_time=False):
+  """
+  Returns a digest identifying the tag's shape. Without a quantum this is the tag's exact content digest.
+  With one, every x and y (and t if include_time is set) is first rounded to a multiple of quantum, so
+  tags whose points differ by less than that still share a fingerprint.
+  """
+  if quantum is None: return tag.digest()
+
+  columns = 3 if include_time else 2
+  fingerprint = hashlib.sha1()
+
+  for stroke in tag.strokes:
+    quantized = numpy.round( stroke.coordinates[:, :columns] / quantum ).astype('<i8')
+    fingerprint.update( numpy.array(len(quantized), dtype='<i8') )
+    fingerprint.update( numpy.ascontiguousarray(quantized) )
+
+  return fingerprint.digest()
+
+def find_duplicates(tags, quantum=None, include_time=False):
+  """
+  Groups tags that share a fingerprint, in a single pass with no pairwise comparisons. Returns a list of
+  index lists, one for every fingerprint shared by two or more tags, each in ascending order.
+
+  Quantizing snaps points to a grid, so two near-duplicates can still be missed when their points fall
+  on opposite sides of a grid line.
+  """
+  groups = defaultdict(list)
+
+  for index, tag in enumerate(tags):
+    groups[ fingerprint(tag, quantum, include_time) ].append(index)
+
+  return sorted( group for group in groups.values() if len(group) > 1 )
+
+def unique(tags, quantum=None, include_time=False):
+  """Returns the tags with every duplicate after the first removed, preserving order"""
+  seen = set()
+  result = []
+
+  for tag in tags:
+    key = fingerprint(tag, quantum, include_time)
+    if key not in seen:
+      seen.add(key)
+      result.append(tag)
+
+  return result
\ No newline at end of file
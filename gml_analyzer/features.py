@@ -0,0 +1,95 @@
+import numpy
+
+from memo import memoized
+import profiling
+from profiling import timer
+
+class TagIntermediates(object):
+  """
+  Holds the values a tag's features are derived from, computing each one at most once. The flattened
+  stroke caches its own joint angles, so every angle feature of a tag shares a single pass.
+  """
+
+  def __init__(self, tag):
+    self.tag = tag
+
+  @property
+  @memoized
+  def flattened(self):
+    return self.tag.flattened_stroke()
+
+  @property
+  @memoized
+  def point_count(self):
+    return len(self.flattened.coordinates)
+
+  @property
+  @memoized
+  def distances_from_centroid(self):
+    return self.flattened.__distances_from_centroid__() if self.point_count else numpy.empty(0)
+
+def _centroid_statistic(statistic):
+  """Returns a feature applying statistic to the distances from the centroid, or NaN for a tag without points"""
+  return lambda tag: statistic(tag.distances_from_centroid) if tag.point_count else float('NaN')
+
+FEATURES = {
+  'stroke_count': lambda tag: len(tag.tag.strokes),
+  'point_count': lambda tag: tag.point_count,
+  'duration': lambda tag: tag.tag.duration,
+  'mean_distance_from_centroid': _centroid_statistic(numpy.mean),
+  'std_distance_from_centroid': _centroid_statistic(numpy.std),
+  'arc_length': lambda tag: tag.flattened.arc_length,
+  'aspect_ratio': lambda tag: tag.flattened.aspect_ratio,
+  'hull_area': lambda tag: tag.flattened.hull_area,
+  'self_intersection_count': lambda tag: tag.flattened.self_intersection_count,
+  'total_joint_angle': lambda tag: tag.flattened.total_joint_angle,
+  'total_absolute_joint_angle': lambda tag: tag.flattened.total_absolute_joint_angle,
+  'mean_joint_angle': lambda tag: tag.flattened.mean_joint_angle,
+  'mean_absolute_joint_angle': lambda tag: tag.flattened.mean_absolute_joint_angle,
+  'std_absolute_joint_angle': lambda tag: tag.flattened.std_absolute_joint_angle,
+  'total_corners': lambda tag: tag.flattened.total_corners,
+}
+
+DEFAULT_FEATURES = tuple(sorted(FEATURES))
+
+# Bump a feature's version whenever its implementation changes, so cached values computed by the old
+# code are treated as stale
+FEATURE_VERSIONS = dict( (name, 1) for name in FEATURES )
+
+def check_features(features):
+  """Raises a ValueError naming any features that are not in FEATURES"""
+  unknown = [ name for name in features if name not in FEATURES ]
+  if unknown: raise ValueError("Unknown features: %s" % ", ".join(unknown))
+
+def feature_vector(tag, features=DEFAULT_FEATURES):
+  """Returns a float array containing the named features of the tag, in order"""
+  intermediates = TagIntermediates(tag)
+  profiler = profiling.active
+  if profiler is None: return numpy.array([ FEATURES[name](intermediates) for name in features ], dtype=float)
+
+  # Intermediates are shared, so the first feature needing e.g. the joint angles is charged for them
+  vector, timings = numpy.empty(len(features)), []
+  for column, name in enumerate(features):
+    start = timer()
+    vector[column] = FEATURES[name](intermediates)
+    timings.append( (name, start, timer() - start) )
+
+  points = intermediates.point_count
+  for name, start, duration in timings:
+    profiler.record("feature/" + name, start, duration, points)
+
+  return vector
+
+def extract_features(tags, features=DEFAULT_FEATURES):
+  """
+  Returns an (n_tags, n_features) float array with one row of the named features per tag. Intermediates
+  shared between features, such as the flattened stroke and its joint angles, are computed once per tag.
+  """
+  check_features(features)
+  tags = list(tags)
+
+  matrix = numpy.empty((len(tags), len(features)))
+  for row, tag in enumerate(tags):
+    matrix[row] = feature_vector(tag, features)
+
+  return matrix
\ No newline at end of file
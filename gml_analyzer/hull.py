@@ -0,0 +1,102 @@
+import numpy
+
+PREFILTER_POINTS = 64
+
+# Directions whose extreme points bound the Akl-Toussaint octagon, in counterclockwise order
+OCTAGON_DIRECTIONS = numpy.array([ (0,-1), (1,-1), (1,0), (1,1), (0,1), (-1,1), (-1,0), (-1,-1) ], dtype=float)
+
+def convex_hull_indices(xy, prefilter=True):
+  """
+  Computes convex hull via the monotone chain algorithm, returning the indices of the hull's vertices
+  in the (N, 2) array xy in counterclockwise order, starting from the point with the lowest x and y.
+  Repeated points appear once, and collinear points along an edge are dropped.
+
+  Points are ordered with numpy.lexsort. With prefilter set, large inputs first drop every point
+  strictly inside the octagon spanned by the extreme points in eight directions (Akl-Toussaint), so
+  only points near the boundary reach the chain.
+
+  http://en.wikibooks.org/wiki/Algorithm_Implementation/Geometry/Convex_hull/Monotone_chain
+  """
+  xy = numpy.asarray(xy, dtype=float).reshape(-1, 2)
+  candidates = numpy.arange(len(xy))
+
+  if prefilter and len(xy) > PREFILTER_POINTS:
+    candidates = candidates[ ~_inside_octagon(xy) ]
+
+  order = candidates[ numpy.lexsort((xy[candidates, 1], xy[candidates, 0])) ]
+  if len(order) > 1:
+    ordered = xy[order]
+    order = order[ numpy.concatenate(([True], numpy.any(ordered[1:] != ordered[:-1], axis=1))) ]
+
+  if len(order) <= 1: return order
+
+  points = xy[order].tolist()
+
+  def cross(o, a, b):
+    return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+  def chain(indices):
+    hull = []
+    for index in indices:
+      while len(hull) >= 2 and cross(points[hull[-2]], points[hull[-1]], points[index]) <= 0:
+        hull.pop()
+      hull.append(index)
+    return hull
+
+  lower = chain( xrange(len(points)) )
+  upper = chain( reversed(xrange(len(points))) )
+
+  return order[ lower[:-1] + upper[:-1] ]
+
+def _inside_octagon(xy):
+  """Returns a mask of the points lying strictly inside the polygon through the extreme points in eight directions"""
+  extremes = numpy.argmax( numpy.dot(xy, OCTAGON_DIRECTIONS.T), axis=0 )
+  extremes = extremes[ numpy.concatenate(([True], extremes[1:] != extremes[:-1])) ]
+  if len(extremes) > 1 and extremes[0] == extremes[-1]: extremes = extremes[:-1]
+
+  if len(extremes) < 3: return numpy.zeros(len(xy), dtype=bool)
+
+  corners = xy[extremes]
+  edges = numpy.roll(corners, -1, axis=0) - corners
+
+  inside = numpy.ones(len(xy), dtype=bool)
+  for corner, edge in zip(corners, edges):
+    inside &= edge[0] * (xy[:, 1] - corner[1]) - edge[1] * (xy[:, 0] - corner[0]) > 0
+
+  return inside
+
+def polygon_area(xy):
+  """Returns the area enclosed by the polygon through the (N, 2) array xy, via the shoelace formula"""
+  xy = numpy.asarray(xy, dtype=float).reshape(-1, 2)
+  x, y = xy[:, 0], xy[:, 1]
+  return abs( numpy.dot(x, numpy.roll(y, -1)) - numpy.dot(y, numpy.roll(x, -1)) ) / 2
+
+def convex_hulls(coordinates, offsets, prefilter=True):
+  """
+  Computes the convex hull of every tag in a corpus stored back to back in one (N, 2) or (N, 3) array,
+  where tag k occupies rows offsets[k] to offsets[k + 1]. Returns (indices, hull_offsets): the hull
+  vertices of tag k are coordinates[ indices[hull_offsets[k]:hull_offsets[k + 1]] ].
+  """
+  xy = numpy.asarray(coordinates)[:, :2]
+  hulls = [ start + convex_hull_indices(xy[start:end], prefilter) for start, end in zip(offsets[:-1], offsets[1:]) ]
+  hull_offsets = numpy.cumsum([0] + map(len, hulls))
+
+  indices = numpy.concatenate(hulls) if hulls else numpy.empty(0, dtype=int)
+  return indices.astype(int), hull_offsets
+
+def hull_areas(coordinates, offsets, prefilter=True):
+  """Returns an array with the convex hull area of every tag stored as in convex_hulls"""
+  xy = numpy.asarray(coordinates)[:, :2]
+  indices, hull_offsets = convex_hulls(xy, offsets, prefilter)
+
+  if not len(indices): return numpy.zeros(len(hull_offsets) - 1)
+
+  # Shoelace terms for every hull edge, each hull closing back onto its own first vertex
+  hull = xy[indices]
+  owner = numpy.repeat(numpy.arange(len(hull_offsets) - 1), numpy.diff(hull_offsets))
+  nonempty = numpy.diff(hull_offsets) > 0
+  following = numpy.arange(1, len(hull) + 1)
+  following[ hull_offsets[1:][nonempty] - 1 ] = hull_offsets[:-1][nonempty]
+  terms = hull[:, 0] * hull[following, 1] - hull[:, 1] * hull[following, 0]
+
+  return numpy.abs( numpy.bincount(owner, weights=terms, minlength=len(hull_offsets) - 1) ) / 2
\ No newline at end of file
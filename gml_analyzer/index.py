@@ -0,0 +1,161 @@
+import numpy
+
+try:
+  from scipy.spatial import cKDTree
+except ImportError:
+  cKDTree = None
+
+from features import DEFAULT_FEATURES, check_features, extract_features
+
+class FeatureIndex:
+  """
+  A nearest-neighbour index over tag feature vectors, for "find tags that look like this one" queries.
+
+  Vectors are z-score normalized per feature so no single feature dominates the distance, and missing
+  (NaN) features are treated as average. The bulk of the vectors live in a KD-tree (scipy's cKDTree)
+  while newly added ones are searched by brute force until they grow past rebuild_fraction of the
+  index, at which point the normalization and tree are rebuilt over everything. Removed vectors are
+  only marked, and skipped by queries, until they too grow past rebuild_fraction of the index. Without
+  scipy every query is a vectorized brute-force search.
+  """
+
+  def __init__(self, features=DEFAULT_FEATURES, rebuild_fraction=0.1):
+    check_features(features)
+
+    self.features = tuple(features)
+    self.rebuild_fraction = rebuild_fraction
+    self.keys = []
+    self.vectors = numpy.empty((0, len(self.features)))
+    self.removed = numpy.zeros(0, dtype=bool)
+    self.positions = {}
+    self.mean = numpy.zeros(len(self.features))
+    self.scale = numpy.ones(len(self.features))
+    self.tree = None
+    self.indexed = 0
+
+  def __len__(self):
+    return len(self.keys) - int( numpy.count_nonzero(self.removed) )
+
+  def add(self, keys, vectors):
+    """Adds one feature vector per key, rebuilding the tree once enough vectors are waiting outside it"""
+    vectors = numpy.asarray(vectors, dtype=float).reshape(-1, len(self.features))
+    keys = list(keys)
+    if len(keys) != len(vectors): raise ValueError("Every vector needs exactly one key")
+
+    for position, key in enumerate(keys, len(self.keys)):
+      self.positions.setdefault(key, []).append(position)
+
+    self.keys.extend(keys)
+    self.vectors = numpy.concatenate((self.vectors, vectors))
+    self.removed = numpy.concatenate((self.removed, numpy.zeros(len(keys), dtype=bool)))
+
+    if len(self.keys) - self.indexed > self.rebuild_fraction * max(self.indexed, 1):
+      self.rebuild()
+
+  def add_tags(self, keys, tags):
+    """Extracts the index's features from the tags and adds them under the given keys"""
+    self.add(keys, extract_features(tags, self.features))
+
+  def remove(self, keys):
+    """
+    Removes every vector added under any of the keys and returns how many there were. Removed vectors
+    are dropped for good by the next rebuild, which happens once enough of them have piled up.
+    """
+    removed = 0
+    for key in set(keys):
+      positions = self.positions.pop(key, [])
+      self.removed[positions] = True
+      removed += len(positions)
+
+    if removed and numpy.count_nonzero(self.removed) > self.rebuild_fraction * max(self.indexed, 1):
+      self.rebuild()
+
+    return removed
+
+  def rebuild(self):
+    """Drops removed vectors, refits the normalization to the rest and rebuilds the tree over all of them"""
+    if self.removed.any():
+      self.keys = [ key for key, removed in zip(self.keys, self.removed) if not removed ]
+      self.vectors = self.vectors[~self.removed]
+      self.removed = numpy.zeros(len(self.keys), dtype=bool)
+
+      self.positions = {}
+      for position, key in enumerate(self.keys):
+        self.positions.setdefault(key, []).append(position)
+
+    finite = numpy.ma.masked_invalid(self.vectors)
+    self.mean = finite.mean(axis=0).filled(0) if len(self) else numpy.zeros(len(self.features))
+    self.scale = finite.std(axis=0).filled(0) if len(self) else numpy.zeros(len(self.features))
+    self.scale[ self.scale == 0 ] = 1
+
+    self.indexed = len(self)
+    self.tree = cKDTree( self.__normalize__(self.vectors) ) if cKDTree is not None and len(self) else None
+
+  def __normalize__(self, vectors):
+    normalized = (vectors - self.mean) / self.scale
+    normalized[ numpy.isnan(normalized) ] = 0
+    return normalized
+
+  def __brute_force__(self, start, point):
+    """Returns the indices and distances of every vector from start onwards that the tree doesn't cover"""
+    indices = start + numpy.flatnonzero(~self.removed[start:])
+    distances = numpy.sqrt( ((self.__normalize__(self.vectors[indices]) - point) ** 2).sum(axis=1) )
+    return indices, distances
+
+  def query(self, vector, k=10):
+    """Returns (keys, distances) of the k vectors nearest to the given feature vector, nearest first"""
+    point = self.__normalize__( numpy.asarray(vector, dtype=float).reshape(len(self.features)) )
+    start = self.indexed if self.tree is not None else 0
+
+    indices, distances = self.__brute_force__(start, point)
+
+    if self.tree is not None and k > 0:
+      # Ask for enough extra neighbours that k remain after skipping removed ones
+      extra = numpy.count_nonzero(self.removed[:self.indexed])
+      tree_distances, tree_indices = self.tree.query(point, k=min(k + extra, self.indexed))
+      tree_distances, tree_indices = numpy.atleast_1d(tree_distances), numpy.atleast_1d(tree_indices)
+      live = ~self.removed[tree_indices]
+      indices = numpy.concatenate((tree_indices[live], indices))
+      distances = numpy.concatenate((tree_distances[live], distances))
+
+    nearest = numpy.argsort(distances, kind='mergesort')[:k]
+    return [ self.keys[index] for index in indices[nearest] ], distances[nearest]
+
+  def query_radius(self, vector, radius):
+    """Returns (keys, distances) of every vector within radius of the given feature vector, nearest first"""
+    point = self.__normalize__( numpy.asarray(vector, dtype=float).reshape(len(self.features)) )
+    start = self.indexed if self.tree is not None else 0
+
+    indices, distances = self.__brute_force__(start, point)
+    within = distances <= radius
+    indices, distances = indices[within], distances[within]
+
+    if self.tree is not None:
+      tree_indices = numpy.array(self.tree.query_ball_point(point, radius), dtype=int)
+      tree_indices = tree_indices[ ~self.removed[tree_indices] ]
+      tree_distances = numpy.sqrt( ((self.__normalize__(self.vectors[tree_indices]) - point) ** 2).sum(axis=1) )
+      indices = numpy.concatenate((tree_indices, indices))
+      distances = numpy.concatenate((tree_distances, distances))
+
+    nearest = numpy.argsort(distances, kind='mergesort')
+    return [ self.keys[index] for index in indices[nearest] ], distances[nearest]
+
+  def save(self, path):
+    """
+    Writes the index's keys, raw vectors and settings to an .npz file at path. Keys are stored as
+    text, byte strings being decoded as UTF-8, so the file can be read back without unpickling.
+    """
+    keys = [ key.decode("utf-8") if isinstance(key, str) else unicode(key)
+             for key, removed in zip(self.keys, self.removed) if not removed ]
+    numpy.savez(path, keys=numpy.array(keys, dtype=unicode), vectors=self.vectors[~self.removed],
+                features=numpy.array(self.features), rebuild_fraction=self.rebuild_fraction)
+
+  @staticmethod
+  def load(path):
+    """Reads an index written by save and rebuilds its tree. Keys come back as unicode strings"""
+    data = numpy.load(path, allow_pickle=False)
+
+    index = FeatureIndex( tuple( map(str, data['features']) ), float(data['rebuild_fraction']) )
+    index.add( map(unicode, data['keys']), data['vectors'] )
+
+    return index
\ No newline at end of file
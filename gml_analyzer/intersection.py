@@ -0,0 +1,169 @@
+import numpy
+
+BRUTE_FORCE_SEGMENTS = 128
+LONG_SEGMENT_CELLS = 64
+BLOCK_PAIRS = 1 << 16
+
+def self_intersection_count(xy):
+  """
+  Returns the number of places where the polyline through the (N, 2) array xy crosses itself.
+  
+  Segments are treated as half-open, covering their start point but not their end point (the last
+  segment keeps both). A crossing through a shared vertex is therefore counted once, consecutive
+  segments never cross each other, and an endpoint lying inside another segment counts as a crossing.
+  Collinear segments cross when they overlap.
+  
+  Long polylines are bucketed into a uniform grid so that only segments sharing a cell are tested,
+  a block of candidate pairs at a time; short ones test every pair at once.
+  """
+  starts, ends, closed = _segments(xy)
+  count = len(starts)
+
+  if count < 2: return 0
+
+  if count <= BRUTE_FORCE_SEGMENTS:
+    blocks = [ numpy.triu_indices(count, 1) ]
+  else:
+    blocks = _candidate_pairs(starts, ends)
+
+  return sum( _count_intersecting(starts, ends, closed, i, j) for i, j in blocks )
+
+def intersection_count(xy, other_xy):
+  """Returns the number of places where the polylines through the two (N, 2) arrays cross each other"""
+  starts, ends, closed = _segments(xy)
+  other_starts, other_ends, other_closed = _segments(other_xy)
+  count, other_count = len(starts), len(other_starts)
+
+  if not count or not other_count: return 0
+
+  starts = numpy.concatenate((starts, other_starts))
+  ends = numpy.concatenate((ends, other_ends))
+  closed = numpy.concatenate((closed, other_closed))
+
+  if count + other_count <= BRUTE_FORCE_SEGMENTS:
+    i, j = numpy.meshgrid(numpy.arange(count), numpy.arange(count, count + other_count), indexing='ij')
+    return _count_intersecting(starts, ends, closed, i.ravel(), j.ravel())
+
+  total = 0
+  for i, j in _candidate_pairs(starts, ends):
+    across = (i < count) & (j >= count)
+    total += _count_intersecting(starts, ends, closed, i[across], j[across])
+
+  return total
+
+def _segments(xy):
+  """Returns the start points, end points and closed-end flags of the polyline's non-degenerate segments"""
+  xy = numpy.asarray(xy, dtype=float).reshape(-1, 2)
+
+  if len(xy):
+    moved = numpy.any(xy[1:] != xy[:-1], axis=1)
+    xy = xy[ numpy.concatenate(([True], moved)) ]
+
+  closed = numpy.zeros(max(len(xy) - 1, 0), dtype=bool)
+  closed[-1:] = True
+
+  return xy[:-1], xy[1:], closed
+
+def _candidate_pairs(starts, ends):
+  """
+  Yields blocks of index arrays (i, j) with i < j of segments whose bounding boxes overlap, each pair
+  exactly once and no block much larger than BLOCK_PAIRS, so memory stays bounded however many
+  segments share a cell.
+
+  Cells are sized per axis from the median segment extent, so a few long segments can't force the
+  grid down to a single cell. Segments that would still cover more than LONG_SEGMENT_CELLS cells are
+  kept out of the grid and checked against every other segment directly.
+  """
+  count = len(starts)
+  lower = numpy.minimum(starts, ends)
+  upper = numpy.maximum(starts, ends)
+
+  origin = lower.min(axis=0)
+  extent = upper.max(axis=0) - origin
+  cell_size = numpy.maximum(numpy.median(upper - lower, axis=0), extent / numpy.sqrt(count))
+  cell_size[ cell_size == 0 ] = 1
+
+  first_cell = numpy.floor((lower - origin) / cell_size).astype(numpy.int64)
+  last_cell = numpy.floor((upper - origin) / cell_size).astype(numpy.int64)
+  spans = last_cell - first_cell + 1
+  columns = last_cell[:, 0].max() + 1
+
+  def overlapping(i, j):
+    return numpy.all((lower[i] <= upper[j]) & (lower[j] <= upper[i]), axis=1)
+
+  cells_per_segment = spans[:, 0] * spans[:, 1]
+  long_segments = cells_per_segment > LONG_SEGMENT_CELLS
+
+  for index in numpy.flatnonzero(long_segments):
+    others = numpy.flatnonzero( ~long_segments | (numpy.arange(count) > index) )
+    others = others[ (others != index) & overlapping(numpy.repeat(index, len(others)), others) ]
+    yield numpy.minimum(index, others), numpy.maximum(index, others)
+
+  # Expand every other segment into one (cell, segment) entry per cell its bounding box covers
+  cells_per_segment[long_segments] = 0
+  segment = numpy.repeat(numpy.arange(count), cells_per_segment)
+  within = numpy.arange(len(segment)) - numpy.repeat(numpy.cumsum(cells_per_segment) - cells_per_segment, cells_per_segment)
+  cell_x = first_cell[segment, 0] + within % spans[segment, 0]
+  cell_y = first_cell[segment, 1] + within // spans[segment, 0]
+  cell = cell_y * columns + cell_x
+
+  order = numpy.lexsort((segment, cell))
+  cell, segment = cell[order], segment[order]
+
+  # Pair every entry with the entries after it in the same cell, in runs of entries with about
+  # BLOCK_PAIRS pairs between them
+  group_starts = numpy.flatnonzero(numpy.concatenate(([True], cell[1:] != cell[:-1])))
+  group_sizes = numpy.diff(numpy.append(group_starts, len(cell)))
+  partners = numpy.repeat(group_starts + group_sizes, group_sizes) - numpy.arange(len(cell)) - 1
+  pairs = numpy.cumsum(partners)
+  if not len(pairs) or not pairs[-1]: return
+
+  cuts = numpy.searchsorted(pairs, numpy.arange(BLOCK_PAIRS, pairs[-1], BLOCK_PAIRS))
+  cuts = numpy.unique(numpy.concatenate(([0], cuts, [len(cell)])))
+
+  for first, last in zip(cuts[:-1], cuts[1:]):
+    run = partners[first:last]
+    left = numpy.repeat(numpy.arange(first, last), run)
+    right = left + 1 + numpy.arange(len(left)) - numpy.repeat(numpy.cumsum(run) - run, run)
+    i, j = segment[left], segment[right]
+
+    # Segments sharing several cells are only reported from the cell holding their boxes' overlap's
+    # lowest corner
+    corner = numpy.floor((numpy.maximum(lower[i], lower[j]) - origin) / cell_size).astype(numpy.int64)
+    keep = overlapping(i, j) & (corner[:, 1] * columns + corner[:, 0] == cell[left])
+    yield i[keep], j[keep]
+
+def _orientation(o, a, b):
+  """Returns the sign of the cross product (a - o) x (b - o) for each row"""
+  return numpy.sign( (a[:, 0] - o[:, 0]) * (b[:, 1] - o[:, 1]) - (a[:, 1] - o[:, 1]) * (b[:, 0] - o[:, 0]) )
+
+def _count_intersecting(starts, ends, closed, i, j):
+  """Returns the number of segment pairs (i, j) that intersect"""
+  if not len(i): return 0
+
+  a, b, c, d = starts[i], ends[i], starts[j], ends[j]
+  b_closed, d_closed = closed[i], closed[j]
+
+  o1 = _orientation(a, b, c)
+  o2 = _orientation(a, b, d)
+  o3 = _orientation(c, d, a)
+  o4 = _orientation(c, d, b)
+
+  collinear = (o1 == 0) & (o2 == 0)
+
+  # Non-collinear segments meet at b only when b lies on cd's line, and at d only when d lies on ab's
+  crossing = ~collinear & (o1 * o2 <= 0) & (o3 * o4 <= 0)
+  crossing &= b_closed | (o4 != 0)
+  crossing &= d_closed | (o2 != 0)
+
+  # Collinear segments are compared as intervals along their dominant axis
+  axis = (numpy.abs(b[:, 1] - a[:, 1]) > numpy.abs(b[:, 0] - a[:, 0])).astype(int)
+  rows = numpy.arange(len(i))
+  ta, tb, tc, td = a[rows, axis], b[rows, axis], c[rows, axis], d[rows, axis]
+  low = numpy.maximum(numpy.minimum(ta, tb), numpy.minimum(tc, td))
+  high = numpy.minimum(numpy.maximum(ta, tb), numpy.maximum(tc, td))
+
+  touching = (high == low) & (b_closed | (low != tb)) & (d_closed | (low != td))
+  overlapping = collinear & ((high > low) | touching)
+
+  return int( numpy.count_nonzero(crossing | overlapping) )
\ No newline at end of file
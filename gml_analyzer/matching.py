@@ -0,0 +1,122 @@
+import heapq
+from math import sqrt, ceil
+
+import numpy
+
+def resample(coordinates, count):
+  """
+  Returns count points spaced equally along the arc length of the (N, 3) coordinates, from the first
+  point to the last. x, y and t are linearly interpolated between the original points.
+  """
+  coordinates = numpy.asarray(coordinates, dtype=float).reshape(-1, 3)
+  if not len(coordinates): raise ValueError("Cannot resample a stroke without points")
+  if count < 1: raise ValueError("Must resample to at least one point")
+
+  deltas = numpy.diff(coordinates[:, :2], axis=0)
+  lengths = numpy.hypot(deltas[:, 0], deltas[:, 1])
+  distances = numpy.concatenate(([0], numpy.cumsum(lengths)))
+
+  if distances[-1] == 0: return numpy.repeat(coordinates[:1], count, axis=0)
+
+  # Drop repeated points so the distances numpy.interp looks up are strictly increasing
+  moved = numpy.concatenate(([True], lengths > 0))
+  distances, coordinates = distances[moved], coordinates[moved]
+
+  targets = numpy.linspace(0, distances[-1], count)
+  return numpy.column_stack([ numpy.interp(targets, distances, coordinates[:, column]) for column in xrange(3) ])
+
+def _weighted(sequence, time_weight):
+  """Returns the (N, 3) sequence with its t column scaled by time_weight, or just x and y if that is 0"""
+  sequence = numpy.asarray(sequence, dtype=float).reshape(-1, 3)
+  if not time_weight: return sequence[:, :2]
+
+  return sequence * (1, 1, time_weight)
+
+def euclidean_distance(a, b, time_weight=0):
+  """Returns the L2 distance between two resampled sequences of equal length"""
+  a, b = _weighted(a, time_weight), _weighted(b, time_weight)
+  if a.shape != b.shape: raise ValueError("Sequences must have the same length")
+
+  return sqrt( ((a - b) ** 2).sum() )
+
+def _radius(n, m, radius):
+  """Returns the Sakoe-Chiba band radius to use, defaulting to a tenth of the longer sequence"""
+  if radius is None: radius = max(n, m) // 10
+  return max( int(radius), int(ceil(float(max(n, m)) / min(n, m))) )
+
+def dtw_distance(a, b, radius=None, time_weight=1.0):
+  """
+  Returns the dynamic time warping distance between two (N, 3) sequences, with squared Euclidean
+  distance between points. Matches are confined to a Sakoe-Chiba band of the given radius around the
+  diagonal. The t column takes part in the distance scaled by time_weight; pass 0 to compare shape only.
+  """
+  a, b = _weighted(a, time_weight), _weighted(b, time_weight)
+  n, m = len(a), len(b)
+  if not n or not m: raise ValueError("Cannot compare sequences without points")
+
+  radius = _radius(n, m, radius)
+  infinity = float('inf')
+
+  # previous[j + 1] holds the cost of the best path ending at (i - 1, j); previous[0] is the origin
+  previous = [0.0] + [infinity] * m
+
+  for i in xrange(n):
+    center = i * (m - 1) // max(n - 1, 1)
+    low, high = max(0, center - radius), min(m, center + radius + 1)
+    costs = ((b[low:high] - a[i]) ** 2).sum(axis=1).tolist()
+
+    current = [infinity] * (m + 1)
+    left = infinity
+    for j in xrange(low, high):
+      left = current[j + 1] = costs[j - low] + min(previous[j], previous[j + 1], left)
+
+    previous = current
+
+  return sqrt(previous[m])
+
+def lb_keogh(query, candidates, radius=None, time_weight=1.0):
+  """
+  Returns the LB_Keogh lower bound on dtw_distance between the query and each of the (M, N, 3)
+  candidates, all resampled to the same length. The query's envelope is built once and every bound is
+  computed in one vectorized step.
+  """
+  query = _weighted(query, time_weight)
+  candidates = numpy.asarray(candidates, dtype=float).reshape(-1, 3)
+  candidates = _weighted(candidates, time_weight).reshape(-1, len(query), query.shape[1])
+  radius = _radius(len(query), len(query), radius)
+
+  upper, lower = query.copy(), query.copy()
+  for offset in xrange(1, radius + 1):
+    upper[:-offset] = numpy.maximum(upper[:-offset], query[offset:])
+    upper[offset:] = numpy.maximum(upper[offset:], query[:-offset])
+    lower[:-offset] = numpy.minimum(lower[:-offset], query[offset:])
+    lower[offset:] = numpy.minimum(lower[offset:], query[:-offset])
+
+  excess = numpy.maximum(candidates - upper, 0) + numpy.maximum(lower - candidates, 0)
+  return numpy.sqrt( (excess ** 2).sum(axis=(1, 2)) )
+
+def nearest(query, candidates, k=1, radius=None, time_weight=1.0):
+  """
+  Returns (indices, distances) of the k candidates with the smallest dtw_distance to the query, nearest
+  first. Candidates are visited in order of their LB_Keogh bound, and the search stops as soon as a
+  bound exceeds the k-th best distance found, so most candidates never need a full DTW. Asking for more
+  neighbours than there are candidates returns them all.
+  """
+  if k < 1: raise ValueError("At least one neighbour must be requested")
+
+  candidates = numpy.asarray(candidates, dtype=float)
+  k = min(k, len(candidates))
+  bounds = lb_keogh(query, candidates, radius, time_weight)
+  best = []
+
+  for index in numpy.argsort(bounds, kind='mergesort'):
+    if len(best) == k and bounds[index] >= -best[0][0]: break
+
+    distance = dtw_distance(query, candidates[index], radius, time_weight)
+    if len(best) < k:
+      heapq.heappush(best, (-distance, index))
+    elif distance < -best[0][0]:
+      heapq.heapreplace(best, (-distance, index))
+
+  best = sorted( (-distance, index) for distance, index in best )
+  return [ index for _, index in best ], [ distance for distance, _ in best ]
\ No newline at end of file
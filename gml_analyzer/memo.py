@@ -0,0 +1,39 @@
+import functools
+
+def memoized(method):
+  """
+  Caches the result of a method that takes no arguments on its instance, so it is only computed once.
+  Cached results live in the instance's _memo dictionary and are dropped by invalidate(instance).
+  """
+  name = method.__name__
+
+  @functools.wraps(method)
+  def wrapper(self):
+    memo = self.__dict__.setdefault('_memo', {})
+    if name not in memo: memo[name] = method(self)
+    return memo[name]
+
+  return wrapper
+
+def memoized_on(key):
+  """
+  Like memoized, for results that depend on the state of other objects: the cached result is only
+  reused while key(instance) returns the same value it did when the result was computed.
+  """
+  def decorator(method):
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self):
+      memo = self.__dict__.setdefault('_memo', {})
+      current = key(self)
+      if name not in memo or memo[name][0] != current: memo[name] = ( current, method(self) )
+      return memo[name][1]
+
+    return wrapper
+
+  return decorator
+
+def invalidate(instance):
+  """Drops every result memoized on the instance"""
+  instance.__dict__.pop('_memo', None)
\ No newline at end of file
@@ -0,0 +1,71 @@
+import numpy
+
+def ragged_bounds(coordinates, offsets):
+  """
+  Returns (low, scale) for every non-empty tag in a ragged (N, 3) coordinate array laid out as for
+  normalize_ragged: the tag's smallest x and y, and the length of its longer side, or 1 where all of its
+  points coincide.
+  """
+  coordinates = numpy.asarray(coordinates, dtype=float).reshape(-1, 3)
+  offsets = numpy.asarray(offsets, dtype=int)
+
+  lengths = numpy.diff(offsets)
+  starts = offsets[:-1][lengths > 0]
+  if not len(starts): return numpy.empty((0, 2)), numpy.empty(0)
+
+  # reduceat runs each reduction from one start to the next, so empty tags must not appear among the starts
+  xy = coordinates[offsets[0]:offsets[-1], :2]
+  low = numpy.minimum.reduceat(xy, starts - offsets[0])
+  scale = (numpy.maximum.reduceat(xy, starts - offsets[0]) - low).max(axis=1)
+  scale[ scale == 0 ] = 1
+
+  return low, scale
+
+def normalize_ragged(coordinates, offsets, out=None):
+  """
+  Scales many tags stored back to back in one (N, 3) coordinate array, where tag k occupies rows
+  offsets[k] to offsets[k + 1], so that each tag's x and y fall in the range 0..1. Both axes are divided
+  by the tag's longer side, keeping its aspect ratio, and t is copied unchanged. A tag whose points all
+  coincide is moved to the origin.
+
+  The result is written to out, which may be coordinates itself to normalize in place, or to a new
+  array when out is None. Returns out.
+  """
+  coordinates = numpy.asarray(coordinates, dtype=float).reshape(-1, 3)
+  offsets = numpy.asarray(offsets, dtype=int)
+  if out is None: out = numpy.empty_like(coordinates)
+  if out.shape != coordinates.shape: raise ValueError("Output buffer must have the same shape as the coordinates")
+
+  lengths = numpy.diff(offsets)
+  if not lengths.any(): return out
+
+  xy = coordinates[offsets[0]:offsets[-1], :2]
+  low, scale = ragged_bounds(coordinates, offsets)
+
+  owner = numpy.repeat(numpy.arange(len(low)), lengths[lengths > 0])
+  rows = slice(offsets[0], offsets[-1])
+  out[rows, 2] = coordinates[rows, 2]
+  out[rows, :2] = (xy - low[owner]) / scale[owner, numpy.newaxis]
+
+  return out
+
+def normalize_tags(tags, out=None):
+  """
+  Normalizes every tag into one (N, 3) buffer holding all of their points back to back, see
+  normalize_ragged. out may be a preallocated buffer with a row per point. Returns (out, offsets), where
+  offsets[k] is the first row of tag k.
+  """
+  tags = list(tags)
+  lengths = [ sum( len(stroke.coordinates) for stroke in tag.strokes ) for tag in tags ]
+  offsets = numpy.cumsum([0] + lengths)
+
+  if out is None: out = numpy.empty((offsets[-1], 3))
+  if out.shape != (offsets[-1], 3): raise ValueError("Output buffer needs one row of x, y and t per point")
+
+  row = 0
+  for tag in tags:
+    for stroke in tag.strokes:
+      out[row:row + len(stroke.coordinates)] = stroke.coordinates
+      row += len(stroke.coordinates)
+
+  return normalize_ragged(out, offsets, out), offsets
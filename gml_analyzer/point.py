@@ -1,70 +1,105 @@
-from math import sqrt, acos, degrees, copysign, pi
-from collections import namedtuple
-from numpy import ndarray, arccos, asarray, vdot, abs, linalg
+from math import sqrt, acos, copysign, pi
+
 import numpy
 
-class Point(ndarray):
-  
-  def __new__(klass, input_array, dtype=float):
-    if len(input_array) != 2: raise ValueError("Point must have two elements")
-    
-    return asarray(input_array, dtype=float).view(klass)
-  
-  def __eq__(self, other):
-    return numpy.equal(self, other).all()
-  
+class Point(tuple):
+  """
+  An immutable 2-D point of plain floats. Points compare equal to tuples of the same values and support
+  elementwise + and - with sequences of the same length, and * or / by a scalar. Scalar math never
+  touches numpy, since for two or three values its per-call overhead outweighs the arithmetic;
+  numpy.asarray(point) converts back to an array.
+  """
+
+  __slots__ = ()
+  size = 2
+
+  def __new__(klass, values):
+    values = values.tolist() if isinstance(values, numpy.ndarray) else values
+    point = tuple.__new__(klass, map(float, values))
+    if len(point) != klass.size: raise ValueError("%s must have %d elements" % (klass.__name__, klass.size))
+
+    return point
+
+  @classmethod
+  def fromRows(klass, rows):
+    """Returns a list of points, one per row of an (N, size) array, skipping per-point validation"""
+    return [ tuple.__new__(klass, row) for row in numpy.asarray(rows, dtype=float).tolist() ]
+
+  def __repr__(self):
+    return "%s(%s)" % ( type(self).__name__, ", ".join(map(repr, self)) )
+
+  def __operand__(self, other):
+    """Checks that other holds one value per coordinate, as + and - are elementwise"""
+    if not hasattr(other, '__len__'):
+      raise TypeError("%s can only be added to or subtracted from a sequence, not %s" % (type(self).__name__, type(other).__name__))
+    if len(other) != len(self):
+      raise ValueError("Cannot combine a %d-element %s with %d values" % (len(self), type(self).__name__, len(other)))
+
+    return other
+
+  def __add__(self, other):
+    return tuple.__new__( type(self), [ a + b for a, b in zip(self, self.__operand__(other)) ] )
+
+  def __sub__(self, other):
+    return tuple.__new__( type(self), [ a - b for a, b in zip(self, self.__operand__(other)) ] )
+
+  def __mul__(self, scalar):
+    return tuple.__new__( type(self), [ a * scalar for a in self ] )
+
+  __rmul__ = __mul__
+
+  def __div__(self, scalar):
+    return tuple.__new__( type(self), [ a / float(scalar) for a in self ] )
+
+  __truediv__ = __div__
+
+  def __neg__(self):
+    return tuple.__new__( type(self), [ -a for a in self ] )
+
   @property
   def x(self):
     return self[0]
-  
+
   @property
   def y(self):
     return self[1]
-  
+
+  @property
+  def xy(self):
+    return tuple.__new__( Point, self[:2] )
+
   def angle(a, b):
-    return arccos( vdot(a, b) / vabs(a) / vabs(b) )
-  
+    """Returns the unsigned angle between the two points taken as vectors from the origin"""
+    dot = sum( p * q for p, q in zip(a, b) )
+    norms = sqrt( sum( p * p for p in a ) ) * sqrt( sum( q * q for q in b ) )
+    return acos( max(-1.0, min(1.0, dot / norms)) )
+
   def joint_angle(A, C, B):
     a = C.distance(B)
     b = A.distance(C)
     c = B.distance(A)
-    
+
     if a == 0 or b == 0: return 0
-    
+
     def signed_area(p1, p2, p3):
       return (p2.x - p1.x)*(p3.y - p1.y) - (p2.y - p1.y)*(p3.x - p1.x)
-    
-    theta = pi - acos( (a**2 + b**2 - c**2) / (2.0 * a * b) )
-    
+
+    cosine = max( -1.0, min( 1.0, (a**2 + b**2 - c**2) / (2.0 * a * b) ) )
+    theta = pi - acos(cosine)
+
     return copysign(theta, signed_area(A,B,C))
-  
+
   def distance(a, b):
-    return linalg.norm(a - b)
+    return sqrt( sum( (p - q) ** 2 for p, q in zip(a, b) ) )
 
 Point.Zero = Point((0, 0))
 
 class PointXYT(Point):
-  
-  def __new__(klass, input_array):
-    if len(input_array) != 3: raise ValueError("PointXYT must have 3 elements")
-    
-    return asarray(input_array).view(klass)
-
-  def __eq__(self, other):
-    return numpy.equal(self, other).all()
+  """A Point that also carries the time t of its capture"""
 
-  @property
-  def x(self):
-    return self[0]
-
-  @property
-  def y(self):
-    return self[1]
+  __slots__ = ()
+  size = 3
 
   @property
   def t(self):
     return self[2]
-  
-  @property
-  def xy(self):
-    return Point( (self.x, self.y) )
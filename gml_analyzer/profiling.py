@@ -0,0 +1,99 @@
+import json
+import os
+from timeit import default_timer as timer
+
+# The profiler currently recording, or None. Instrumented code checks this once per call and takes its
+# uninstrumented path when it is None, so profiling costs next to nothing while disabled.
+active = None
+
+class Profiler:
+  """
+  Records timed spans of the parser and of each feature: their name, duration, the number of input
+  points, the label (usually a file path) of the tag being processed and the process they ran in.
+  """
+
+  def __init__(self):
+    self.spans = []
+    self.label = None
+
+  def record(self, name, start, duration, points=0):
+    """Records a span that started at start (a timer() value) and took duration seconds"""
+    self.spans.append( (name, self.label, start, duration, points, os.getpid()) )
+
+  def merge(self, spans):
+    """Adds spans recorded by another profiler, such as one running in a worker process"""
+    self.spans.extend(spans)
+
+  def statistics(self):
+    """Returns {name: (calls, total_seconds, max_seconds, points)} over every recorded span"""
+    statistics = {}
+    for name, _, _, duration, points, _ in self.spans:
+      calls, total, longest, total_points = statistics.get(name, (0, 0.0, 0.0, 0))
+      statistics[name] = (calls + 1, total + duration, max(longest, duration), total_points + points)
+
+    return statistics
+
+  def slowest_tags(self, count=10, name=None):
+    """
+    Returns up to count (label, seconds, points) tuples for the labels whose spans took longest in
+    total, slowest first. Given a name, only spans of that name count, e.g.
+    'feature/self_intersection_count' to find the captures that blow it up.
+    """
+    totals = {}
+    for span_name, label, _, duration, points, _ in self.spans:
+      if label is None or (name is not None and span_name != name): continue
+
+      seconds, most_points = totals.get(label, (0.0, 0))
+      totals[label] = (seconds + duration, max(most_points, points))
+
+    ranked = sorted( totals.items(), key=lambda item: item[1][0], reverse=True )[:count]
+    return [ (label, seconds, points) for label, (seconds, points) in ranked ]
+
+  def summary(self):
+    """Returns a text table of calls, total, mean and max time and time per point for every span name"""
+    lines = [ "%-40s %8s %10s %10s %10s %12s %10s" % ("name", "calls", "total s", "mean ms", "max ms", "points", "us/point") ]
+    statistics = self.statistics()
+
+    for name in sorted( statistics, key=lambda name: statistics[name][1], reverse=True ):
+      calls, total, longest, points = statistics[name]
+      per_point = "%.3f" % (total / points * 1e6) if points else "-"
+      lines.append( "%-40s %8d %10.3f %10.3f %10.3f %12d %10s" % (name, calls, total, total / calls * 1000, longest * 1000, points, per_point) )
+
+    return "\n".join(lines)
+
+  def chrome_trace(self):
+    """Returns the spans as a Chrome trace event dictionary, viewable in chrome://tracing or Perfetto"""
+    events = []
+    for name, label, start, duration, points, pid in self.spans:
+      events.append({
+        'name': name,
+        'cat': name.split("/")[0],
+        'ph': 'X',
+        'ts': start * 1e6,
+        'dur': duration * 1e6,
+        'pid': pid,
+        'tid': pid,
+        'args': { 'label': label, 'points': points },
+      })
+
+    return { 'traceEvents': events, 'displayTimeUnit': 'ms' }
+
+  def write_chrome_trace(self, path):
+    with open(path, "w") as trace:
+      json.dump(self.chrome_trace(), trace)
+
+def enable():
+  """Starts recording into a new profiler and returns it"""
+  global active
+  active = Profiler()
+  return active
+
+def disable():
+  """Stops recording and returns the profiler that was recording, if any"""
+  global active
+  profiler, active = active, None
+  return profiler
+
+def set_label(label):
+  """Labels the spans recorded from now on, typically with the path of the file being analyzed"""
+  if active is not None: active.label = label
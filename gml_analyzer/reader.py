@@ -0,0 +1,115 @@
+import collections
+import threading
+import traceback
+from Queue import Queue
+
+from profiling import timer
+
+class PrefetchingReader:
+  """
+  Reads files on a pool of threads ahead of the code consuming them, so waiting on slow storage such as
+  a network filesystem overlaps with parsing. Iterating yields (path, data, error) in the order of
+  paths: data is the file's contents, or None with error holding the traceback if the read failed.
+
+  At most concurrency reads are in flight at once, and at most queue_size files are read ahead of the
+  consumer. statistics() reports how often the consumer had to wait and how full the queue was, for
+  tuning both numbers to the storage.
+  """
+
+  def __init__(self, paths, concurrency=8, queue_size=32):
+    if concurrency < 1 or queue_size < 1: raise ValueError("Concurrency and queue size must be at least 1")
+
+    self.paths = paths
+    self.concurrency = concurrency
+    self.queue_size = max(queue_size, concurrency)
+
+    self.files = 0
+    self.bytes = 0
+    self.read_seconds = 0.0
+    self.stall_seconds = 0.0
+    self.stalls = 0
+    self.depth_total = 0
+    self.depth_max = 0
+    self.ready = 0
+    self.lock = threading.Lock()
+
+  def __read__(self, requests):
+    """Worker thread: reads requested files into their slots until it receives None"""
+    while True:
+      slot = requests.get()
+      if slot is None: return
+
+      start = timer()
+      try:
+        with open(slot['path'], "rb") as source:
+          slot['data'] = source.read()
+      except (IOError, OSError):
+        slot['error'] = traceback.format_exc()
+
+      with self.lock:
+        self.read_seconds += timer() - start
+        self.bytes += len(slot['data'] or "")
+        self.ready += 1
+      slot['done'].set()
+
+  def __iter__(self):
+    # Files read but not yet consumed, kept as a running count so measuring the queue depth stays O(1)
+    self.ready = 0
+    requests = Queue()
+    threads = [ threading.Thread(target=self.__read__, args=(requests,)) for _ in xrange(self.concurrency) ]
+    for thread in threads:
+      thread.daemon = True
+      thread.start()
+
+    paths = iter(self.paths)
+    pending = collections.deque()
+
+    def request():
+      for path in paths:
+        slot = { 'path': path, 'data': None, 'error': None, 'done': threading.Event() }
+        pending.append(slot)
+        requests.put(slot)
+        return
+
+    try:
+      for _ in xrange(self.queue_size):
+        request()
+
+      while pending:
+        slot = pending.popleft()
+
+        with self.lock:
+          depth = self.ready
+        self.depth_total += depth
+        self.depth_max = max(self.depth_max, depth)
+
+        if not slot['done'].is_set():
+          start = timer()
+          slot['done'].wait()
+          self.stall_seconds += timer() - start
+          self.stalls += 1
+
+        with self.lock:
+          self.ready -= 1
+        self.files += 1
+        request()
+        yield slot['path'], slot['data'], slot['error']
+    finally:
+      for _ in threads:
+        requests.put(None)
+
+  def statistics(self):
+    """
+    Returns a dictionary describing the reads so far: files and bytes read, total read_seconds across
+    threads, stall_seconds the consumer spent waiting for the next file and how many stalls that took,
+    and the mean and max queue depth (files already read and waiting) seen by the consumer.
+    """
+    return {
+      'files': self.files,
+      'bytes': self.bytes,
+      'read_seconds': self.read_seconds,
+      'stall_seconds': self.stall_seconds,
+      'stalls': self.stalls,
+      'mean_queue_depth': float(self.depth_total) / self.files if self.files else 0.0,
+      'max_queue_depth': self.depth_max,
+    }
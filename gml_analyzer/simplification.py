@@ -0,0 +1,129 @@
+import heapq
+
+import numpy
+
+from features import DEFAULT_FEATURES, check_features, extract_features
+
+METHODS = ('rdp', 'visvalingam')
+
+def simplify(coordinates, tolerance, method='rdp'):
+  """
+  Returns the rows of a single stroke's (N, 3) coordinates that survive simplification, keeping their
+  timestamps. With 'rdp' tolerance is the largest distance a dropped point may lie from the simplified
+  line; with 'visvalingam' it is the smallest triangle area a kept point may contribute. The first and
+  last points are always kept.
+  """
+  coordinates = numpy.asarray(coordinates, dtype=float).reshape(-1, 3)
+
+  if method == 'rdp':
+    keep = rdp_mask(coordinates[:, :2], tolerance)
+  elif method == 'visvalingam':
+    keep = visvalingam_mask(coordinates[:, :2], tolerance)
+  else:
+    raise ValueError("Unknown simplification method %r, expected one of %s" % (method, ", ".join(METHODS)))
+
+  return coordinates[keep]
+
+def _segment_distances(xy, start, end):
+  """Returns the distances of the points in the (N, 2) array xy from the segment between start and end"""
+  direction = end - start
+  length = numpy.dot(direction, direction)
+  offsets = xy - start
+
+  if length == 0: return numpy.hypot(offsets[:, 0], offsets[:, 1])
+
+  along = numpy.clip( numpy.dot(offsets, direction) / length, 0, 1 )
+  nearest = offsets - along[:, numpy.newaxis] * direction
+  return numpy.hypot(nearest[:, 0], nearest[:, 1])
+
+def rdp_mask(xy, tolerance):
+  """
+  Returns a mask of the points the Ramer-Douglas-Peucker algorithm keeps from the (N, 2) array xy. Spans
+  are split on an explicit stack rather than by recursion, and each span's distances are one vectorized
+  step.
+  """
+  xy = numpy.asarray(xy, dtype=float).reshape(-1, 2)
+  keep = numpy.zeros(len(xy), dtype=bool)
+  keep[:1] = keep[-1:] = True
+
+  spans = [(0, len(xy) - 1)] if len(xy) > 2 else []
+  while spans:
+    first, last = spans.pop()
+    distances = _segment_distances(xy[first + 1:last], xy[first], xy[last])
+
+    farthest = int(numpy.argmax(distances))
+    if distances[farthest] <= tolerance: continue
+
+    split = first + 1 + farthest
+    keep[split] = True
+    if split - first > 1: spans.append((first, split))
+    if last - split > 1: spans.append((split, last))
+
+  return keep
+
+def _triangle_area(a, b, c):
+  return abs( (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]) ) / 2
+
+def visvalingam_mask(xy, tolerance):
+  """
+  Returns a mask of the points the Visvalingam-Whyatt algorithm keeps from the (N, 2) array xy: the point
+  forming the smallest triangle with its neighbours is dropped until every remaining triangle has an area
+  of at least tolerance. A point's area never falls below that of a neighbour dropped before it.
+  """
+  xy = numpy.asarray(xy, dtype=float).reshape(-1, 2)
+  count = len(xy)
+  keep = numpy.ones(count, dtype=bool)
+  if count <= 2: return keep
+
+  points = xy.tolist()
+  previous = range(-1, count - 1)
+  following = range(1, count + 1)
+
+  a, b, c = xy[:-2], xy[1:-1], xy[2:]
+  areas = [None] + (numpy.abs( (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]) ) / 2).tolist() + [None]
+
+  heap = [ (area, index) for index, area in enumerate(areas) if area is not None ]
+  heapq.heapify(heap)
+
+  while heap:
+    area, index = heapq.heappop(heap)
+    if not keep[index] or area != areas[index]: continue
+    if area >= tolerance: break
+
+    keep[index] = False
+    before, after = previous[index], following[index]
+    following[before], previous[after] = after, before
+
+    for neighbour in (before, after):
+      if neighbour == 0 or neighbour == count - 1: continue
+
+      areas[neighbour] = max( area, _triangle_area(points[previous[neighbour]], points[neighbour], points[following[neighbour]]) )
+      heapq.heappush(heap, (areas[neighbour], neighbour))
+
+  return keep
+
+def simplification_report(tags, tolerance, method='rdp', features=DEFAULT_FEATURES):
+  """
+  Measures how simplifying the tags changes their features. Returns (reduction, changes), where reduction
+  is the total number of points before simplification divided by the number after, and changes maps each
+  feature to the (mean, max) of its relative change |simplified - original| / |original| across tags.
+  Tags where a feature is zero or NaN before simplification are left out of that feature's statistics.
+  """
+  check_features(features)
+  tags = list(tags)
+  simplified = [ tag.simplified(tolerance, method) for tag in tags ]
+
+  before = sum( len(stroke.coordinates) for tag in tags for stroke in tag.strokes )
+  after = sum( len(stroke.coordinates) for tag in simplified for stroke in tag.strokes )
+  reduction = float(before) / after if after else float('NaN')
+
+  original = extract_features(tags, features)
+  changed = extract_features(simplified, features)
+
+  changes = {}
+  for column, name in enumerate(features):
+    valid = numpy.isfinite(original[:, column]) & (original[:, column] != 0)
+    relative = numpy.abs(changed[valid, column] - original[valid, column]) / numpy.abs(original[valid, column])
+    changes[name] = (relative.mean(), relative.max()) if len(relative) else (float('NaN'), float('NaN'))
+
+  return reduction, changes
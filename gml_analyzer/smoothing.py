@@ -0,0 +1,41 @@
+import numpy
+
+MINIMUM_POINTS = 7
+
+def smooth(coordinates, passes=10, width=3):
+  """Returns a smoothed copy of a single stroke's (N, 3) coordinates. See smooth_ragged"""
+  return smooth_ragged(coordinates, [0, len(coordinates)], passes, width)
+
+def smooth_ragged(coordinates, offsets, passes=10, width=3):
+  """
+  Returns a smoothed copy of many strokes stored back to back in one (N, 3) coordinate array, where
+  stroke k occupies rows offsets[k] to offsets[k + 1].
+  
+  Each pass replaces every point's x and y with the mean of the width points centred on it, leaving t
+  alone. The width // 2 points at each end of a stroke are pinned to their original values so a stroke
+  can't blur into itself, and strokes with fewer than MINIMUM_POINTS points are left untouched. Every
+  pass works on all strokes at once.
+  """
+  if width < 1 or width % 2 == 0: raise ValueError("Smoothing kernel width must be a positive odd number")
+
+  smoothed = numpy.array(coordinates, dtype=float).reshape(-1, 3)
+  offsets = numpy.asarray(offsets, dtype=int)
+  half = width // 2
+
+  lengths = numpy.diff(offsets)
+  stroke = numpy.repeat(numpy.arange(len(lengths)), lengths)
+  position = numpy.arange(offsets[0], offsets[-1]) - offsets[stroke]
+  length = lengths[stroke]
+
+  targets = offsets[0] + numpy.flatnonzero( (length >= max(MINIMUM_POINTS, width)) & (position >= half) & (position < length - half) )
+  if not len(targets): return smoothed
+
+  xy = smoothed[:, :2]
+  for _ in xrange(passes):
+    total = xy[targets - half]
+    for offset in xrange(1 - half, half + 1):
+      total = total + xy[targets + offset]
+
+    xy[targets] = total / float(width)
+
+  return smoothed
\ No newline at end of file
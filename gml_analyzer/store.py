@@ -0,0 +1,169 @@
+import glob
+import hashlib
+import json
+import os
+import traceback
+
+import numpy
+
+from tag import Tag
+from stroke import Stroke
+
+MAGIC = "GMLSTORE"
+VERSION = 1
+HEADER_SIZE = 1024
+ALIGNMENT = 64
+
+SECTIONS = ('coordinates', 'stroke_offsets', 'tag_offsets', 'hashes', 'name_offsets', 'names')
+
+def write_store(path, entries, dtype=numpy.float64):
+  """
+  Writes a binary tag store to path from an iterable of (filename, digest, tag) entries.
+
+  The file is a fixed-size header followed by aligned sections: every point as rows of x, y and t in the
+  given float dtype, the point offset of every stroke, the stroke offset of every tag, a SHA-1 digest
+  per tag and the tags' filenames. Points are streamed to disk as entries arrive; only the offset tables
+  and filenames are held in memory. The store only replaces path once it is complete. Returns the
+  number of tags written.
+  """
+  dtype = numpy.dtype(dtype).newbyteorder('<')
+  stroke_offsets = [0]
+  tag_offsets = [0]
+  digests = []
+  names = []
+
+  # Written beside the destination and renamed over it once complete, so a failure never leaves a corrupt store
+  temporary = path + ".tmp"
+  try:
+    with open(temporary, "wb") as store:
+      store.write("\0" * HEADER_SIZE)
+      sections = { 'coordinates': store.tell() }
+
+      for filename, digest, tag in entries:
+        if len(digest) != 20: raise ValueError("Tag digests must be 20-byte SHA-1 digests")
+
+        for stroke in tag.strokes:
+          store.write( numpy.ascontiguousarray(stroke.coordinates, dtype=dtype).tostring() )
+          stroke_offsets.append( stroke_offsets[-1] + len(stroke.coordinates) )
+
+        tag_offsets.append( len(stroke_offsets) - 1 )
+        digests.append(digest)
+        names.append( filename.encode("utf-8") if isinstance(filename, unicode) else filename )
+
+      name_offsets = numpy.cumsum([0] + map(len, names))
+
+      blobs = {
+        'stroke_offsets': numpy.array(stroke_offsets, dtype='<i8').tostring(),
+        'tag_offsets': numpy.array(tag_offsets, dtype='<i8').tostring(),
+        'hashes': "".join(digests),
+        'name_offsets': numpy.array(name_offsets, dtype='<i8').tostring(),
+        'names': "".join(names),
+      }
+
+      for name in SECTIONS[1:]:
+        store.write( "\0" * (-store.tell() % ALIGNMENT) )
+        sections[name] = store.tell()
+        store.write( blobs[name] )
+
+      header = json.dumps({
+        'version': VERSION,
+        'dtype': dtype.str,
+        'points': stroke_offsets[-1],
+        'strokes': len(stroke_offsets) - 1,
+        'tags': len(tag_offsets) - 1,
+        'sections': sections,
+      })
+      if len(MAGIC) + len(header) > HEADER_SIZE: raise ValueError("Store header is too large")
+
+      store.seek(0)
+      store.write(MAGIC + header)
+
+    os.rename(temporary, path)
+  except:
+    if os.path.exists(temporary): os.remove(temporary)
+    raise
+
+  return len(digests)
+
+def convert_directory(directory, path, dtype=numpy.float64):
+  """
+  Parses every .gml file in the directory and writes them to a tag store at path. Files that fail to
+  parse are skipped; returns (tags_written, errors) where errors maps each skipped filename to its
+  traceback.
+  """
+  errors = {}
+
+  def entries():
+    for filename in sorted( glob.glob( os.path.join(directory, "*.gml") ) ):
+      try:
+        with open(filename, "rb") as gml_file:
+          gml = gml_file.read()
+        tag = Tag.fromGML(gml, keep_gml=False)
+      except Exception:
+        errors[filename] = traceback.format_exc()
+        continue
+
+      yield os.path.basename(filename), hashlib.sha1(gml).digest(), tag
+
+  return write_store(path, entries(), dtype), errors
+
+class TagStore:
+  """
+  Read-only, memory-mapped access to a tag store written by write_store. Opening a store only reads
+  its header. Tags are built on demand, and with a float64 store their strokes are views straight
+  into the mapped file.
+  """
+
+  def __init__(self, path):
+    with open(path, "rb") as store:
+      header = store.read(HEADER_SIZE)
+
+    if not header.startswith(MAGIC): raise ValueError("%s is not a GML tag store" % path)
+
+    header = json.loads( header[len(MAGIC):].rstrip("\0") )
+    if header['version'] != VERSION: raise ValueError("Unsupported tag store version %r" % header['version'])
+
+    self.path = path
+    self.dtype = numpy.dtype(header['dtype'])
+
+    shapes = {
+      'coordinates': ( (header['points'], 3), self.dtype ),
+      'stroke_offsets': ( (header['strokes'] + 1,), numpy.dtype('<i8') ),
+      'tag_offsets': ( (header['tags'] + 1,), numpy.dtype('<i8') ),
+      'hashes': ( (header['tags'], 20), numpy.dtype('u1') ),
+      'name_offsets': ( (header['tags'] + 1,), numpy.dtype('<i8') ),
+    }
+
+    for name, (shape, dtype) in shapes.items():
+      setattr( self, name, self.__map__(header['sections'][name], shape, dtype) )
+
+    self.names = self.__map__( header['sections']['names'], (int(self.name_offsets[-1]),), numpy.dtype('u1') )
+
+  def __map__(self, offset, shape, dtype):
+    if not numpy.prod(shape): return numpy.empty(shape, dtype=dtype)
+    return numpy.memmap(self.path, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+  def __len__(self):
+    return len(self.tag_offsets) - 1
+
+  def __getitem__(self, index):
+    """Returns the tag at index, with strokes viewing the mapped coordinates"""
+    if index < 0: index += len(self)
+    if not 0 <= index < len(self): raise IndexError("Tag index out of range")
+
+    first, last = self.tag_offsets[index], self.tag_offsets[index + 1]
+    offsets = self.stroke_offsets[first:last + 1]
+
+    return Tag(*[ Stroke.fromArray(self.coordinates[start:end]) for start, end in zip(offsets[:-1], offsets[1:]) ])
+
+  def __iter__(self):
+    for index in xrange(len(self)):
+      yield self[index]
+
+  def filename(self, index):
+    """Returns the filename the tag at index was converted from"""
+    return self.names[ self.name_offsets[index]:self.name_offsets[index + 1] ].tostring().decode("utf-8")
+
+  def hexdigest(self, index):
+    """Returns the SHA-1 hex digest of the GML the tag at index was converted from"""
+    return self.hashes[index].tostring().encode("hex")
\ No newline at end of file
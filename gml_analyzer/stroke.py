@@ -1,32 +1,65 @@
-import copy
+import hashlib
+import itertools
 from numpy import std, mean
+import numpy
 import math
 
 from point import Point, PointXYT
+from memo import memoized, invalidate
+from intersection import self_intersection_count, intersection_count
+from smoothing import smooth
+from hull import convex_hull_indices, polygon_area
+from matching import resample
+from simplification import simplify
 
-from itertools import tee, izip
-def each_cons(iterable, length=2, overlap=0):
-    it = iter(iterable)
-    results = list(itertools.islice(it, length))
-    while len(results) == length:
-        yield results
-        results = results[length - overlap:]
-        results.extend(itertools.islice(it, length - overlap))
-    if results:
-        yield results
-def each_pair(iterable):
-    "s -> (s0,s1), (s1,s2), (s2, s3), ..."
-    a, b = tee(iterable)
-    next(b, None)
-    return izip(a, b)
+CORNER_THRESHOLD = math.pi / 6
 
-class Stroke:
-  
-  points = []
+# Stamps handed out by Stroke.invalidate, so tags can tell when one of their strokes has changed
+VERSIONS = itertools.count()
+
+class Stroke(object):
   
   def __init__(self, *points):
-    """Initialize a new stroke. All arguments are converted into PointXYT objects on init"""
-    self.points = map( PointXYT, points )
+    """Initialize a new stroke. All arguments are packed into a single (N, 3) array of x, y and t"""
+    self.coordinates = points
+  
+  @staticmethod
+  def fromArray(coordinates):
+    """Given an (N, 3) float array, returns a stroke backed by that array without copying it"""
+    stroke = Stroke.__new__(Stroke)
+    stroke.coordinates = coordinates
+    return stroke
+  
+  @property
+  def coordinates(self):
+    """Returns the (N, 3) array of x, y and t values backing the stroke"""
+    return self._coordinates
+  
+  @coordinates.setter
+  def coordinates(self, coordinates):
+    coordinates = numpy.asarray(coordinates, dtype=float)
+    if coordinates.size == 0: coordinates = coordinates.reshape(0, 3)
+    if coordinates.ndim != 2 or coordinates.shape[1] != 3: raise ValueError("Stroke points must have 3 elements")
+    
+    self._coordinates = coordinates
+    self.invalidate()
+  
+  def invalidate(self):
+    """
+    Drops the stroke's cached centroid, hull and joint angles, and those of any tag holding it. Call
+    this after editing coordinates in place
+    """
+    invalidate(self)
+    self.version = next(VERSIONS)
+  
+  @property
+  def points(self):
+    """Returns a list of PointXYT copies of the rows of the stroke's coordinate array"""
+    return PointXYT.fromRows(self._coordinates)
+  
+  @points.setter
+  def points(self, points):
+    self.coordinates = points
   
   def __eq__(self, other):
     """To reduce duplication, equality is based on hash"""
@@ -34,21 +67,28 @@ class Stroke:
   
   def __hash__(self):
     """If two stroke's points are equal, the strokes are equal"""
-    return hash( tuple( map(tuple, self.points) ) ) # OPTIMIZE: !!!
+    return hash( self.digest() )
+  
+  @memoized
+  def digest(self):
+    """Returns a SHA-1 digest of the stroke's raw coordinate bytes"""
+    coordinates = numpy.ascontiguousarray(self.coordinates, dtype='<f8') + 0.0 # folds -0.0 into 0.0
+    return hashlib.sha1(coordinates).digest()
   
   def __add__(a, b):
     """Adding two strokes concatenates their paths"""
-    return Stroke( *(a.points + b.points) )
+    return Stroke.fromArray( numpy.concatenate((a.coordinates, b.coordinates)) )
   
   def __repr__(self):
     return "<%s %r>" % (self.__class__, self.points)
   
   @property
+  @memoized
   def centroid(self):
     """Returns the strokes's center of mass or throws an error if the stroke is empty"""
-    if not self.points: raise ValueError("Centroid cannot be computed without points")
+    if not len(self.coordinates): raise ValueError("Centroid cannot be computed without points")
     
-    return sum( (point.xy for point in self.points), Point.Zero ) / len(self.points)
+    return Point( self.coordinates[:, :2].mean(axis=0) )
   
   @property
   def dimensions(self):
@@ -61,16 +101,10 @@ class Stroke:
   @property
   def bounds(self):
     """Returns a tuple containing the stroke's minimum and maximum point, or (Zero, Zero) if the stroke is empty"""
-    if not self.points: return ( Point.Zero, Point.Zero )
-    
-    minimum = Point((float("inf"), float("inf")))
-    maximum = Point((float("-inf"), float("-inf")))
+    if not len(self.coordinates): return ( Point.Zero, Point.Zero )
     
-    for point in self.points:
-      minimum = Point(( min(minimum.x, point.x), min(minimum.y, point.y) ))
-      maximum = Point(( max(maximum.x, point.x), max(maximum.y, point.y) ))
-    
-    return ( minimum, maximum )
+    xy = self.coordinates[:, :2]
+    return ( Point( xy.min(axis=0) ), Point( xy.max(axis=0) ) )
   
   @property
   def aspect_ratio(self):
@@ -81,36 +115,19 @@ class Stroke:
   @property
   def duration(self):
     """Returns the maximum time value for a point in the stroke"""
-    return max(point.t for point in self.points) if self.points else 0
+    return self.coordinates[:, 2].max() if len(self.coordinates) else 0
   
   @property
   def arc_length(self):
     """Returns the arc length of the stroke"""
-    return sum( p1.xy.distance( p2.xy ) for p1, p2 in each_pair(self.points) )
+    deltas = numpy.diff(self.coordinates[:, :2], axis=0)
+    return numpy.hypot(deltas[:, 0], deltas[:, 1]).sum()
   
   def __intersection_count__(self, other):
     """Returns the number of intersections of this stroke with another stroke"""
+    if other is self: return self_intersection_count(self.coordinates[:, :2])
     
-    def intersect(a, b, c, d):
-      """
-      Cleverly determine if two lines intersect using the orientation of their points.
-      
-      Algorithm fails with overlapping colinear segments, endpoints inside segments, and shared endpoints.
-      
-      http://www.bryceboe.com/2006/10/23/line-segment-intersection-algorithm/
-      """
-      def ccw(a, b, c):
-        return (c.y-a.y)*(b.x-a.x) > (b.y-a.y)*(c.x-a.x)
-      
-      return ccw(a,c,d) != ccw(b,c,d) and ccw(a,b,c) != ccw(a,b,d)
-    
-    count = 0
-    for a, b in each_pair(self.points):
-      for c, d in each_pair(other.points):
-        if( intersect( a, b, c, d ) ):
-          count += 1
-
-    return count / 2
+    return intersection_count(self.coordinates[:, :2], other.coordinates[:, :2])
   
   @property
   def self_intersection_count(self):
@@ -160,45 +177,58 @@ class Stroke:
   
   # def moments(self):
   
+  @memoized
   def __joint_angles__(self):
-    """Returns a tuple containing the angle (in radians) between every three points in the stroke"""
-    return tuple( a.xy.joint_angle( b.xy, c.xy ) for a, b, c in each_cons(self.points, 3) )
+    """
+    Returns an array containing the turning angle (in radians) at every interior point of the stroke,
+    positive for right turns. Joints with a zero-length segment have an angle of 0.
+    """
+    segments = numpy.diff(self.coordinates[:, :2], axis=0)
+    before, after = segments[:-1], segments[1:]
+    
+    cross = after[:, 0] * before[:, 1] - after[:, 1] * before[:, 0]
+    dot = (before * after).sum(axis=1)
+    
+    return numpy.arctan2(cross + 0.0, dot) # adding 0.0 turns -0.0 into 0.0 so folds come out as +pi
   
+  @memoized
   def __absolute_joint_angles__(self):
-    return tuple( abs(angle) for angle in self.__joint_angles__() )
+    return numpy.abs( self.__joint_angles__() )
   
   @property
   def total_joint_angle(self):
-    return sum( self.__joint_angles__() )
+    return self.__joint_angles__().sum()
   
   @property
   def total_absolute_joint_angle(self):
-    return sum( self.__absolute_joint_angles__() )
+    return self.__absolute_joint_angles__().sum()
   
   @property
   def mean_joint_angle(self):
     joint_angles = self.__joint_angles__()
-    return mean( joint_angles ) if joint_angles else 0
+    return joint_angles.mean() if len(joint_angles) else 0
 
   @property
   def mean_absolute_joint_angle(self):
     joint_angles = self.__absolute_joint_angles__()
-    return mean( joint_angles ) if joint_angles else 0
+    return joint_angles.mean() if len(joint_angles) else 0
   
   @property
   def std_absolute_joint_angle(self):
-    return std( self.__absolute_joint_angles__() )
+    joint_angles = self.__absolute_joint_angles__()
+    return joint_angles.std() if len(joint_angles) else 0
   
   @property
   def total_corners(self):
-    CORNER_THRESHOLD = math.pi / 6
-    return len([ angle for angle in self.__absolute_joint_angles__() if angle > CORNER_THRESHOLD ])
+    return numpy.count_nonzero( self.__absolute_joint_angles__() > CORNER_THRESHOLD )
   
+  @memoized
   def __distances_from_centroid__(self):
-    """Returns a tuple containing the distance of each point in the stroke from its centroid"""
-    centroid = self.centroid
+    """Returns an array containing the distance of each point in the stroke from its centroid"""
+    centroid = numpy.asarray(self.centroid)
+    offsets = self.coordinates[:, :2] - centroid
 
-    return tuple( centroid.distance( point.xy ) for point in self.points ) 
+    return numpy.hypot(offsets[:, 0], offsets[:, 1])
   
   @property
   def std_distance_from_centroid(self):
@@ -210,40 +240,21 @@ class Stroke:
     """Returns the average distance of each point from the centroid"""
     return mean( self.__distances_from_centroid__() )
   
+  @memoized
+  def __hull_indices__(self):
+    """Returns the indices of the stroke's convex hull vertices in counterclockwise order"""
+    return convex_hull_indices(self.coordinates[:, :2])
+  
   @property
+  @memoized
   def convex_hull(self):
-    """
-    Computes convex hull via the monotone chain algorithm.
-    
-    http://en.wikibooks.org/wiki/Algorithm_Implementation/Geometry/Convex_hull/Monotone_chain
-    """
-    
-    points = sorted( set( map(tuple, self.points) ) ) # OPTIMIZE: !!!
-    
-    if len(points) <= 1: return Stroke(*points)
-    
-    def cross(o, a, b):
-        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
-    
-    lower = []
-    for point in points:
-      while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
-          lower.pop()
-      lower.append(point)
-
-    upper = []
-    for point in reversed(points):
-      while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0: 
-        upper.pop()
-      upper.append(point)
-  
-    hull = lower[:-1] + upper[:-1]
-    return Stroke(*hull)
+    """Returns a stroke through the vertices of the stroke's convex hull, see hull.convex_hull_indices"""
+    return Stroke.fromArray( self.coordinates[ self.__hull_indices__() ] )
 
   @property
   def hull_area(self):
-    twice_area = sum( (p1.x * p2.y) - (p1.y * p2.x) for p1, p2 in each_pair(self.convex_hull.points) )
-    return abs( twice_area / 2 )
+    """Returns the area enclosed by the stroke's convex hull"""
+    return polygon_area( self.coordinates[ self.__hull_indices__(), :2 ] )
   
   # def compactness(self):
   #   return sqrt( self.arc_length ** 2 / hull_area ) if self.hull_area > 0 else 0
@@ -261,24 +272,14 @@ class Stroke:
   #   else:
   #     return 0
   
-  def smoothed(self):
-    """Returns a copy of the stroke with its points smoothed"""
-    
-    smoothed_stroke = copy.copy(self)
-    
-    if(len(self.points) < 7):
-      return smoothed_stroke
-
-    for _ in xrange(10):
+  def resampled(self, count):
+    """Returns a stroke of count points spaced equally along this stroke's arc length, see matching.resample"""
+    return Stroke.fromArray( resample(self.coordinates, count) )
   
-      smoothed_points = []
-      for p1, p2, p3 in each_cons(smoothed_stroke.points, 3):
-        smoothed = (p1.xy + p2.xy + p3.xy) / 3.0
-        smoothed_points.append( PointXYT((smoothed.x, smoothed.y, p2.t)) )
-      
-      # Pin endpoints to their original values so a stroke can't blur into itself
-      smoothed_with_pinned_endpoints = [smoothed_stroke.points[0]] + smoothed_points + [smoothed_stroke.points[-1]]
+  def simplified(self, tolerance, method='rdp'):
+    """Returns a stroke with the points that simplification.simplify keeps, timestamps included"""
+    return Stroke.fromArray( simplify(self.coordinates, tolerance, method) )
   
-      smoothed_stroke.points = smoothed_with_pinned_endpoints
-    
-    return smoothed_stroke
\ No newline at end of file
+  def smoothed(self, passes=10, width=3):
+    """Returns a copy of the stroke with its points smoothed by a moving average, see smoothing.smooth_ragged"""
+    return Stroke.fromArray( smooth(self.coordinates, passes, width) )
\ No newline at end of file
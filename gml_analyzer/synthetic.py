@@ -0,0 +1,53 @@
+import math
+import os
+
+import numpy
+
+def synthetic_coordinates(points=100, crossing_density=0.0, random=None):
+  """
+  Returns an (N, 3) array tracing a random pen path of the given number of points, one unit step apart
+  and one millisecond apart in t. crossing_density runs from 0 to 1 and sets how sharply the heading
+  may turn between steps: at 0 the path is a gentle arc that never crosses itself, and towards 1 it
+  becomes a random walk that crosses itself more and more often.
+  """
+  random = random if random is not None else numpy.random.RandomState()
+
+  turns = random.uniform(-1, 1, points) * math.pi * crossing_density
+  turns += 0.5 * math.pi / max(points, 1)
+  headings = numpy.cumsum(turns)
+
+  coordinates = numpy.empty((points, 3))
+  coordinates[:, 0] = numpy.cumsum(numpy.cos(headings))
+  coordinates[:, 1] = numpy.cumsum(numpy.sin(headings))
+  coordinates[:, 2] = numpy.arange(points) * 0.001
+
+  return coordinates
+
+def synthetic_gml(strokes=1, points=100, crossing_density=0.0, seed=None):
+  """Returns a GML document with a tag of the given number of strokes, each of points synthetic_coordinates"""
+  random = numpy.random.RandomState(seed)
+  parts = ["<gml><tag><drawing>"]
+  start = 0.0
+
+  for _ in xrange(strokes):
+    coordinates = synthetic_coordinates(points, crossing_density, random)
+    coordinates[:, 2] += start
+    start = coordinates[-1, 2] + 0.1 if points else start
+
+    parts.append("<stroke>")
+    parts.extend( "<pt><x>%r</x><y>%r</y><t>%r</t></pt>" % tuple(row) for row in coordinates.tolist() )
+    parts.append("</stroke>")
+
+  parts.append("</drawing></tag></gml>")
+  return "".join(parts)
+
+def write_corpus(directory, tags, strokes=1, points=100, crossing_density=0.0, seed=0):
+  """Writes tags synthetic GML files to the directory and returns their paths"""
+  paths = []
+  for index in xrange(tags):
+    path = os.path.join(directory, "synthetic%05d.gml" % index)
+    with open(path, "wb") as gml_file:
+      gml_file.write( synthetic_gml(strokes, points, crossing_density, seed + index) )
+    paths.append(path)
+
+  return paths
@@ -1,16 +1,35 @@
 from lxml import etree
-import copy
+import hashlib
+import numpy
 
 from stroke import Stroke
 from point import Point, PointXYT
+from normalization import normalize_ragged, ragged_bounds
+from scanner import scan_strokes
+from memo import memoized_on, invalidate
+import profiling
+from profiling import timer
 
-class Tag:
+class Tag(object):
 
-  strokes = ()
+  gml = None
 
   def __init__(self, *strokes):
     self.strokes = strokes
 
+  @property
+  def strokes(self):
+    return self._strokes
+
+  @strokes.setter
+  def strokes(self, strokes):
+    self._strokes = strokes
+    self.invalidate()
+
+  def invalidate(self):
+    """Drops the tag's cached flattened stroke. Edits to member strokes through their setters or invalidate are noticed without this"""
+    invalidate(self)
+
   def __eq__(self, other):
     """To reduce duplication, equality is based on hash"""
     return hash(self) == hash(other)
@@ -19,9 +38,19 @@ class Tag:
     """If two tag's strokes are equal, the tags are equal"""
     return hash( tuple(self.strokes) )
 
+  def digest(self):
+    """Returns a SHA-1 digest of the tag's strokes, built from their cached digests"""
+    return hashlib.sha1( "".join( stroke.digest() for stroke in self.strokes ) ).digest()
+
+  def __stroke_versions__(self):
+    return [ (id(stroke), stroke.version) for stroke in self.strokes ]
+
+  @memoized_on(__stroke_versions__)
   def flattened_stroke(self):
     """Returns a stroke containing of all tag's strokes concatenated together"""
-    return sum( (stroke for stroke in self.strokes), Stroke() )
+    if not self.strokes: return Stroke()
+
+    return Stroke.fromArray( numpy.concatenate([ stroke.coordinates for stroke in self.strokes ]) )
 
   @property
   def duration(self):
@@ -52,46 +81,156 @@ class Tag:
   def dimensions(self):
     return self.flattened_stroke().dimensions
 
-  def normalized(self):
-    """Returns a copy of the tag with strokes normalized in the range 0..1"""
-
-    normalized = copy.deepcopy(self)
-    
-    min_point, max_point = self.bounds
-    
-    width, height = self.dimensions
-    normalizing_range = max(width, height)
-
-    for stroke in normalized.strokes:
-      for point in stroke.points:
-        position = (point.xy - min_point) / normalizing_range # OPTIMIZE: we should cast instead
-        # normalized_point = PointXYT( (position.x, position.y, point.t) )
-        stroke.points.append(position)
-
-    return normalized
+  def resampled(self, count):
+    """Returns the tag's strokes joined end to end and resampled to count equally spaced points"""
+    return self.flattened_stroke().resampled(count)
+
+  def simplified(self, tolerance, method='rdp'):
+    """Returns a tag with every stroke simplified, see Stroke.simplified"""
+    return Tag(*[ stroke.simplified(tolerance, method) for stroke in self.strokes ])
+
+  def normalized(self, in_place=False):
+    """
+    Returns the tag with its points scaled into the range 0..1 by its longer side, keeping the aspect
+    ratio and t. By default this is a new tag whose strokes are views into one compact array; with
+    in_place set the tag's own coordinate arrays are rewritten and the tag itself is returned, which
+    raises ValueError for read-only strokes such as those of a TagStore.
+    """
+    strokes = [ stroke.coordinates for stroke in self.strokes ]
+    offsets = numpy.cumsum([0] + map(len, strokes))
+
+    if not in_place:
+      coordinates = numpy.concatenate(strokes) if strokes else numpy.empty((0, 3))
+      normalize_ragged(coordinates, [0, offsets[-1]], coordinates)
+      return Tag(*[ Stroke.fromArray(coordinates[start:end]) for start, end in zip(offsets[:-1], offsets[1:]) ])
+
+    if not all( coordinates.flags.writeable for coordinates in strokes ):
+      raise ValueError("Cannot normalize read-only coordinates in place, use normalized() for a copy")
+
+    if offsets[-1]:
+      (low,), (scale,) = ragged_bounds(numpy.concatenate(strokes), [0, offsets[-1]])
+      for stroke in self.strokes:
+        stroke.coordinates[:, :2] -= low
+        stroke.coordinates[:, :2] /= scale
+        stroke.invalidate()
+
+    self.invalidate()
+    return self
 
   @staticmethod
-  def fromGML(gml):
-    """Given a GML string, returns a tag object containing the GML's strokes."""
+  def fromGML(gml, keep_gml=True, fast=True):
+    """
+    Given a GML string, returns a tag object containing the GML's strokes. With fast set, documents in
+    the common simple layout are read by scanner.scan_strokes instead of walking an lxml tree.
+    """
+
+    profiler = profiling.active
+    if profiler is not None: start = timer()
 
     tag = Tag()
-    tag.gml = gml
+    if keep_gml: tag.gml = gml
+
+    scanned = scan_strokes(gml) if fast else None
 
-    root = etree.XML(gml)
-    strokes = []
+    if scanned is not None:
+      strokes = [ Stroke.fromArray(coordinates) for coordinates in scanned ]
+    else:
+      root = etree.XML(gml)
+      strokes = []
 
-    for stroke in root.findall(".//stroke"):
-      points = []
+      for stroke in root.findall(".//stroke"):
+        points = []
 
-      for point in stroke.findall("pt"):
-        x = float( point.find('x').text )
-        y = float( point.find('y').text )
-        t = point.find('t')
-        t = float( t.text ) if t is not None else 0
-        points.append( (x,y,t) )
+        for point in stroke.findall("pt"):
+          x = float( point.find('x').text )
+          y = float( point.find('y').text )
+          t = point.find('t')
+          t = float( t.text ) if t is not None else 0
+          points.append( (x,y,t) )
 
-      strokes.append( Stroke(*points) )
+        strokes.append( Stroke(*points) )
 
     tag.strokes = strokes
 
+    if profiler is not None:
+      profiler.record( "parse/fromGML", start, timer() - start, sum( len(stroke.coordinates) for stroke in strokes ) )
+
     return tag
+
+  @staticmethod
+  def iter_from_file(source, keep_gml=False):
+    """
+    Given a GML file path or file object, yields a tag for every <tag> element in it, or a single tag
+    for the whole document if it has none.
+    
+    The document is parsed incrementally and elements are cleared as soon as their points have been
+    copied out, so memory use is bounded by the largest tag rather than the whole file. Each tag's
+    strokes are views into one coordinate array. Pass keep_gml=True to also keep each tag's source
+    on its gml attribute, which requires holding that tag's elements until it ends.
+    """
+
+    buffer = CoordinateBuffer()
+    stroke_ends = []
+    found_tag = False
+
+    def finish_tag():
+      coordinates = buffer.take()
+      starts = [0] + stroke_ends[:-1]
+      strokes = [ Stroke.fromArray(coordinates[start:end]) for start, end in zip(starts, stroke_ends) ]
+      del stroke_ends[:]
+      return Tag(*strokes)
+
+    def release(element):
+      element.clear()
+      while element.getprevious() is not None:
+        del element.getparent()[0]
+
+    context = etree.iterparse(source, events=("end",), tag=("pt", "stroke", "tag"))
+
+    for _, element in context:
+      if element.tag == "pt":
+        # Like fromGML, only points directly inside a stroke count; others belong to header metadata
+        if element.getparent() is None or element.getparent().tag != "stroke": continue
+
+        t = element.find('t')
+        buffer.append( float( element.find('x').text ), float( element.find('y').text ), float( t.text ) if t is not None else 0 )
+        if not keep_gml: release(element)
+
+      elif element.tag == "stroke":
+        stroke_ends.append( len(buffer) )
+        if not keep_gml: release(element)
+
+      else:
+        found_tag = True
+        tag = finish_tag()
+        if keep_gml: tag.gml = etree.tostring(element)
+        release(element)
+        yield tag
+
+    if stroke_ends or not found_tag:
+      tag = finish_tag()
+      if keep_gml: tag.gml = etree.tostring(context.root)
+      yield tag
+
+class CoordinateBuffer:
+  """A growable (N, 3) array that points are appended to while parsing"""
+
+  def __init__(self, capacity=1024):
+    self.array = numpy.empty((capacity, 3))
+    self.length = 0
+
+  def __len__(self):
+    return self.length
+
+  def append(self, x, y, t):
+    if self.length == len(self.array):
+      self.array = numpy.resize(self.array, (2 * len(self.array), 3))
+
+    self.array[self.length] = (x, y, t)
+    self.length += 1
+
+  def take(self):
+    """Returns a compact copy of the appended points and empties the buffer"""
+    coordinates = self.array[:self.length].copy()
+    self.length = 0
+    return coordinates
\ No newline at end of file
@@ -0,0 +1,31 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+GML = "<gml><drawing><stroke>%s</stroke></drawing></gml>"
+POINT = "<pt><x>%d</x><y>%d</y><t>%d</t></pt>"
+
+def gml_document(points):
+  """Returns a one-stroke GML document through the given (x, y, t) points"""
+  return GML % "".join( POINT % tuple(point) for point in points )
+
+class GMLDirectoryTestCase(unittest.TestCase):
+  """A test case with a fresh temporary directory to write GML files to, removed after every test"""
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  def path(self, filename):
+    return os.path.join(self.directory, filename)
+
+  def write(self, filename, contents, mtime=None):
+    """Writes contents to filename in the directory, optionally setting its modification time, and returns its path"""
+    path = self.path(filename)
+    with open(path, "w") as gml_file:
+      gml_file.write(contents)
+    if mtime is not None: os.utime(path, (mtime, mtime))
+    return path
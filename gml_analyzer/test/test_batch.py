@@ -0,0 +1,89 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy
+from nose.tools import raises
+
+from gml_analyzer.batch import StrokeBatch, TagBatch
+from gml_analyzer.features import DEFAULT_FEATURES, extract_features
+from gml_analyzer.store import write_store, TagStore
+from gml_analyzer.stroke import Stroke
+from gml_analyzer.tag import Tag
+
+def random_tags(seed, count=30):
+  random = numpy.random.RandomState(seed)
+  tags = []
+  for _ in xrange(count):
+    lengths = random.randint(0, 12, size=random.randint(0, 4))
+    strokes = [ Stroke.fromArray( numpy.round(random.rand(length, 3) * 4) ) for length in lengths ]
+    tags.append( Tag(*strokes) )
+  return tags
+
+class StrokeBatchTests(unittest.TestCase):
+  
+  def setUp(self):
+    self.strokes = [ stroke for tag in random_tags(0) for stroke in tag.strokes ]
+    self.batch = StrokeBatch.fromStrokes(self.strokes)
+  
+  def test_metrics_match_strokes(self):
+    for name, plural in [ ("arc_length", "arc_lengths"), ("duration", "durations"), ("aspect_ratio", "aspect_ratios"),
+                          ("total_joint_angle", "total_joint_angles"), ("total_absolute_joint_angle", "total_absolute_joint_angles"),
+                          ("mean_joint_angle", "mean_joint_angles"), ("mean_absolute_joint_angle", "mean_absolute_joint_angles"),
+                          ("std_absolute_joint_angle", "std_absolute_joint_angles"), ("total_corners", "total_corners"),
+                          ("hull_area", "hull_areas"), ("self_intersection_count", "self_intersection_counts") ]:
+      expected = [ getattr(stroke, name) for stroke in self.strokes ]
+      numpy.testing.assert_allclose( getattr(self.batch, plural), expected, atol=1e-12, err_msg=name )
+  
+  def test_centroid_metrics_match_strokes(self):
+    nonempty = numpy.array([ len(stroke.coordinates) > 0 for stroke in self.strokes ])
+    strokes = [ stroke for stroke in self.strokes if len(stroke.coordinates) ]
+    
+    numpy.testing.assert_allclose( self.batch.centroids[nonempty], [ stroke.centroid for stroke in strokes ] )
+    numpy.testing.assert_allclose( self.batch.mean_distances_from_centroid[nonempty], [ stroke.mean_distance_from_centroid for stroke in strokes ] )
+    numpy.testing.assert_allclose( self.batch.std_distances_from_centroid[nonempty], [ stroke.std_distance_from_centroid for stroke in strokes ], atol=1e-12 )
+    self.assertTrue( numpy.isnan(self.batch.centroids[~nonempty]).all() )
+  
+  def test_bounds_match_strokes(self):
+    minimums, maximums = self.batch.bounds
+    numpy.testing.assert_array_equal( minimums, [ stroke.bounds[0] for stroke in self.strokes ] )
+    numpy.testing.assert_array_equal( maximums, [ stroke.bounds[1] for stroke in self.strokes ] )
+    numpy.testing.assert_array_equal( self.batch.dimensions, [ stroke.dimensions for stroke in self.strokes ] )
+  
+  def test_strokes_view_the_batch(self):
+    self.assertEqual( list(self.batch), self.strokes )
+    self.assertTrue( self.batch[-1].coordinates.base is not None )
+  
+  def test_empty_batch(self):
+    batch = StrokeBatch.fromStrokes([])
+    self.assertEqual( len(batch), 0 )
+    self.assertEqual( batch.arc_lengths.tolist(), [] )
+    self.assertEqual( batch.bounds[0].shape, (0, 2) )
+  
+  @raises(ValueError)
+  def test_decreasing_offsets(self):
+    StrokeBatch(numpy.zeros((3,3)), [0, 2, 1])
+
+class TagBatchTests(unittest.TestCase):
+  
+  def test_feature_matrix_matches_extract_features(self):
+    tags = random_tags(1, 60)
+    numpy.testing.assert_allclose( TagBatch.fromTags(tags).feature_matrix(), extract_features(tags), atol=1e-12 )
+  
+  def test_tags_view_the_batch(self):
+    tags = random_tags(2)
+    batch = TagBatch.fromTags(tags)
+    self.assertEqual( len(batch), len(tags) )
+    self.assertEqual( [ tag.strokes for tag in batch ], [ tag.strokes for tag in tags ] )
+  
+  def test_from_store(self):
+    directory = tempfile.mkdtemp()
+    try:
+      tags = random_tags(3, 10)
+      path = os.path.join(directory, "tags.store")
+      write_store(path, [ ("%d.gml" % i, "x" * 20, tag) for i, tag in enumerate(tags) ])
+      
+      batch = TagBatch.fromStore( TagStore(path) )
+      numpy.testing.assert_allclose( batch.feature_matrix(("arc_length", "duration")), extract_features(tags, ("arc_length", "duration")) )
+    finally:
+      shutil.rmtree(directory)
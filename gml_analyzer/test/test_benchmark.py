@@ -0,0 +1,39 @@
+import unittest
+import json
+
+from gml_analyzer.benchmark import BENCHMARKS, run_benchmarks, format_report
+from gml_analyzer.synthetic import synthetic_gml
+from gml_analyzer.tag import Tag
+
+class SyntheticTests(unittest.TestCase):
+  
+  def test_synthetic_gml_shape(self):
+    tag = Tag.fromGML( synthetic_gml(strokes=3, points=40, seed=1) )
+    self.assertEqual( [ len(stroke.coordinates) for stroke in tag.strokes ], [40, 40, 40] )
+    self.assertTrue( tag.strokes[1].coordinates[0, 2] > tag.strokes[0].coordinates[-1, 2] )
+  
+  def test_synthetic_gml_is_reproducible(self):
+    self.assertEqual( synthetic_gml(points=10, crossing_density=0.5, seed=3), synthetic_gml(points=10, crossing_density=0.5, seed=3) )
+  
+  def test_crossing_density(self):
+    counts = [ Tag.fromGML( synthetic_gml(points=300, crossing_density=density, seed=0) ).strokes[0].self_intersection_count
+               for density in (0, 1) ]
+    self.assertEqual( counts[0], 0 )
+    self.assertTrue( counts[1] > 10 )
+
+class BenchmarkTests(unittest.TestCase):
+  
+  def test_every_stroke_property_is_covered(self):
+    names = [ name for name, _ in BENCHMARKS ]
+    for name in ("stroke/arc_length", "stroke/convex_hull", "stroke/self_intersection_count", "stroke/smoothed", "parse/fromGML", "parse/lxml", "corpus/serial"):
+      self.assertTrue( name in names )
+  
+  def test_run_report(self):
+    config = { 'tags': 2, 'strokes': 2, 'points': 20, 'workers': 1 }
+    report = run_benchmarks(config, ["parse", "stroke/arc_length", "corpus/serial"], repeat=1, minimum_time=0, isolate=False)
+    
+    self.assertEqual( sorted(report['results']), ["corpus/serial", "parse/fromGML", "parse/lxml", "stroke/arc_length"] )
+    result = report['results']['parse/fromGML']
+    self.assertAlmostEqual( result['points_per_second'] / result['tags_per_second'], 40 )
+    self.assertEqual( json.loads(json.dumps(report))['config']['points'], 20 )
+    self.assertTrue( "speedup" in format_report(report, report) )
@@ -0,0 +1,69 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy
+from nose.tools import raises
+
+from gml_analyzer import features
+from gml_analyzer.cache import FeatureCache
+
+A, B, C = "a" * 20, "b" * 20, "c" * 20
+
+class FeatureCacheTests(unittest.TestCase):
+  
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.path = os.path.join(self.directory, "cache.sqlite")
+    self.cache = FeatureCache(self.path)
+  
+  def tearDown(self):
+    self.cache.close()
+    shutil.rmtree(self.directory)
+  
+  def test_missing_values(self):
+    matrix, cached = self.cache.lookup([A], ("point_count",))
+    self.assertTrue( numpy.isnan(matrix[0,0]) )
+    self.assertEqual( cached.tolist(), [[False]] )
+  
+  def test_store_and_lookup(self):
+    self.cache.store([A, B], ("point_count", "duration"), [[3, 1.5], [4, numpy.nan]])
+    matrix, cached = self.cache.lookup([B, C, A, B], ("duration", "point_count", "arc_length"))
+    numpy.testing.assert_array_equal( matrix, [[numpy.nan, 4, numpy.nan], [numpy.nan] * 3, [1.5, 3, numpy.nan], [numpy.nan, 4, numpy.nan]] )
+    self.assertEqual( cached.tolist(), [[True, True, False], [False] * 3, [True, True, False], [True, True, False]] )
+  
+  def test_persists(self):
+    self.cache.store([A], ("point_count",), [[3]])
+    self.cache.close()
+    self.cache = FeatureCache(self.path)
+    self.assertEqual( self.cache.lookup([A], ("point_count",))[0].tolist(), [[3]] )
+  
+  def test_stale_version(self):
+    self.cache.store([A], ("point_count", "duration"), [[3, 1]])
+    features.FEATURE_VERSIONS['point_count'] += 1
+    try:
+      self.assertEqual( self.cache.lookup([A], ("point_count", "duration"))[1].tolist(), [[False, True]] )
+      self.cache.store([A], ("point_count",), [[5]])
+      self.assertEqual( self.cache.lookup([A], ("point_count",))[0].tolist(), [[5]] )
+    finally:
+      features.FEATURE_VERSIONS['point_count'] -= 1
+  
+  def test_invalidate_feature(self):
+    self.cache.store([A, B], ("point_count", "duration"), [[3, 1], [4, 2]])
+    self.cache.invalidate_feature("duration")
+    self.assertEqual( self.cache.lookup([A, B], ("point_count", "duration"))[1].tolist(), [[True, False], [True, False]] )
+  
+  @raises(ValueError)
+  def test_invalidate_unknown_feature(self):
+    self.cache.invalidate_feature("not_a_feature")
+  
+  def test_evicts_least_recently_used(self):
+    cache = FeatureCache(self.path, max_entries=2)
+    cache.store([A], ("point_count",), [[1]])
+    cache.store([B], ("point_count",), [[2]])
+    cache.lookup([A], ("point_count",))
+    cache.store([C], ("point_count",), [[3]])
+    
+    self.assertEqual( len(cache), 2 )
+    self.assertEqual( cache.lookup([A, B, C], ("point_count",))[1].ravel().tolist(), [True, False, True] )
+    cache.close()
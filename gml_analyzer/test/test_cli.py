@@ -0,0 +1,88 @@
+import json
+import sys
+import numpy
+from StringIO import StringIO
+from nose.tools import raises
+
+from gml_analyzer.cli import main, expand_paths
+from gml_analyzer.test.helpers import GMLDirectoryTestCase, gml_document
+
+class CommandLineTests(GMLDirectoryTestCase):
+  
+  def setUp(self):
+    GMLDirectoryTestCase.setUp(self)
+    
+    for index in xrange(3):
+      self.write("tag%d.gml" % index, gml_document( (i, i, i) for i in xrange(index + 1) ))
+    
+    self.write("broken.gml", "<gml><drawing>")
+    self.stderr, sys.stderr = sys.stderr, StringIO()
+  
+  def tearDown(self):
+    sys.stderr = self.stderr
+    GMLDirectoryTestCase.tearDown(self)
+  
+  def run_main(self, *arguments):
+    return main( list(arguments) + ["--workers", "1"] )
+  
+  def test_expand_paths(self):
+    self.assertEqual( expand_paths([self.directory, self.path("tag1.gml"), self.path("tag*.gml")]),
+                      [ self.path(name) for name in ("broken.gml", "tag0.gml", "tag1.gml", "tag2.gml") ] )
+  
+  def test_csv(self):
+    output = self.path("features.csv")
+    self.assertEqual( self.run_main(self.path("tag*.gml"), "-f", "point_count,duration", "-o", output), 0 )
+    with open(output) as result:
+      self.assertEqual( result.read().splitlines(), [
+        "path,point_count,duration",
+        "%s,1.0,0.0" % self.path("tag0.gml"),
+        "%s,2.0,1.0" % self.path("tag1.gml"),
+        "%s,3.0,2.0" % self.path("tag2.gml"),
+      ] )
+  
+  def test_jsonl_reports_failures(self):
+    output = self.path("features.jsonl")
+    self.assertEqual( self.run_main(self.directory, "-f", "point_count", "-o", output, "--chunk-size", "1"), 1 )
+    with open(output) as result:
+      records = sorted( (json.loads(line) for line in result), key=lambda record: record['path'] )
+    
+    self.assertEqual( records[0], { 'path': self.path("broken.gml"), 'point_count': None } )
+    self.assertEqual( [ record['point_count'] for record in records[1:] ], [1, 2, 3] )
+    self.assertTrue( "broken.gml: XMLSyntaxError" in sys.stderr.getvalue() )
+  
+  def test_npz(self):
+    output = self.path("features.npz")
+    self.run_main(self.path("tag*.gml"), "-f", "point_count", "-o", output, "--chunk-size", "2")
+    data = numpy.load(output)
+    self.assertEqual( sorted(zip(data['paths'], data['matrix'][:, 0])), [ (self.path("tag%d.gml" % i), i + 1) for i in xrange(3) ] )
+    self.assertEqual( data['features'].tolist(), ["point_count"] )
+  
+  def test_cache(self):
+    output, cache = self.path("features.csv"), self.path("cache.sqlite")
+    for _ in xrange(2):
+      self.run_main(self.path("tag*.gml"), "-f", "point_count", "-o", output, "--cache", cache)
+      with open(output) as result:
+        self.assertEqual( result.read().splitlines()[1:], [ "%s,%d.0" % (self.path("tag%d.gml" % i), i + 1) for i in xrange(3) ] )
+  
+  def test_cache_writes_cached_rows_first(self):
+    output, cache = self.path("features.csv"), self.path("cache.sqlite")
+    self.run_main(self.path("tag[12].gml"), "-f", "point_count", "-o", output, "--cache", cache)
+    self.run_main(self.path("tag*.gml"), "-f", "point_count", "-o", output, "--cache", cache)
+    with open(output) as result:
+      self.assertEqual( result.read().splitlines()[1:], [ "%s,%d.0" % (self.path("tag%d.gml" % i), i + 1) for i in (1, 2, 0) ] )
+  
+  def test_profile_and_trace(self):
+    trace = self.path("trace.json")
+    self.run_main(self.path("tag*.gml"), "-f", "point_count", "-o", self.path("features.csv"), "--profile", "--trace", trace)
+    self.assertTrue( "feature/point_count" in sys.stderr.getvalue() )
+    self.assertTrue( self.path("tag2.gml") in sys.stderr.getvalue() )
+    with open(trace) as result:
+      self.assertEqual( len(json.load(result)['traceEvents']), 6 )
+  
+  @raises(SystemExit)
+  def test_unknown_feature(self):
+    self.run_main(self.directory, "-f", "not_a_feature")
+  
+  @raises(SystemExit)
+  def test_npz_needs_output_file(self):
+    self.run_main(self.directory, "--format", "npz")
@@ -0,0 +1,80 @@
+import os
+import numpy
+from nose.tools import raises
+
+from gml_analyzer.corpus import Corpus, file_digest
+from gml_analyzer.cache import FeatureCache
+from gml_analyzer.features import DEFAULT_FEATURES
+from gml_analyzer.test.helpers import GMLDirectoryTestCase, gml_document
+
+class CorpusTests(GMLDirectoryTestCase):
+  
+  def setUp(self):
+    GMLDirectoryTestCase.setUp(self)
+    
+    for index in xrange(5):
+      self.write("tag%d.gml" % index, gml_document( (i, i * index, i) for i in xrange(index + 1) ))
+    
+    self.write("broken.gml", "<gml><drawing>")
+  
+  def test_from_directory(self):
+    corpus = Corpus.fromDirectory(self.directory)
+    self.assertEqual( [ os.path.basename(path) for path in corpus.paths ], ["broken.gml"] + [ "tag%d.gml" % i for i in xrange(5) ] )
+  
+  @raises(ValueError)
+  def test_unknown_feature(self):
+    Corpus([], features=("not_a_feature",))
+  
+  def test_empty_corpus(self):
+    matrix, errors = Corpus([]).extract()
+    self.assertEqual( matrix.shape, (0, len(DEFAULT_FEATURES)) )
+    self.assertEqual( errors, {} )
+  
+  def test_extract(self):
+    corpus = Corpus.fromDirectory(self.directory, features=("point_count", "duration"), workers=1)
+    matrix, errors = corpus.extract()
+    self.assertEqual( matrix[1:].tolist(), [ [1,0], [2,1], [3,2], [4,3], [5,4] ] )
+  
+  def test_failed_file_does_not_stop_batch(self):
+    corpus = Corpus.fromDirectory(self.directory, features=("point_count",), workers=1)
+    matrix, errors = corpus.extract()
+    self.assertTrue( numpy.isnan(matrix[0,0]) )
+    self.assertEqual( errors.keys(), [corpus.paths[0]] )
+    self.assertTrue( "XMLSyntaxError" in errors[corpus.paths[0]] )
+  
+  def test_process_pool_matches_serial(self):
+    serial = Corpus.fromDirectory(self.directory, workers=1).extract()[0]
+    parallel = Corpus.fromDirectory(self.directory, workers=2, chunk_size=2).extract()[0]
+    numpy.testing.assert_array_equal( serial, parallel )
+  
+  def test_cached_extract_matches_uncached(self):
+    cache = FeatureCache(self.path("cache.sqlite"))
+    corpus = Corpus.fromDirectory(self.directory, workers=1, cache=cache)
+    uncached = Corpus.fromDirectory(self.directory, workers=1).extract()[0]
+    
+    for _ in xrange(2):
+      matrix, errors = corpus.extract()
+      numpy.testing.assert_array_equal( matrix, uncached )
+      self.assertEqual( errors.keys(), [corpus.paths[0]] )
+    
+    self.assertEqual( len(cache), 5 )
+  
+  def test_cached_extract_computes_only_missing(self):
+    cache = FeatureCache(self.path("cache.sqlite"))
+    corpus = Corpus.fromDirectory(self.directory, features=("point_count", "duration"), workers=1, cache=cache)
+    digest = file_digest(corpus.paths[1])
+    cache.store([digest], ("point_count",), [[42]])
+    
+    matrix, errors = corpus.extract()
+    self.assertEqual( matrix[1].tolist(), [42, 0] )
+    self.assertEqual( matrix[2].tolist(), [2, 1] )
+    self.assertEqual( cache.lookup([digest], ("duration",))[1].tolist(), [[True]] )
+  
+  def test_prefetching_matches_direct_reads(self):
+    direct = Corpus.fromDirectory(self.directory, workers=1).extract()
+    for workers in (1, 2):
+      corpus = Corpus.fromDirectory(self.directory, workers=workers, chunk_size=2, prefetch=3)
+      matrix, errors = corpus.extract()
+      numpy.testing.assert_array_equal( matrix, direct[0] )
+      self.assertEqual( errors.keys(), direct[1].keys() )
+      self.assertEqual( corpus.reader_statistics['files'], 6 )
@@ -0,0 +1,40 @@
+import unittest
+
+from gml_analyzer.dedup import fingerprint, find_duplicates, unique
+from gml_analyzer.tag import Tag
+from gml_analyzer.stroke import Stroke
+
+class DedupTests(unittest.TestCase):
+  
+  def setUp(self):
+    self.tags = [
+      Tag( Stroke((0,0,0),(1,1,1)) ),
+      Tag( Stroke((5,5,5)) ),
+      Tag( Stroke((0,0,0),(1,1,1)) ),
+      Tag( Stroke((0.01,0,0),(1,0.99,2)) ),
+      Tag( Stroke((0,0,0)), Stroke((1,1,1)) ),
+    ]
+  
+  def test_exact_fingerprint_is_digest(self):
+    self.assertEqual( fingerprint(self.tags[0]), self.tags[0].digest() )
+  
+  def test_stroke_boundaries_change_digest(self):
+    self.assertNotEqual( self.tags[0].digest(), self.tags[4].digest() )
+  
+  def test_negative_zero_digest(self):
+    self.assertEqual( Stroke((-0.0,0,0)).digest(), Stroke((0,0,0)).digest() )
+  
+  def test_exact_duplicates(self):
+    self.assertEqual( find_duplicates(self.tags), [[0,2]] )
+  
+  def test_quantized_duplicates(self):
+    self.assertEqual( find_duplicates(self.tags, quantum=0.1), [[0,2,3]] )
+  
+  def test_quantized_duplicates_with_time(self):
+    self.assertEqual( find_duplicates(self.tags, quantum=0.1, include_time=True), [[0,2]] )
+  
+  def test_unique(self):
+    self.assertEqual( unique(self.tags), [ self.tags[0], self.tags[1], self.tags[3], self.tags[4] ] )
+  
+  def test_no_duplicates(self):
+    self.assertEqual( find_duplicates([]), [] )
\ No newline at end of file
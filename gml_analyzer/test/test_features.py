@@ -0,0 +1,42 @@
+import unittest
+import math
+import numpy
+from nose.tools import raises
+
+from gml_analyzer.features import extract_features, feature_vector, TagIntermediates, DEFAULT_FEATURES
+from gml_analyzer.tag import Tag
+from gml_analyzer.stroke import Stroke
+
+class FeatureTests(unittest.TestCase):
+  
+  def setUp(self):
+    self.tag = Tag( Stroke((0,0,0),(3,0,1),(3,4,2)), Stroke((0,4,0)) )
+  
+  @raises(ValueError)
+  def test_unknown_feature(self):
+    extract_features([self.tag], ["not_a_feature"])
+  
+  def test_empty_tag_list(self):
+    self.assertEqual( extract_features([]).shape, (0, len(DEFAULT_FEATURES)) )
+  
+  def test_feature_matrix(self):
+    matrix = extract_features([self.tag, Tag(Stroke((0,0,0)))], ["stroke_count", "point_count", "arc_length", "hull_area"])
+    self.assertEqual( matrix.tolist(), [ [2,4,10,12], [1,1,0,0] ] )
+  
+  def test_features_match_tag_properties(self):
+    features = ["duration", "mean_distance_from_centroid", "std_distance_from_centroid", "aspect_ratio"]
+    flattened = self.tag.flattened_stroke()
+    expected = [ self.tag.duration, self.tag.mean_distance_from_centroid, self.tag.std_distance_from_centroid, flattened.aspect_ratio ]
+    numpy.testing.assert_allclose( feature_vector(self.tag, features), expected )
+  
+  def test_empty_tag_centroid_features(self):
+    vector = feature_vector(Tag(), ["mean_distance_from_centroid", "std_distance_from_centroid"])
+    self.assertTrue( numpy.isnan(vector).all() )
+  
+  def test_intermediates_computed_once(self):
+    intermediates = TagIntermediates(self.tag)
+    self.assertTrue( intermediates.flattened is intermediates.flattened )
+  
+  def test_angle_features(self):
+    features = ["total_joint_angle", "mean_absolute_joint_angle", "std_absolute_joint_angle", "total_corners"]
+    self.assertEqual( feature_vector(self.tag, features).tolist(), [-math.pi, math.pi / 2, 0, 2] )
\ No newline at end of file
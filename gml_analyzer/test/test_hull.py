@@ -0,0 +1,42 @@
+import unittest
+import numpy
+
+from gml_analyzer.hull import convex_hull_indices, convex_hulls, hull_areas, polygon_area
+
+class HullTests(unittest.TestCase):
+  
+  def test_empty_hull(self):
+    self.assertEqual( convex_hull_indices(numpy.empty((0,2))).tolist(), [] )
+  
+  def test_repeated_point_hull(self):
+    self.assertEqual( convex_hull_indices([(1,1),(1,1),(1,1)]).tolist(), [0] )
+  
+  def test_square_hull_order(self):
+    xy = [(1,1),(0,0),(0.5,0.5),(1,0),(0,1),(0.5,0)]
+    self.assertEqual( convex_hull_indices(xy).tolist(), [1,3,0,4] )
+  
+  def test_prefilter_matches_full_chain(self):
+    xy = numpy.random.RandomState(0).randn(2000, 2)
+    numpy.testing.assert_array_equal( convex_hull_indices(xy), convex_hull_indices(xy, prefilter=False) )
+  
+  def test_prefilter_with_duplicate_extremes(self):
+    xy = numpy.array([ (x, y) for x in xrange(10) for y in xrange(10) ], dtype=float)
+    self.assertEqual( sorted(map(tuple, xy[convex_hull_indices(xy)])), [(0,0),(0,9),(9,0),(9,9)] )
+  
+  def test_polygon_area(self):
+    self.assertEqual( polygon_area([(2,2),(4,2),(4,5),(2,5)]), 6 )
+  
+  def test_batch_hulls(self):
+    xy = numpy.array([ (0,0),(1,0),(1,1),(0,1),(0.5,0.5), (3,3), (0,0),(2,0),(0,2) ], dtype=float)
+    offsets = [0, 5, 5, 6, 9]
+    indices, hull_offsets = convex_hulls(xy, offsets)
+    self.assertEqual( indices.tolist(), [0,1,2,3, 5, 6,7,8] )
+    self.assertEqual( hull_offsets.tolist(), [0,4,4,5,8] )
+    self.assertEqual( hull_areas(xy, offsets).tolist(), [1,0,0,2] )
+  
+  def test_batch_hull_areas_match_single(self):
+    random = numpy.random.RandomState(1)
+    xy = random.randn(500, 2)
+    offsets = [0, 100, 103, 400, 500]
+    expected = [ polygon_area(xy[start:end][ convex_hull_indices(xy[start:end]) ]) for start, end in zip(offsets[:-1], offsets[1:]) ]
+    numpy.testing.assert_allclose( hull_areas(xy, offsets), expected )
\ No newline at end of file
@@ -0,0 +1,138 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy
+from nose.tools import raises
+
+from gml_analyzer import index as index_module
+from gml_analyzer.index import FeatureIndex
+from gml_analyzer.tag import Tag
+from gml_analyzer.stroke import Stroke
+
+FEATURES = ("point_count", "arc_length", "hull_area")
+
+class FeatureIndexTests(unittest.TestCase):
+  
+  def setUp(self):
+    random = numpy.random.RandomState(0)
+    self.vectors = random.rand(300, 3) * (1, 100, 10000)
+    self.keys = [ "tag%d.gml" % i for i in xrange(300) ]
+    self.directory = tempfile.mkdtemp()
+  
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+  
+  def brute_force(self, vector, k):
+    scale = self.vectors.std(axis=0)
+    distances = numpy.sqrt( (((self.vectors - vector) / scale) ** 2).sum(axis=1) )
+    return [ self.keys[i] for i in numpy.argsort(distances)[:k] ]
+  
+  def test_empty_index(self):
+    keys, distances = FeatureIndex(FEATURES).query((1,2,3), k=5)
+    self.assertEqual( keys, [] )
+  
+  @raises(ValueError)
+  def test_unknown_feature(self):
+    FeatureIndex(("not_a_feature",))
+  
+  @raises(ValueError)
+  def test_mismatched_keys(self):
+    FeatureIndex(FEATURES).add(["a"], numpy.zeros((2,3)))
+  
+  def test_nearest_is_self(self):
+    index = FeatureIndex(FEATURES)
+    index.add(self.keys, self.vectors)
+    keys, distances = index.query(self.vectors[42], k=1)
+    self.assertEqual( keys, ["tag42.gml"] )
+    self.assertEqual( distances[0], 0 )
+  
+  def test_query_matches_brute_force(self):
+    index = FeatureIndex(FEATURES)
+    index.add(self.keys, self.vectors)
+    self.assertEqual( index.query(self.vectors[7] + 0.01, k=10)[0], self.brute_force(self.vectors[7] + 0.01, 10) )
+  
+  def test_incremental_inserts(self):
+    index = FeatureIndex(FEATURES)
+    index.add(self.keys[:280], self.vectors[:280])
+    index.add(self.keys[280:], self.vectors[280:])
+    self.assertTrue( index.indexed < len(index) )
+    self.assertEqual( index.query(self.vectors[290], k=1)[0], ["tag290.gml"] )
+  
+  def test_remove(self):
+    index = FeatureIndex(FEATURES)
+    index.add(self.keys, self.vectors)
+    removed = set(self.keys[::30])
+    self.assertEqual( index.remove(removed), 10 )
+    self.assertEqual( len(index), 290 )
+    
+    expected = [ key for key in self.brute_force(self.vectors[0], 30) if key not in removed ][:10]
+    self.assertEqual( index.query(self.vectors[0], k=10)[0], expected )
+    self.assertFalse( set(index.query_radius(self.vectors[0], 1.0)[0]) & removed )
+  
+  def test_remove_every_vector_under_a_key(self):
+    index = FeatureIndex(FEATURES)
+    index.add(["a", "b", "a"], self.vectors[:3])
+    self.assertEqual( index.remove(["a", "missing"]), 2 )
+    self.assertEqual( index.query(self.vectors[0], k=5)[0], ["b"] )
+  
+  def test_removed_vectors_are_dropped_by_rebuild(self):
+    index = FeatureIndex(FEATURES)
+    index.add(self.keys, self.vectors)
+    index.remove(self.keys[:40])
+    self.assertEqual( index.keys, self.keys[40:] )
+    self.assertEqual( index.indexed, 260 )
+    self.assertEqual( index.query(self.vectors[50], k=1)[0], ["tag50.gml"] )
+  
+  def test_query_without_scipy(self):
+    tree = index_module.cKDTree
+    try:
+      index_module.cKDTree = None
+      index = FeatureIndex(FEATURES)
+      index.add(self.keys, self.vectors)
+      self.assertEqual( index.query(self.vectors[3], k=10)[0], self.brute_force(self.vectors[3], 10) )
+    finally:
+      index_module.cKDTree = tree
+  
+  def test_query_radius(self):
+    index = FeatureIndex(FEATURES)
+    index.add(self.keys[:250], self.vectors[:250])
+    index.add(self.keys[250:], self.vectors[250:])
+    keys, distances = index.query_radius(self.vectors[0], 0.5)
+    expected_keys, expected_distances = index.query(self.vectors[0], k=len(index))
+    self.assertEqual( keys, expected_keys[:len(keys)] )
+    self.assertTrue( (distances <= 0.5).all() and expected_distances[len(keys)] > 0.5 )
+  
+  def test_missing_features(self):
+    index = FeatureIndex(FEATURES)
+    index.add(["a", "b"], [ (1, numpy.nan, 1), (5, 5, 5) ])
+    self.assertEqual( index.query((1, 5, 1), k=1)[0], ["a"] )
+  
+  def test_add_tags(self):
+    index = FeatureIndex(FEATURES)
+    index.add_tags(["small", "large"], [ Tag( Stroke((0,0,0),(1,1,1)) ), Tag( Stroke((0,0,0),(9,0,1),(9,9,2)) ) ])
+    self.assertEqual( index.query((3, 20, 40), k=1)[0], ["large"] )
+  
+  def test_save_and_load(self):
+    index = FeatureIndex(FEATURES)
+    index.add(self.keys, self.vectors)
+    path = os.path.join(self.directory, "index.npz")
+    index.save(path)
+    
+    loaded = FeatureIndex.load(path)
+    self.assertEqual( loaded.features, FEATURES )
+    self.assertEqual( loaded.query(self.vectors[9], k=5)[0], index.query(self.vectors[9], k=5)[0] )
+  
+  def test_save_and_load_text_keys(self):
+    index = FeatureIndex(FEATURES)
+    index.add([7, "caf\xc3\xa9.gml", u"na\xefve.gml"], self.vectors[:3])
+    path = os.path.join(self.directory, "index.npz")
+    index.save(path)
+    self.assertEqual( FeatureIndex.load(path).keys, [u"7", u"caf\xe9.gml", u"na\xefve.gml"] )
+  
+  @raises(ValueError)
+  def test_load_refuses_pickled_keys(self):
+    path = os.path.join(self.directory, "index.npz")
+    numpy.savez(path, keys=numpy.array([object()], dtype=object), vectors=self.vectors[:1],
+                features=numpy.array(FEATURES), rebuild_fraction=0.1)
+    FeatureIndex.load(path)
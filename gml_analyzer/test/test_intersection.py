@@ -0,0 +1,74 @@
+import unittest
+import numpy
+
+from gml_analyzer import intersection
+from gml_analyzer.intersection import self_intersection_count, intersection_count
+
+class IntersectionTests(unittest.TestCase):
+  
+  def test_empty_self_intersection_count(self):
+    self.assertEqual( self_intersection_count(numpy.empty((0,2))), 0 )
+  
+  def test_crossing_self_intersection_count(self):
+    self.assertEqual( self_intersection_count([(0,0),(1,1),(1,0),(0,1)]), 1 )
+  
+  def test_straight_line_self_intersection_count(self):
+    self.assertEqual( self_intersection_count([(0,0),(1,0),(2,0),(3,0)]), 0 )
+  
+  def test_repeated_points_self_intersection_count(self):
+    self.assertEqual( self_intersection_count([(0,0),(1,0),(1,0),(1,1)]), 0 )
+  
+  def test_crossing_through_vertex_counted_once(self):
+    self.assertEqual( self_intersection_count([(0,0),(2,0),(2,1),(1,0),(1,-1)]), 1 )
+  
+  def test_revisited_vertex_counted_once(self):
+    self.assertEqual( self_intersection_count([(0,0),(1,1),(2,0),(2,2),(1,1),(0,2)]), 1 )
+  
+  def test_endpoint_inside_segment(self):
+    self.assertEqual( self_intersection_count([(0,0),(2,0),(2,1),(1,1),(1,0)]), 1 )
+  
+  def test_start_point_inside_segment(self):
+    self.assertEqual( self_intersection_count([(1,0),(1,1),(0,1),(0,0),(2,0)]), 1 )
+  
+  def test_folded_back_segment(self):
+    self.assertEqual( self_intersection_count([(0,0),(2,0),(1,0)]), 1 )
+  
+  def test_overlapping_colinear_segments(self):
+    self.assertEqual( self_intersection_count([(0,0),(2,0),(2,1),(1,1),(1,0),(3,0)]), 2 )
+  
+  def test_parallel_segments(self):
+    self.assertEqual( intersection_count([(0,0),(1,0)], [(0,1),(1,1)]), 0 )
+  
+  def test_touching_colinear_strokes(self):
+    self.assertEqual( intersection_count([(0,0),(1,0)], [(1,0),(2,0)]), 1 )
+  
+  def test_grid_matches_brute_force(self):
+    random = numpy.random.RandomState(0)
+    xy = numpy.cumsum(random.randint(-2, 3, (400,2)), axis=0).astype(float)
+    
+    brute_force_segments = intersection.BRUTE_FORCE_SEGMENTS
+    try:
+      intersection.BRUTE_FORCE_SEGMENTS = len(xy)
+      expected = self_intersection_count(xy)
+      intersection.BRUTE_FORCE_SEGMENTS = 0
+      self.assertEqual( self_intersection_count(xy), expected )
+    finally:
+      intersection.BRUTE_FORCE_SEGMENTS = brute_force_segments
+  
+  def test_long_parallel_segments(self):
+    # Every segment spans the whole width, so a grid sized from segment length would be one cell
+    hatching = [ (i % 2 * 1000.0, i * 0.01) for i in xrange(10000) ]
+    self.assertEqual( self_intersection_count(hatching), 0 )
+  
+  def test_blocked_grid_matches_brute_force(self):
+    hatching = numpy.array([ (i % 2 * 1000.0, i * 0.01) for i in xrange(300) ])
+    xy = numpy.concatenate((hatching, [(500, -1), (510, 5), (-10, 1), (1010, 2)]))
+    
+    brute_force_segments, block_pairs = intersection.BRUTE_FORCE_SEGMENTS, intersection.BLOCK_PAIRS
+    try:
+      intersection.BRUTE_FORCE_SEGMENTS = len(xy)
+      expected = self_intersection_count(xy)
+      intersection.BRUTE_FORCE_SEGMENTS, intersection.BLOCK_PAIRS = 0, 7
+      self.assertEqual( self_intersection_count(xy), expected )
+    finally:
+      intersection.BRUTE_FORCE_SEGMENTS, intersection.BLOCK_PAIRS = brute_force_segments, block_pairs
@@ -0,0 +1,85 @@
+import unittest
+import numpy
+from nose.tools import raises
+
+from gml_analyzer.matching import resample, euclidean_distance, dtw_distance, lb_keogh, nearest
+from gml_analyzer.stroke import Stroke
+from gml_analyzer.tag import Tag
+
+class MatchingTests(unittest.TestCase):
+  
+  def test_resample_spacing(self):
+    coordinates = resample([(0,0,0),(3,0,1),(3,4,2)], 8)
+    self.assertEqual( coordinates.shape, (8,3) )
+    numpy.testing.assert_allclose( coordinates[0], (0,0,0) )
+    numpy.testing.assert_allclose( coordinates[-1], (3,4,2) )
+    steps = numpy.hypot(*numpy.diff(coordinates[:, :2], axis=0).T)
+    numpy.testing.assert_allclose( steps, 1 )
+  
+  def test_resample_interpolates_time(self):
+    numpy.testing.assert_allclose( resample([(0,0,0),(2,0,1)], 3)[:, 2], [0, 0.5, 1] )
+  
+  def test_resample_repeated_points(self):
+    coordinates = resample([(0,0,0),(0,0,1),(2,0,2)], 3)
+    numpy.testing.assert_allclose( coordinates[:, 0], [0,1,2] )
+  
+  def test_resample_single_point(self):
+    numpy.testing.assert_allclose( resample([(1,2,3)], 4), [(1,2,3)] * 4 )
+  
+  @raises(ValueError)
+  def test_resample_empty(self):
+    resample(numpy.empty((0,3)), 4)
+  
+  def test_stroke_and_tag_resampled(self):
+    tag = Tag( Stroke((0,0,0),(1,0,1)), Stroke((1,1,2),(0,1,3)) )
+    self.assertEqual( len(tag.strokes[0].resampled(5).points), 5 )
+    numpy.testing.assert_allclose( tag.resampled(4).coordinates[:, :2], [(0,0),(1,0),(1,1),(0,1)] )
+  
+  def test_euclidean_distance(self):
+    self.assertEqual( euclidean_distance([(0,0,0),(1,1,0)], [(3,4,5),(1,1,0)]), 5 )
+    self.assertAlmostEqual( euclidean_distance([(0,0,0)], [(0,0,2)], time_weight=0.5), 1 )
+  
+  def test_dtw_identical(self):
+    a = numpy.random.RandomState(0).rand(20, 3)
+    self.assertEqual( dtw_distance(a, a), 0 )
+  
+  def test_dtw_absorbs_shift(self):
+    a = numpy.array([ (x, 0, 0) for x in (0,0,1,2,3,3) ], dtype=float)
+    b = numpy.array([ (x, 0, 0) for x in (0,1,2,3,3,3) ], dtype=float)
+    self.assertEqual( dtw_distance(a, b, radius=1), 0 )
+    self.assertTrue( euclidean_distance(a, b) > 0 )
+  
+  def test_dtw_not_above_euclidean(self):
+    random = numpy.random.RandomState(1)
+    for _ in xrange(10):
+      a, b = random.rand(16, 3), random.rand(16, 3)
+      self.assertTrue( dtw_distance(a, b, radius=2) <= euclidean_distance(a, b, time_weight=1) + 1e-12 )
+  
+  def test_dtw_different_lengths(self):
+    self.assertEqual( dtw_distance([(0,0,0),(1,0,1)], [(0,0,0),(0,0,0),(1,0,1)]), 0 )
+  
+  def test_lower_bound(self):
+    random = numpy.random.RandomState(2)
+    query, candidates = random.rand(24, 3), random.rand(50, 24, 3)
+    bounds = lb_keogh(query, candidates, radius=3)
+    distances = [ dtw_distance(query, candidate, radius=3) for candidate in candidates ]
+    self.assertTrue( numpy.all(bounds <= numpy.array(distances) + 1e-12) )
+  
+  def test_nearest_matches_exhaustive_search(self):
+    random = numpy.random.RandomState(3)
+    query, candidates = random.rand(24, 3), random.rand(200, 24, 3)
+    indices, distances = nearest(query, candidates, k=5, radius=3, time_weight=0.5)
+    exhaustive = sorted( (dtw_distance(query, candidate, 3, 0.5), index) for index, candidate in enumerate(candidates) )[:5]
+    self.assertEqual( indices, [ index for _, index in exhaustive ] )
+    numpy.testing.assert_allclose( distances, [ distance for distance, _ in exhaustive ] )
+  
+  def test_nearest_more_neighbours_than_candidates(self):
+    random = numpy.random.RandomState(4)
+    query, candidates = random.rand(8, 3), random.rand(3, 8, 3)
+    indices, distances = nearest(query, candidates, k=10)
+    self.assertEqual( sorted(indices), [0, 1, 2] )
+    self.assertEqual( distances, sorted(distances) )
+  
+  @raises(ValueError)
+  def test_nearest_without_neighbours(self):
+    nearest( numpy.zeros((4, 3)), numpy.zeros((2, 4, 3)), k=0 )
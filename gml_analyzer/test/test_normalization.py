@@ -0,0 +1,37 @@
+import unittest
+import numpy
+from nose.tools import raises
+
+from gml_analyzer.normalization import normalize_ragged, normalize_tags
+from gml_analyzer.stroke import Stroke
+from gml_analyzer.tag import Tag
+
+class NormalizationTests(unittest.TestCase):
+  
+  def test_normalize_ragged(self):
+    coordinates = numpy.array([ (2,2,0),(4,3,1), (7,7,7), (-1,0,2),(1,-2,3) ], dtype=float)
+    normalized = normalize_ragged(coordinates, [0, 2, 2, 3, 5])
+    numpy.testing.assert_array_equal( normalized, [ (0,0,0),(1,0.5,1), (0,0,7), (0,1,2),(1,0,3) ] )
+    self.assertEqual( coordinates[0].tolist(), [2,2,0] )
+  
+  def test_normalize_ragged_in_place(self):
+    coordinates = numpy.array([ (0,0,0),(2,2,1) ], dtype=float)
+    self.assertTrue( normalize_ragged(coordinates, [0, 2], coordinates) is coordinates )
+    self.assertEqual( coordinates.tolist(), [[0,0,0],[1,1,1]] )
+  
+  def test_normalize_ragged_empty(self):
+    self.assertEqual( normalize_ragged(numpy.empty((0,3)), [0, 0]).shape, (0,3) )
+  
+  @raises(ValueError)
+  def test_normalize_ragged_wrong_buffer(self):
+    normalize_ragged(numpy.zeros((2,3)), [0, 2], numpy.empty((3,3)))
+  
+  def test_normalize_tags_matches_tag_normalized(self):
+    random = numpy.random.RandomState(0)
+    tags = [ Tag(*[ Stroke.fromArray(random.rand(n, 3) * 10) for n in lengths ]) for lengths in ((3,4), (), (1,), (5,0,2)) ]
+    buffer = numpy.empty((15, 3))
+    out, offsets = normalize_tags(tags, buffer)
+    self.assertTrue( out is buffer )
+    self.assertEqual( offsets.tolist(), [0, 7, 7, 8, 15] )
+    for tag, start, end in zip(tags, offsets[:-1], offsets[1:]):
+      numpy.testing.assert_allclose( out[start:end], tag.normalized().flattened_stroke().coordinates.reshape(-1, 3) )
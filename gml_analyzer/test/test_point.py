@@ -1,4 +1,6 @@
 import unittest
+import numpy
+from nose.tools import raises
 
 from numpy import all, equal
 from math import acos, pi
@@ -118,4 +120,56 @@ class PointXYTTests(unittest.TestCase):
   def test_divide_by_scalar(self):
     point = PointXYT((2,4,6))
     c = 2
-    self.assertEqual( point / c, PointXYT((1,2,3)) )
\ No newline at end of file
+    self.assertEqual( point / c, PointXYT((1,2,3)) )
+  
+  def test_xy(self):
+    xy = PointXYT((1,2,3)).xy
+    self.assertEqual( xy, (1,2) )
+    self.assertTrue( type(xy) is Point )
+
+class PointConversionTests(unittest.TestCase):
+  
+  @raises(ValueError)
+  def test_wrong_length(self):
+    Point((1,2,3))
+  
+  def test_values_are_floats(self):
+    point = Point(numpy.array([1, 2]))
+    self.assertEqual( map(type, point), [float, float] )
+  
+  def test_from_rows(self):
+    points = PointXYT.fromRows( numpy.arange(6).reshape(2,3) )
+    self.assertEqual( points, [(0,1,2), (3,4,5)] )
+    self.assertEqual( points[1].t, 5 )
+  
+  def test_array_round_trip(self):
+    self.assertEqual( numpy.asarray(PointXYT((1,2,3))).tolist(), [1,2,3] )
+    self.assertEqual( (numpy.array([3,4]) - Point((1,1))).tolist(), [2,3] )
+  
+  def test_distance(self):
+    self.assertEqual( Point((0,0)).distance(Point((3,4))), 5 )
+  
+  def test_angle(self):
+    self.assertAlmostEqual( Point((1,0)).angle(Point((0,2))), pi/2 )
+  
+  def test_hashable(self):
+    self.assertEqual( len(set([Point((1,2)), Point((1,2))])), 1 )
+  
+  @raises(ValueError)
+  def test_add_mismatched_length(self):
+    Point((1,2)) + PointXYT((1,2,3))
+  
+  @raises(ValueError)
+  def test_subtract_mismatched_length(self):
+    PointXYT((1,2,3)) - Point((1,2))
+  
+  @raises(TypeError)
+  def test_add_scalar(self):
+    Point((1,2)) + 1
+  
+  @raises(TypeError)
+  def test_subtract_scalar(self):
+    PointXYT((1,2,3)) - 1.5
+  
+  def test_add_sequence(self):
+    self.assertEqual( Point((1,2)) + numpy.array([1,1]), Point((2,3)) )
@@ -0,0 +1,65 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+
+from gml_analyzer import profiling
+from gml_analyzer.corpus import Corpus
+from gml_analyzer.features import feature_vector
+from gml_analyzer.synthetic import write_corpus
+from gml_analyzer.tag import Tag
+from gml_analyzer.stroke import Stroke
+
+class ProfilingTests(unittest.TestCase):
+  
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+  
+  def tearDown(self):
+    profiling.disable()
+    shutil.rmtree(self.directory)
+  
+  def test_disabled_records_nothing(self):
+    self.assertTrue( profiling.active is None )
+    feature_vector( Tag(Stroke((0,0,0), (1,1,1))), ("point_count",) )
+    self.assertTrue( profiling.disable() is None )
+  
+  def test_feature_spans(self):
+    profiler = profiling.enable()
+    feature_vector( Tag(Stroke((0,0,0), (1,1,1), (2,0,2))), ("point_count", "arc_length") )
+    
+    statistics = profiler.statistics()
+    self.assertEqual( sorted(statistics), ["feature/arc_length", "feature/point_count"] )
+    self.assertEqual( statistics["feature/arc_length"][0], 1 )
+    self.assertEqual( statistics["feature/arc_length"][3], 3 )
+  
+  def test_parser_spans(self):
+    profiler = profiling.enable()
+    Tag.fromGML("<gml><stroke><pt><x>0</x><y>0</y></pt><pt><x>1</x><y>0</y></pt></stroke></gml>")
+    self.assertEqual( profiler.statistics()["parse/fromGML"][::3], (1, 2) )
+  
+  def test_slowest_tags_and_exports(self):
+    profiler = profiling.enable()
+    profiler.label = "small.gml"
+    profiler.record("feature/self_intersection_count", 0, 0.5, 10)
+    profiler.record("feature/arc_length", 0, 2.0, 10)
+    profiler.label = "large.gml"
+    profiler.record("feature/self_intersection_count", 1, 1.0, 1000)
+    
+    self.assertEqual( profiler.slowest_tags(), [("small.gml", 2.5, 10), ("large.gml", 1.0, 1000)] )
+    self.assertEqual( profiler.slowest_tags(1, "feature/self_intersection_count"), [("large.gml", 1.0, 1000)] )
+    self.assertTrue( profiler.summary().splitlines()[1].startswith("feature/arc_length") )
+    
+    trace = json.loads( json.dumps(profiler.chrome_trace()) )
+    self.assertEqual( [ event['dur'] for event in trace['traceEvents'] ], [5e5, 2e6, 1e6] )
+    self.assertEqual( trace['traceEvents'][2]['args'], { 'label': "large.gml", 'points': 1000 } )
+  
+  def test_corpus_workers_report_spans(self):
+    paths = write_corpus(self.directory, 4, points=20)
+    profiler = profiling.enable()
+    Corpus(paths, ("point_count",), workers=2, chunk_size=1).extract()
+    
+    self.assertEqual( profiler.statistics()["feature/point_count"][0], 4 )
+    self.assertEqual( sorted( label for label, _, _ in profiler.slowest_tags() ), paths )
+    self.assertTrue( profiler.label is None )
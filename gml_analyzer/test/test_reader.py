@@ -0,0 +1,60 @@
+import unittest
+import os
+import shutil
+import tempfile
+import time
+
+from gml_analyzer.reader import PrefetchingReader
+from nose.tools import raises
+
+class PrefetchingReaderTests(unittest.TestCase):
+  
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.paths = []
+    for index in xrange(40):
+      path = os.path.join(self.directory, "%02d.gml" % index)
+      with open(path, "w") as output:
+        output.write("%05d" % index)
+      self.paths.append(path)
+  
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+  
+  def test_reads_in_order(self):
+    entries = list( PrefetchingReader(self.paths, concurrency=4, queue_size=8) )
+    self.assertEqual( [ path for path, _, _ in entries ], self.paths )
+    self.assertEqual( [ data for _, data, _ in entries ], [ "%05d" % i for i in xrange(40) ] )
+  
+  def test_failed_read(self):
+    missing = os.path.join(self.directory, "missing.gml")
+    path, data, error = list( PrefetchingReader([missing]) )[0]
+    self.assertTrue( data is None )
+    self.assertTrue( "IOError" in error )
+  
+  def test_read_ahead_is_bounded(self):
+    reader = PrefetchingReader(self.paths, concurrency=2, queue_size=4)
+    entries = iter(reader)
+    entries.next()
+    
+    # Once the consumer takes a file one more is requested, so exactly five get read
+    deadline = time.time() + 5
+    while reader.ready < 4 and time.time() < deadline:
+      time.sleep(0.001)
+    self.assertEqual( reader.ready, 4 )
+    self.assertEqual( reader.bytes, 5 * 5 )
+    entries.close()
+  
+  def test_statistics(self):
+    reader = PrefetchingReader(self.paths, concurrency=3)
+    for _ in reader:
+      time.sleep(0.001)
+    
+    statistics = reader.statistics()
+    self.assertEqual( statistics['files'], 40 )
+    self.assertEqual( statistics['bytes'], 200 )
+    self.assertTrue( 0 < statistics['mean_queue_depth'] <= statistics['max_queue_depth'] <= 32 )
+  
+  @raises(ValueError)
+  def test_invalid_concurrency(self):
+    PrefetchingReader(self.paths, concurrency=0)
@@ -0,0 +1,101 @@
+import unittest
+
+import numpy
+from lxml import etree
+
+from gml_analyzer.scanner import scan_strokes
+from gml_analyzer.synthetic import synthetic_gml
+from gml_analyzer.tag import Tag
+from nose.tools import raises
+
+SIMPLE = """<?xml version="1.0" encoding="UTF-8"?>
+<gml spec="1.0">
+  <tag>
+    <drawing>
+      <stroke>
+        <pt><x>0.1</x><y>0.2</y><t>0.0</t></pt>
+        <pt>
+          <x>0.3</x>
+          <y>0.4</y>
+          <t>0.5</t>
+        </pt>
+      </stroke>
+      <stroke>
+        <pt><x>1e-3</x><y>-2</y></pt>
+      </stroke>
+    </drawing>
+  </tag>
+</gml>"""
+
+def gml_with_stroke(stroke):
+  return "<gml><tag><drawing><stroke>%s</stroke></drawing></tag></gml>" % stroke
+
+class ScannerTests(unittest.TestCase):
+
+  def assertSameTag(self, gml):
+    fast = Tag.fromGML(gml, fast=True)
+    full = Tag.fromGML(gml, fast=False)
+    self.assertEqual( len(fast.strokes), len(full.strokes) )
+    for a, b in zip(fast.strokes, full.strokes):
+      self.assertEqual( a.coordinates.tolist(), b.coordinates.tolist() )
+
+  def test_simple_layout(self):
+    strokes = scan_strokes(SIMPLE)
+    self.assertEqual( len(strokes), 2 )
+    self.assertEqual( strokes[0].tolist(), [ [0.1, 0.2, 0.0], [0.3, 0.4, 0.5] ] )
+    self.assertSameTag(SIMPLE)
+
+  def test_missing_time_is_zero(self):
+    self.assertEqual( scan_strokes(SIMPLE)[1].tolist(), [ [0.001, -2.0, 0.0] ] )
+
+  def test_empty_stroke(self):
+    strokes = scan_strokes( gml_with_stroke("") )
+    self.assertEqual( len(strokes), 1 )
+    self.assertEqual( strokes[0].shape, (0, 3) )
+
+  def test_empty_time_falls_back(self):
+    self.assertTrue( scan_strokes( gml_with_stroke("<pt><x>1</x><y>2</y><t></t></pt>") ) is None )
+
+  def test_unusual_strokes_fall_back(self):
+    for stroke in [ "<pt><x>1</x><y>2</y></pt><!-- comment -->",
+                    "<pt><x>&#49;</x><y>2</y></pt>",
+                    "<pt id='a'><x>1</x><y>2</y></pt>",
+                    "<pt><x>1</x><y>2</y><z>3</z></pt>",
+                    "<pt><y>2</y><x>1</x></pt>",
+                    "<pt><x><![CDATA[1]]></x><y>2</y></pt>",
+                    "<pt><x>1</x><y>2</y></pt>\x0b" ]:
+      self.assertTrue( scan_strokes( gml_with_stroke(stroke) ) is None, stroke )
+
+  def test_unusual_strokes_still_parse(self):
+    self.assertSameTag( gml_with_stroke("<pt><x>1</x><y>2</y></pt><!-- comment --><pt><x>3</x><y>4</y></pt>") )
+    self.assertEqual( Tag.fromGML( gml_with_stroke("<pt><x>&#49;</x><y>2</y></pt>") ).strokes[0].coordinates.tolist(), [ [1, 2, 0] ] )
+
+  def test_namespaced_document_falls_back(self):
+    gml = '<gml xmlns="http://example.com/gml"><tag><stroke><pt><x>1</x><y>2</y></pt></stroke></tag></gml>'
+    self.assertTrue( scan_strokes(gml) is None )
+
+  def test_stroke_inside_attribute_falls_back(self):
+    gml = '<gml><tag><drawing title="<stroke></stroke>"><stroke></stroke></drawing></tag></gml>'
+    self.assertTrue( scan_strokes(gml) is None )
+
+  def test_processing_instruction_falls_back(self):
+    gml = '<gml><?p <stroke><pt><x>9</x><y>9</y></pt></stroke>?><tag><drawing><stroke ></stroke></drawing></tag></gml>'
+    self.assertTrue( scan_strokes(gml) is None )
+    self.assertSameTag(gml)
+    self.assertEqual( Tag.fromGML(gml).strokes[0].coordinates.tolist(), [] )
+
+  def test_unicode_falls_back(self):
+    self.assertTrue( scan_strokes( unicode(gml_with_stroke("<pt><x>1</x><y>2</y></pt>")) ) is None )
+
+  def test_malformed_document(self):
+    self.assertTrue( scan_strokes( gml_with_stroke("<pt><x>1</x><y>2</y></pt>") + "<gml>" ) is None )
+
+  @raises(etree.XMLSyntaxError)
+  def test_malformed_document_still_raises(self):
+    Tag.fromGML( "<gml><tag><stroke><pt><x>1</x><y>2</y></pt></stroke></tag>" )
+
+  def test_synthetic_documents_match_lxml(self):
+    for seed in xrange(5):
+      gml = synthetic_gml(strokes=4, points=50, seed=seed)
+      self.assertTrue( scan_strokes(gml) is not None )
+      self.assertSameTag(gml)
@@ -0,0 +1,58 @@
+import unittest
+import numpy
+from nose.tools import raises
+
+from gml_analyzer.simplification import simplify, rdp_mask, visvalingam_mask, simplification_report
+from gml_analyzer.stroke import Stroke
+from gml_analyzer.tag import Tag
+
+class SimplificationTests(unittest.TestCase):
+  
+  def test_rdp_drops_collinear_points(self):
+    xy = [ (x, 0) for x in xrange(10) ]
+    self.assertEqual( numpy.flatnonzero(rdp_mask(xy, 0.1)).tolist(), [0, 9] )
+  
+  def test_rdp_keeps_corners(self):
+    xy = [(0,0),(1,0.05),(2,0),(2,1),(2,2),(1,2.05),(0,2)]
+    self.assertEqual( numpy.flatnonzero(rdp_mask(xy, 0.1)).tolist(), [0,2,4,6] )
+  
+  def test_rdp_keeps_spike_beyond_endpoint(self):
+    xy = [(0,0),(3,0),(1,0)]
+    self.assertEqual( rdp_mask(xy, 0.5).tolist(), [True, True, True] )
+  
+  def test_rdp_closed_loop(self):
+    xy = [(0,0),(1,0),(1,1),(0,1),(0,0)]
+    self.assertTrue( rdp_mask(xy, 0.1)[2] )
+  
+  def test_visvalingam_threshold(self):
+    xy = [(0,0),(1,0.1),(2,0),(3,2),(4,0)]
+    self.assertEqual( visvalingam_mask(xy, 0.5).tolist(), [True, False, True, True, True] )
+    self.assertEqual( visvalingam_mask(xy, 10).tolist(), [True, False, False, False, True] )
+  
+  def test_short_strokes_untouched(self):
+    self.assertEqual( rdp_mask([(0,0),(1,1)], 10).tolist(), [True, True] )
+    self.assertEqual( visvalingam_mask([(0,0)], 10).tolist(), [True] )
+    self.assertEqual( rdp_mask(numpy.empty((0,2)), 10).tolist(), [] )
+  
+  def test_simplify_keeps_timestamps(self):
+    coordinates = [(0,0,0),(1,0,0.5),(2,0,0.7),(2,1,0.9)]
+    numpy.testing.assert_array_equal( simplify(coordinates, 0.1), [(0,0,0),(2,0,0.7),(2,1,0.9)] )
+    numpy.testing.assert_array_equal( simplify(coordinates, 0.1, 'visvalingam'), [(0,0,0),(2,0,0.7),(2,1,0.9)] )
+  
+  @raises(ValueError)
+  def test_unknown_method(self):
+    simplify([(0,0,0)], 1, 'nearest')
+  
+  def test_stroke_and_tag_simplified(self):
+    stroke = Stroke(*[ (x, 0, x) for x in xrange(5) ])
+    self.assertEqual( len(stroke.simplified(0.01).points), 2 )
+    tag = Tag(stroke, Stroke((0,0,0)))
+    self.assertEqual( [ len(s.points) for s in tag.simplified(0.01, 'visvalingam').strokes ], [2, 1] )
+  
+  def test_report(self):
+    tags = [ Tag(Stroke(*[ (x, x % 2 * 0.01, x) for x in xrange(11) ])) ]
+    reduction, changes = simplification_report(tags, 0.1, features=('arc_length', 'point_count', 'total_corners'))
+    self.assertAlmostEqual( reduction, 5.5 )
+    self.assertTrue( changes['arc_length'][0] < 0.001 )
+    self.assertAlmostEqual( changes['point_count'][1], 9 / 11.0 )
+    self.assertTrue( numpy.isnan(changes['total_corners'][0]) )
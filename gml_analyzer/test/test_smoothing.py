@@ -0,0 +1,52 @@
+import unittest
+import numpy
+from nose.tools import raises
+
+from gml_analyzer.smoothing import smooth, smooth_ragged
+from gml_analyzer.stroke import Stroke
+
+class SmoothingTests(unittest.TestCase):
+  
+  def setUp(self):
+    random = numpy.random.RandomState(0)
+    self.strokes = [ random.rand(length, 3) for length in (12, 3, 0, 7, 30) ]
+  
+  def test_ragged_matches_single_strokes(self):
+    offsets = numpy.cumsum([0] + map(len, self.strokes))
+    smoothed = smooth_ragged(numpy.concatenate(self.strokes), offsets, passes=4, width=5)
+    expected = numpy.concatenate([ smooth(stroke, passes=4, width=5) for stroke in self.strokes ])
+    numpy.testing.assert_array_equal( smoothed, expected )
+  
+  def test_ragged_with_leading_rows(self):
+    leading = numpy.random.RandomState(1).rand(10, 3)
+    offsets = numpy.cumsum([10] + map(len, self.strokes))
+    smoothed = smooth_ragged(numpy.concatenate([leading] + self.strokes), offsets, passes=4, width=5)
+    expected = numpy.concatenate([leading] + [ smooth(stroke, passes=4, width=5) for stroke in self.strokes ])
+    numpy.testing.assert_array_equal( smoothed, expected )
+  
+  def test_single_pass(self):
+    coordinates = numpy.array([ (i % 2, 0, i) for i in xrange(7) ], dtype=float)
+    smoothed = smooth(coordinates, passes=1)
+    numpy.testing.assert_allclose( smoothed[:, 0], [0, 1/3., 2/3., 1/3., 2/3., 1/3., 0] )
+    numpy.testing.assert_array_equal( smoothed[:, 2], coordinates[:, 2] )
+  
+  def test_wide_kernel_pins_ends(self):
+    smoothed = smooth(self.strokes[0], width=5)
+    numpy.testing.assert_array_equal( smoothed[:2], self.strokes[0][:2] )
+    numpy.testing.assert_array_equal( smoothed[-2:], self.strokes[0][-2:] )
+  
+  def test_zero_passes(self):
+    numpy.testing.assert_array_equal( smooth(self.strokes[0], passes=0), self.strokes[0] )
+  
+  def test_does_not_modify_input(self):
+    original = self.strokes[0].copy()
+    smooth(self.strokes[0])
+    numpy.testing.assert_array_equal( self.strokes[0], original )
+  
+  @raises(ValueError)
+  def test_even_width(self):
+    smooth(self.strokes[0], width=4)
+  
+  def test_stroke_smoothed_options(self):
+    stroke = Stroke.fromArray(self.strokes[4])
+    numpy.testing.assert_array_equal( stroke.smoothed(passes=2, width=5).coordinates, smooth(self.strokes[4], 2, 5) )
\ No newline at end of file
@@ -0,0 +1,87 @@
+import unittest
+import hashlib
+import os
+import shutil
+import tempfile
+import numpy
+from nose.tools import raises
+
+from gml_analyzer.store import TagStore, write_store, convert_directory
+from gml_analyzer.tag import Tag
+from gml_analyzer.stroke import Stroke
+
+class StoreTests(unittest.TestCase):
+  
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.path = os.path.join(self.directory, "corpus.store")
+  
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+  
+  def write_gml(self, filename, gml):
+    with open(os.path.join(self.directory, filename), "w") as gml_file:
+      gml_file.write(gml)
+  
+  def test_empty_store(self):
+    self.assertEqual( write_store(self.path, []), 0 )
+    store = TagStore(self.path)
+    self.assertEqual( len(store), 0 )
+    self.assertEqual( list(store), [] )
+  
+  def test_round_trip(self):
+    tags = [ Tag( Stroke((0,0,0),(1,2,3)), Stroke((4,5,6)) ), Tag(), Tag( Stroke(), Stroke((7,8,9)) ) ]
+    entries = [ ("tag%d.gml" % i, hashlib.sha1(str(i)).digest(), tag) for i, tag in enumerate(tags) ]
+    write_store(self.path, entries)
+    
+    store = TagStore(self.path)
+    self.assertEqual( list(store), tags )
+    self.assertEqual( store[-1], tags[-1] )
+    self.assertEqual( store.filename(1), "tag1.gml" )
+    self.assertEqual( store.hexdigest(2), hashlib.sha1("2").hexdigest() )
+  
+  def test_strokes_view_mapped_file(self):
+    write_store(self.path, [ ("a.gml", "\0" * 20, Tag( Stroke((0,0,0),(1,2,3)) )) ])
+    stroke = TagStore(self.path)[0].strokes[0]
+    self.assertTrue( isinstance(stroke.coordinates.base, numpy.memmap) )
+  
+  def test_float32_store(self):
+    write_store(self.path, [ ("a.gml", "\0" * 20, Tag( Stroke((0.5,1,2)) )) ], dtype=numpy.float32)
+    store = TagStore(self.path)
+    self.assertEqual( store.dtype, numpy.float32 )
+    self.assertEqual( store[0], Tag( Stroke((0.5,1,2)) ) )
+  
+  def test_failed_write_keeps_previous_store(self):
+    write_store(self.path, [ ("a.gml", "\0" * 20, Tag( Stroke((1,2,3)) )) ])
+    
+    def entries():
+      yield ("b.gml", "\0" * 20, Tag( Stroke((4,5,6)) ))
+      yield ("c.gml", "short", Tag( Stroke((7,8,9)) ))
+    
+    self.assertRaises( ValueError, write_store, self.path, entries() )
+    self.assertEqual( list( TagStore(self.path) ), [ Tag( Stroke((1,2,3)) ) ] )
+    self.assertEqual( os.listdir(self.directory), ["corpus.store"] )
+  
+  @raises(IndexError)
+  def test_index_out_of_range(self):
+    write_store(self.path, [])
+    TagStore(self.path)[0]
+  
+  @raises(ValueError)
+  def test_not_a_store(self):
+    self.write_gml("a.gml", "<gml/>")
+    TagStore( os.path.join(self.directory, "a.gml") )
+  
+  def test_convert_directory(self):
+    gml = "<gml><drawing><stroke><pt><x>1</x><y>2</y><t>3</t></pt></stroke></drawing></gml>"
+    self.write_gml("a.gml", gml)
+    self.write_gml("b.gml", "<gml>")
+    
+    count, errors = convert_directory(self.directory, self.path)
+    self.assertEqual( count, 1 )
+    self.assertEqual( map(os.path.basename, errors), ["b.gml"] )
+    
+    store = TagStore(self.path)
+    self.assertEqual( store[0], Tag.fromGML(gml) )
+    self.assertEqual( store.filename(0), "a.gml" )
+    self.assertEqual( store.hexdigest(0), hashlib.sha1(gml).hexdigest() )
\ No newline at end of file
@@ -1,8 +1,10 @@
 import unittest
 import math
+import numpy
 from nose.tools import raises
 
 from gml_analyzer.stroke import Stroke
+from gml_analyzer.point import Point, PointXYT
 
 class StrokeTests(unittest.TestCase):
   
@@ -183,9 +185,18 @@ class StrokeTests(unittest.TestCase):
     self.assertEqual( stroke.self_intersection_count, 1)
   
   def test_double_self_intersection_count(self):
-    stroke = Stroke((0,0,0),(1,1,0),(1,0,0),(0,1,0),(-1,1,0))
+    stroke = Stroke((0,0,0),(2,0,0),(2,1,0),(1,-1,0),(0,1,0))
     self.assertEqual( stroke.self_intersection_count, 2)
   
+  def test_left_turn_is_not_self_intersection(self):
+    stroke = Stroke((0,0,0),(1,1,0),(1,0,0),(0,1,0),(-1,1,0))
+    self.assertEqual( stroke.self_intersection_count, 1)
+  
+  def test_intersection_count_with_other_stroke(self):
+    s1 = Stroke((0,0,0),(2,2,0))
+    s2 = Stroke((0,2,0),(2,0,0),(2,2,0),(0,0,0))
+    self.assertEqual( s1.__intersection_count__(s2), 2 )
+  
   def test_empty_hull_area(self):
     self.assertEqual( self.empty_stroke.hull_area, 0 )
   
@@ -328,4 +339,82 @@ class StrokeTests(unittest.TestCase):
   
   def test_aspect_ratio(self):
     stroke = Stroke((1,1,1),(0,0,0))
-    self.assertEqual( stroke.aspect_ratio, 1 )
\ No newline at end of file
+    self.assertEqual( stroke.aspect_ratio, 1 )
+  
+  def test_empty_coordinates(self):
+    self.assertEqual( self.empty_stroke.coordinates.shape, (0,3) )
+  
+  def test_coordinates(self):
+    stroke = Stroke((0,0,0),(1,2,3))
+    self.assertEqual( stroke.coordinates.tolist(), [[0,0,0],[1,2,3]] )
+  
+  @raises(ValueError)
+  def test_point_without_time(self):
+    Stroke((0,0))
+  
+  def test_from_array_does_not_copy(self):
+    coordinates = numpy.array([(0,0,0),(1,2,3)], dtype=float)
+    stroke = Stroke.fromArray(coordinates)
+    self.assertTrue( stroke.coordinates is coordinates )
+  
+  def test_points_are_plain_floats(self):
+    stroke = Stroke((0,0,0),(1,2,3))
+    point = stroke.points[1]
+    self.assertTrue( isinstance(point, PointXYT) )
+    self.assertEqual( (point.x, point.y, point.t), (1,2,3) )
+    self.assertTrue( type(point.t) is float )
+  
+  def test_points_setter(self):
+    stroke = Stroke((0,0,0))
+    stroke.points = [(1,1,1),(2,2,2)]
+    self.assertEqual( stroke.coordinates.tolist(), [[1,1,1],[2,2,2]] )
+  
+  def test_translated_square_hull_area(self):
+    stroke = Stroke((5,5,0),(5,6,0),(6,6,0),(6,5,0))
+    self.assertEqual( stroke.hull_area, 1 )
+  
+  def test_multi_segment_arc_length(self):
+    stroke = Stroke((0,0,0),(3,4,0),(3,0,0))
+    self.assertEqual( stroke.arc_length, 9 )
+  
+  def test_distances_from_centroid(self):
+    stroke = Stroke((0,0,0),(2,0,0))
+    self.assertEqual( list(stroke.__distances_from_centroid__()), [1,1] )
+  
+  def test_unordered_bounds(self):
+    stroke = Stroke((3,-1,0),(-2,4,0),(0,0,0))
+    self.assertEqual( stroke.bounds, ((-2,-1),(3,4)) )
+  
+  def test_centroid_is_cached(self):
+    stroke = Stroke((0,0,0),(2,2,2))
+    self.assertTrue( stroke.centroid is stroke.centroid )
+  
+  def test_setting_coordinates_invalidates_cache(self):
+    stroke = Stroke((0,0,0),(2,2,2))
+    stroke.centroid
+    stroke.coordinates = [(4,4,4)]
+    self.assertEqual( stroke.centroid, (4,4) )
+  
+  def test_invalidate(self):
+    stroke = Stroke((0,0,0),(2,2,2))
+    stroke.centroid
+    stroke.coordinates[:, :2] += 1
+    stroke.invalidate()
+    self.assertEqual( stroke.centroid, (2,2) )
+  
+  def test_digest_is_cached(self):
+    stroke = Stroke((1,1,1))
+    self.assertTrue( stroke.digest() is stroke.digest() )
+  
+  def test_different_points_have_different_digests(self):
+    self.assertNotEqual( Stroke((1,1,1)).digest(), Stroke((1,1,2)).digest() )
+  
+  def test_joint_angles_match_point_joint_angle(self):
+    points = [ (0,0,0), (1,0,0), (2,1,0), (2,3,0), (2,3,0), (0,0,0), (1,5,0) ]
+    stroke = Stroke(*points)
+    expected = [ Point(a[:2]).joint_angle( Point(b[:2]), Point(c[:2]) ) for a, b, c in zip(points, points[1:], points[2:]) ]
+    numpy.testing.assert_allclose( stroke.__joint_angles__(), expected )
+  
+  def test_folded_joint_angle_is_positive(self):
+    stroke = Stroke((0,3,0),(0,2,0),(0,3,0))
+    self.assertEqual( stroke.total_joint_angle, math.pi )
\ No newline at end of file
@@ -1,4 +1,6 @@
 import unittest
+import numpy
+from io import BytesIO
 from lxml.etree import XMLSyntaxError
 from nose.tools import raises
 
@@ -73,15 +75,43 @@ class TagTests(unittest.TestCase):
     tag = Tag( Stroke((-1,-1,-1)), Stroke((1,1,1)) )
     self.assertEqual( tag.dimensions, (2,2) )
   
-  # def test_normalized(self):
-  #   tag = Tag( Stroke((-5,-5,-5), (5,5,5)) )
-  #   normalized = tag.normalized()
-  #   self.assertEqual( normalized.strokes[0], Stroke((0,0,-5), (1,1,5)) )
-  # 
-  # def test_normalized_doesnt_change_original(self):
-  #   tag = Tag( Stroke((-5,-5,-5), (5,5,5)) )
-  #   normalized = tag.normalized()
-  #   self.assertEqual( tag.strokes[0], Stroke((-5,-5,-5), (5,5,5)) )
+  def test_normalized(self):
+    tag = Tag( Stroke((-5,-5,-5), (5,5,5)) )
+    normalized = tag.normalized()
+    self.assertEqual( normalized.strokes[0], Stroke((0,0,-5), (1,1,5)) )
+  
+  def test_normalized_doesnt_change_original(self):
+    tag = Tag( Stroke((-5,-5,-5), (5,5,5)) )
+    normalized = tag.normalized()
+    self.assertEqual( tag.strokes[0], Stroke((-5,-5,-5), (5,5,5)) )
+  
+  def test_normalized_keeps_aspect_ratio(self):
+    tag = Tag( Stroke((0,0,0), (4,1,1)), Stroke((2,2,2)) )
+    normalized = tag.normalized()
+    self.assertEqual( normalized.strokes, (Stroke((0,0,0), (1,0.25,1)), Stroke((0.5,0.5,2))) )
+    self.assertTrue( normalized.strokes[1].coordinates.base is normalized.strokes[0].coordinates.base )
+  
+  def test_normalized_in_place(self):
+    tag = Tag( Stroke((1,1,0), (3,5,1)) )
+    self.assertEqual( tag.centroid, (2,3) )
+    self.assertTrue( tag.normalized(in_place=True) is tag )
+    self.assertEqual( tag.strokes[0], Stroke((0,0,0), (0.5,1,1)) )
+    self.assertEqual( tag.centroid, (0.25,0.5) )
+  
+  def test_normalized_in_place_matches_copy(self):
+    tag = Tag( Stroke((1,1,0), (3,5,1)), Stroke(), Stroke((-2,4,2)) )
+    self.assertEqual( tag.normalized(), Tag(*tag.strokes).normalized(in_place=True) )
+  
+  @raises(ValueError)
+  def test_normalized_in_place_read_only(self):
+    coordinates = numpy.array([(1,1,0), (3,5,1)], dtype=float)
+    coordinates.flags.writeable = False
+    Tag( Stroke.fromArray(coordinates) ).normalized(in_place=True)
+  
+  def test_normalized_single_point_and_empty(self):
+    self.assertEqual( Tag( Stroke((3,4,5)) ).normalized().strokes[0], Stroke((0,0,5)) )
+    self.assertEqual( self.empty_tag.normalized().strokes, () )
+    self.assertEqual( Tag( Stroke() ).normalized(in_place=True).strokes, (Stroke(),) )
   
   def test_empty_flattened_stroke(self):
     self.assertEqual( self.empty_tag.flattened_stroke(), Stroke() )
@@ -99,4 +129,80 @@ class TagTests(unittest.TestCase):
       </drawing>
     </gml>"""
     tag = Tag.fromGML(gml)
-    self.assertEqual( tag.strokes[0], Stroke((1,1,1)) )
\ No newline at end of file
+    self.assertEqual( tag.strokes[0], Stroke((1,1,1)) )
+  
+  def test_keep_gml(self):
+    gml = "<gml><drawing><stroke><pt><x>1</x><y>1</y></pt></stroke></drawing></gml>"
+    self.assertEqual( Tag.fromGML(gml).gml, gml )
+    self.assertEqual( Tag.fromGML(gml, keep_gml=False).gml, None )
+  
+  def test_iter_from_file_without_tag_elements(self):
+    gml = """<gml>
+      <drawing>
+        <stroke>
+          <pt><x>1</x><y>1</y><t>1</t></pt>
+          <pt><x>2</x><y>2</y></pt>
+        </stroke>
+        <stroke>
+          <pt><x>3</x><y>3</y><t>3</t></pt>
+        </stroke>
+      </drawing>
+    </gml>"""
+    tags = list( Tag.iter_from_file( BytesIO(gml) ) )
+    self.assertEqual( len(tags), 1 )
+    self.assertEqual( tags[0].strokes, (Stroke((1,1,1),(2,2,0)), Stroke((3,3,3))) )
+  
+  def test_iter_from_file_with_tag_elements(self):
+    gml = """<gml>
+      <tag><drawing><stroke><pt><x>1</x><y>1</y><t>1</t></pt></stroke></drawing></tag>
+      <tag><drawing><stroke><pt><x>2</x><y>2</y><t>2</t></pt></stroke></drawing></tag>
+    </gml>"""
+    tags = list( Tag.iter_from_file( BytesIO(gml) ) )
+    self.assertEqual( [ tag.strokes for tag in tags ], [ (Stroke((1,1,1)),), (Stroke((2,2,2)),) ] )
+    self.assertEqual( tags[0].gml, None )
+  
+  def test_iter_from_file_empty_drawing(self):
+    tags = list( Tag.iter_from_file( BytesIO("<gml><drawing/></gml>") ) )
+    self.assertEqual( tags, [Tag()] )
+  
+  def test_iter_from_file_keep_gml(self):
+    gml = "<gml><tag><drawing><stroke><pt><x>1</x><y>1</y></pt></stroke></drawing></tag></gml>"
+    tag, = Tag.iter_from_file( BytesIO(gml), keep_gml=True )
+    self.assertEqual( tag.gml, "<tag><drawing><stroke><pt><x>1</x><y>1</y></pt></stroke></drawing></tag>" )
+  
+  def test_iter_from_file_matches_fromGML(self):
+    points = "".join( "<pt><x>%d</x><y>%d</y><t>%d</t></pt>" % (i, -i, i) for i in xrange(3000) )
+    gml = "<gml><drawing><stroke>%s</stroke><stroke>%s</stroke></drawing></gml>" % (points, points)
+    tag, = Tag.iter_from_file( BytesIO(gml) )
+    self.assertEqual( tag.strokes, tuple(Tag.fromGML(gml).strokes) )
+  
+  def test_iter_from_file_ignores_points_outside_strokes(self):
+    gml = "<gml><tag><header><client><pt><x>5</x><y>5</y></pt></client></header>" \
+          "<drawing><stroke><pt><x>1</x><y>2</y><t>3</t></pt></stroke></drawing></tag></gml>"
+    tag, = Tag.iter_from_file( BytesIO(gml) )
+    self.assertEqual( tag.strokes, tuple(Tag.fromGML(gml).strokes) )
+    self.assertEqual( tag.flattened_stroke().coordinates.tolist(), [[1, 2, 3]] )
+  
+  @raises(XMLSyntaxError)
+  def test_iter_from_file_degenerate_gml(self):
+    list( Tag.iter_from_file( BytesIO("") ) )
+  
+  def test_flattened_stroke_is_cached(self):
+    tag = Tag( Stroke((0,0,0)), Stroke((1,1,1)) )
+    self.assertTrue( tag.flattened_stroke() is tag.flattened_stroke() )
+  
+  def test_setting_strokes_invalidates_flattened_stroke(self):
+    tag = Tag( Stroke((0,0,0)) )
+    tag.flattened_stroke()
+    tag.strokes = ( Stroke((1,1,1)), )
+    self.assertEqual( tag.flattened_stroke(), Stroke((1,1,1)) )
+  
+  def test_editing_a_stroke_invalidates_derived_values(self):
+    stroke = Stroke((0,0,0), (2,2,1))
+    tag = Tag(stroke)
+    self.assertEqual( tag.centroid, (1,1) )
+    stroke.points = [(10,10,0), (20,20,1)]
+    self.assertEqual( tag.centroid, (15,15) )
+    stroke.coordinates[:, :2] += 1
+    stroke.invalidate()
+    self.assertEqual( tag.bounds, ((11,11), (21,21)) )
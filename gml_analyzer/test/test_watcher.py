@@ -0,0 +1,105 @@
+import unittest
+import os
+import threading
+import numpy
+
+from gml_analyzer import watcher
+from gml_analyzer.watcher import DirectoryWatcher
+from gml_analyzer.cache import FeatureCache
+from gml_analyzer.index import FeatureIndex
+from gml_analyzer.test.helpers import GMLDirectoryTestCase, gml_document
+
+FEATURES = ("duration", "point_count")
+
+class DirectoryWatcherTests(GMLDirectoryTestCase):
+  
+  def setUp(self):
+    GMLDirectoryTestCase.setUp(self)
+    self.cache = FeatureCache(":memory:")
+    self.index = FeatureIndex(FEATURES)
+    self.watcher = DirectoryWatcher(self.directory, self.cache, self.index, FEATURES, interval=0.01)
+  
+  def tearDown(self):
+    self.cache.close()
+    GMLDirectoryTestCase.tearDown(self)
+  
+  def write_tag(self, filename, points, mtime=None):
+    return self.write(filename, gml_document( (i, i, i) for i in xrange(points) ), mtime)
+  
+  def test_scan_ingests_new_files_once(self):
+    first = self.write_tag("a.gml", 2)
+    self.write_tag("notes.txt", 2)
+    self.assertEqual( self.watcher.scan(), [first] )
+    
+    second = self.write_tag("b.gml", 3)
+    self.assertEqual( self.watcher.scan(), [second] )
+    self.assertEqual( self.watcher.scan(), [] )
+    
+    self.assertEqual( self.index.keys, [first, second] )
+    numpy.testing.assert_array_equal( self.index.vectors, [[1, 2], [2, 3]] )
+  
+  def test_modified_file_is_reingested(self):
+    path = self.write_tag("a.gml", 2, mtime=1000)
+    self.watcher.scan()
+    self.write_tag("a.gml", 4, mtime=2000)
+    self.assertEqual( self.watcher.scan(), [path] )
+    self.assertEqual( self.index.keys, [path] )
+    self.assertEqual( self.index.vectors.tolist(), [[3, 4]] )
+  
+  def test_deleted_file_is_removed(self):
+    first, second = self.write_tag("a.gml", 2), self.write_tag("b.gml", 3)
+    self.watcher.scan()
+    os.remove(first)
+    self.assertEqual( self.watcher.scan(), [] )
+    self.assertEqual( self.index.query((1, 2), k=5)[0], [second] )
+    self.assertFalse( first in self.watcher.seen )
+  
+  def test_file_that_stops_parsing_is_removed(self):
+    path = self.write_tag("a.gml", 2, mtime=1000)
+    self.watcher.scan()
+    self.write("a.gml", "<gml><drawing>", mtime=2000)
+    self.assertEqual( self.watcher.scan(), [] )
+    self.assertEqual( len(self.index), 0 )
+    self.assertTrue( path in self.watcher.errors )
+  
+  def test_touched_file_is_not_reanalyzed(self):
+    self.write_tag("a.gml", 2, mtime=1000)
+    self.watcher.scan()
+    self.write_tag("a.gml", 2, mtime=2000)
+    self.assertEqual( self.watcher.scan(), [] )
+  
+  def test_cached_features_are_reused(self):
+    self.write_tag("a.gml", 2)
+    self.watcher.scan()
+    
+    index = FeatureIndex(FEATURES)
+    restarted = DirectoryWatcher(self.directory, self.cache, index, FEATURES)
+    self.assertEqual( len(restarted.scan()), 1 )
+    self.assertEqual( index.vectors.tolist(), [[1, 2]] )
+    self.assertEqual( len(self.cache), 1 )
+  
+  def test_broken_file_is_reported(self):
+    path = self.write("broken.gml", "<gml><drawing>")
+    
+    self.assertEqual( self.watcher.scan(), [] )
+    self.assertTrue( "XMLSyntaxError" in self.watcher.errors[path] )
+    self.assertEqual( len(self.index), 0 )
+  
+  def test_polling_run(self):
+    previous, watcher.pyinotify = watcher.pyinotify, None
+    batches = []
+    try:
+      self.write_tag("a.gml", 2)
+      threading.Timer(0.05, self.write_tag, ("b.gml", 3)).start()
+      self.watcher.run(batches.append, duration=0.3)
+    finally:
+      watcher.pyinotify = previous
+    
+    self.assertEqual( [ map(os.path.basename, batch) for batch in batches ], [["a.gml"], ["b.gml"]] )
+  
+  @unittest.skipIf(watcher.pyinotify is None, "pyinotify is not installed")
+  def test_inotify_run(self):
+    batches = []
+    threading.Timer(0.05, self.write_tag, ("b.gml", 3)).start()
+    self.watcher.run(batches.append, duration=0.3)
+    self.assertEqual( [ map(os.path.basename, batch) for batch in batches ], [["b.gml"]] )
@@ -0,0 +1,154 @@
+import fnmatch
+import hashlib
+import os
+import time
+import traceback
+
+try:
+  import pyinotify
+except ImportError:
+  pyinotify = None
+
+from tag import Tag
+from features import DEFAULT_FEATURES, check_features, feature_vector
+
+class DirectoryWatcher:
+  """
+  Long-running ingest of GML files dropped into a directory. Each new or modified file is parsed with
+  Tag.fromGML, its features are written to the FeatureCache and, if given, added to a FeatureIndex under
+  the file's path, replacing whatever the index held for an earlier version of the file. Files that are
+  deleted or moved away are removed from the index.
+
+  Files are tracked by modification time and size, and only rehashed when either changes; a file whose
+  contents hash the same as before is not analyzed again. Features already cached for a file's contents
+  (say by an earlier run) are read back instead of recomputed. run waits for changes with inotify when
+  pyinotify is installed and polls every interval seconds otherwise.
+  """
+
+  def __init__(self, directory, cache, index=None, features=DEFAULT_FEATURES, pattern="*.gml", interval=1.0):
+    check_features(features)
+    if index is not None and tuple(index.features) != tuple(features):
+      raise ValueError("The index must cover the features being extracted")
+
+    self.directory = directory
+    self.cache = cache
+    self.index = index
+    self.features = tuple(features)
+    self.pattern = pattern
+    self.interval = interval
+    self.seen = {}
+    self.errors = {}
+
+  def __matching_paths__(self):
+    names = fnmatch.filter(os.listdir(self.directory), self.pattern)
+    return sorted( os.path.join(self.directory, name) for name in names )
+
+  def scan(self):
+    """
+    Ingests every matching file that is new or changed since it was last seen, and forgets those that
+    are gone. Returns the ingested paths
+    """
+    paths = self.__matching_paths__()
+    for path in set(self.seen) - set(paths):
+      self.forget(path)
+
+    return [ path for path in paths if self.ingest(path) ]
+
+  def forget(self, path):
+    """Drops a file that was deleted or moved away, removing its features from the index"""
+    self.seen.pop(path, None)
+    self.errors.pop(path, None)
+    if self.index is not None: self.index.remove([path])
+
+  def ingest(self, path):
+    """
+    Analyzes the file at path if it is new or changed. Returns True when its features were added, and
+    False when it was unchanged, vanished or failed to parse; parse failures are kept in errors until the
+    file changes again.
+    """
+    try:
+      status = os.stat(path)
+      stamp = (status.st_mtime, status.st_size)
+      if self.seen.get(path, (None, None, None))[:2] == stamp: return False
+
+      with open(path, "rb") as gml_file:
+        gml = gml_file.read()
+    except (IOError, OSError):
+      return False
+
+    digest = hashlib.sha1(gml).digest()
+    previous = self.seen.get(path)
+    self.seen[path] = stamp + (digest,)
+    if previous is not None and previous[2] == digest: return False
+
+    self.errors.pop(path, None)
+    if self.index is not None: self.index.remove([path])
+    vector, cached = self.cache.lookup([digest], self.features)
+
+    if not cached.all():
+      try:
+        vector = feature_vector(Tag.fromGML(gml, keep_gml=False), self.features).reshape(1, -1)
+      except Exception:
+        self.errors[path] = traceback.format_exc()
+        return False
+
+      self.cache.store([digest], self.features, vector)
+
+    if self.index is not None: self.index.add([path], vector)
+    return True
+
+  def run(self, callback=None, duration=None):
+    """
+    Scans the directory, then keeps ingesting files as they appear or change, calling callback with the
+    list of paths ingested by each scan that found any. Runs until interrupted or, when duration is
+    given, for about that many seconds.
+    """
+    deadline = time.time() + duration if duration is not None else None
+
+    def report(paths):
+      if paths and callback is not None: callback(paths)
+
+    report( self.scan() )
+
+    if pyinotify is not None:
+      self.__run_inotify__(report, deadline)
+    else:
+      while deadline is None or time.time() < deadline:
+        time.sleep( self.interval if deadline is None else max(0, min(self.interval, deadline - time.time())) )
+        report( self.scan() )
+
+  def __run_inotify__(self, report, deadline):
+    """Waits for files to be written, moved or deleted in the directory, ingesting or forgetting each one"""
+    manager = pyinotify.WatchManager()
+    changed = []
+    gone = []
+
+    class Handler(pyinotify.ProcessEvent):
+      def process_IN_CLOSE_WRITE(self, event):
+        changed.append(event.pathname)
+
+      def process_IN_DELETE(self, event):
+        gone.append(event.pathname)
+
+      process_IN_MOVED_TO = process_IN_CLOSE_WRITE
+      process_IN_MOVED_FROM = process_IN_DELETE
+
+    notifier = pyinotify.Notifier(manager, Handler(), timeout=int(self.interval * 1000))
+    events = pyinotify.IN_CLOSE_WRITE | pyinotify.IN_MOVED_TO | pyinotify.IN_DELETE | pyinotify.IN_MOVED_FROM
+    manager.add_watch(self.directory, events)
+
+    try:
+      while deadline is None or time.time() < deadline:
+        if notifier.check_events():
+          notifier.read_events()
+          notifier.process_events()
+
+        # Forgetting first means a file deleted and written again in one batch is ingested afresh
+        for path in set(gone):
+          self.forget(path)
+
+        paths = sorted(set( path for path in changed if fnmatch.fnmatch(os.path.basename(path), self.pattern) ))
+        del changed[:], gone[:]
+        report([ path for path in paths if self.ingest(path) ])
+    finally:
+      notifier.stop()
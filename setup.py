@@ -7,6 +7,14 @@ setup(
   author="Golan Levin",
   author_email="golan@flong.com",
   packages=find_packages(),
+  entry_points={
+    'console_scripts': ['gml-analyze = gml_analyzer.cli:main'],
+  },
+  extras_require={
+    'index': ['scipy'],
+    'parquet': ['pyarrow'],
+    'watch': ['pyinotify'],
+  },
   test_suite='nose.collector',
   tests_require=['nose']
 )
\ No newline at end of file